@@ -0,0 +1,5 @@
+"""driganttic benchmarks.
+
+Run them from the repository root, e.g.
+`python -m benchmarks.bench_timestamps`.
+"""
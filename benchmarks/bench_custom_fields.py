@@ -0,0 +1,55 @@
+"""Custom fields extraction benchmark.
+
+Compares the per-field GET_FIELDS lookups against the compiled
+extraction plan on wide custom field configurations.
+
+    python -m benchmarks.bench_custom_fields
+"""
+
+import timeit
+
+from benchmarks import payloads
+from driganttic import parse
+
+N_ITEMS = 1000
+
+
+def _get_fields(items, Translator, custom_fields):
+    """Extracts the custom fields with the GET_FIELDS functions."""
+    for item in items:
+        for k_c, v_c in custom_fields["task"].items():
+            lv = item["dataFields"].get(k_c, [])
+            for k in v_c:
+                parse.GET_FIELDS[k_c](lv, k, Translator.__getattribute__(k_c))
+
+
+def _plan(items, Translator, custom_fields):
+    """Extracts the custom fields with a compiled plan."""
+    plan = parse._compile_plan("task", Translator, custom_fields)
+    for item in items:
+        parse._apply_plan(plan, item["dataFields"])
+
+
+def main():
+    """Runs the benchmark and prints the timings."""
+    print(f"{N_ITEMS} tasks")
+    for width in (3, 10, 30):
+        items = payloads.task_page(1, 1, N_ITEMS, width)["items"]
+        Translator = parse._datafields(payloads.datafields(width))
+        custom_fields = payloads.custom_fields("task", width)
+        timings = [
+            min(
+                timeit.repeat(
+                    lambda: f(items, Translator, custom_fields), number=1, repeat=3
+                )
+            )
+            for f in (_get_fields, _plan)
+        ]
+        print(
+            f"  {3 * width:3d} fields: GET_FIELDS {timings[0] * 1e3:8.2f} ms, "
+            f"plan {timings[1] * 1e3:8.2f} ms  (x{timings[0] / timings[1]:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
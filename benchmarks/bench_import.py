@@ -0,0 +1,82 @@
+"""Import time benchmark.
+
+Imports a module in a fresh interpreter with `python -X importtime`,
+reports its cumulative import time and the slowest imports it pulls in,
+and checks it against a budget. Heavy dependencies (dateparser, yaml,
+numpy, pyarrow, asyncio, aiohttp) must not be imported by the sync
+client:
+
+    python -m benchmarks.bench_import  # driganttic.client
+    python -m benchmarks.bench_import --budget-ms 300
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+LAZY = ("dateparser", "yaml", "numpy", "pyarrow", "asyncio", "aiohttp")
+
+
+def import_times(module: str) -> List[Tuple[str, int, int]]:
+    """Import times of a module and everything it imports.
+
+    Args:
+        module: Module to import in a fresh interpreter
+
+    Returns: (module, self µs, cumulative µs) of every import, in the
+        order they finish. The module itself is the last one.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line[12:]:
+            continue
+        own, cumulative, name = line[12:].split("|")
+        if own.strip().isdigit():
+            times.append((name.strip(), int(own), int(cumulative)))
+    return times
+
+
+def main(argv=None) -> int:
+    """Runs the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="driganttic.client")
+    parser.add_argument("--budget-ms", type=float, default=400.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    # Best of a few runs, the first ones may warm the disk cache
+    runs = [import_times(args.module) for _ in range(args.repeat)]
+    times = min(runs, key=lambda t: t[-1][2])
+    total_ms = times[-1][2] / 1e3
+    print(f"import {args.module}: {total_ms:.1f} ms (budget {args.budget_ms} ms)")
+    top_level: Dict[str, int] = {}
+    for name, _, cumulative in times[:-1]:
+        if name == "site":
+            # Interpreter startup, not the module
+            continue
+        top_level[name] = max(top_level.get(name, 0), cumulative)
+    for name, cumulative in sorted(top_level.items(), key=lambda t: -t[1])[: args.top]:
+        print(f"  {name:40s} {cumulative / 1e3:9.1f} ms")
+    failed = False
+    if args.module == "driganttic.client":
+        imported = set(name for name, _, _ in times)
+        for name in LAZY:
+            if name in imported:
+                print(f"EAGER IMPORT {name}")
+                failed = True
+    if total_ms > args.budget_ms:
+        print(f"OVER BUDGET by {total_ms - args.budget_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
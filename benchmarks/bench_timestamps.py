@@ -0,0 +1,53 @@
+"""Timestamp parsing micro-benchmark.
+
+Compares `parse.parse_timestamp` against plain dateparser on the
+timestamps of a realistic task list, and times `parse._fetcherlist`
+on the whole payload.
+
+    python -m benchmarks.bench_timestamps
+"""
+
+import timeit
+
+import dateparser
+
+from benchmarks import payloads
+from driganttic import parse
+from driganttic.schemas.fetcher import DataFields
+
+N_ITEMS = 2000
+
+
+def main():
+    """Runs the benchmark and prints the timings."""
+    response = payloads.task_page(1, 1, N_ITEMS)
+    timestamps = [e[k] for e in response["items"] for k in ("created", "start", "end")]
+
+    def run_dateparser():
+        for t in timestamps:
+            dateparser.parse(t)
+
+    def run_fast():
+        parse._fromisoformat.cache_clear()
+        for t in timestamps:
+            parse.parse_timestamp(t)
+
+    dateparser.parse(timestamps[0])  # load locale data outside the timings
+    t_slow = timeit.timeit(run_dateparser, number=1)
+    t_fast = min(timeit.repeat(run_fast, number=1, repeat=3))
+    print(f"{len(timestamps)} timestamps")
+    print(f"  dateparser.parse:      {t_slow * 1e3:9.2f} ms")
+    print(f"  parse.parse_timestamp: {t_fast * 1e3:9.2f} ms  (x{t_slow / t_fast:.0f})")
+
+    t_list = min(
+        timeit.repeat(
+            lambda: parse._fetcherlist(response, "task", DataFields()),
+            number=1,
+            repeat=3,
+        )
+    )
+    print(f"_fetcherlist of {N_ITEMS} tasks: {t_list * 1e3:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Local stand-in for the Ganttic API.
+
+Serves synthetic `tasks`, `resources` and `projects` listings, their
+`datafields` and the detail endpoints, so clients can be measured and
+tested reproducibly and offline:
+
+    with MockGantticServer(pages=10, items_per_page=100) as server:
+        Client = GantticClient(APIKEY="mock", ENDPOINT=server.endpoint)
+
+Pages are encoded once when first requested, so the server itself stays
+cheap next to the client being measured. Every request is recorded in
+`server.requests` as a (method, path, query) tuple.
+
+Writes (POST task, PUT and DELETE task/{id}, and the same for resources
+and projects) are recorded in `server.writes` as (method, path, body)
+tuples and answered with the written entity, without changing the
+listings. Unknown ids answer 404.
+
+Successful responses carry an ETag, and requests with a matching
+If-None-Match are answered with an empty 304, as the Ganttic API would
+for unchanged resources when revalidated.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks import payloads
+
+LISTINGS = {"tasks": "task", "resources": "resource", "projects": "project"}
+DETAILS = {"task": "task", "resource": "resource", "project": "project"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler, reads its settings from the server."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, avoid Nagle delays
+    disable_nagle_algorithm = True
+    server: "_Server"
+
+    def log_message(self, *args) -> None:
+        """Keeps the benchmark output clean."""
+
+    def _send(self, status: int, body: bytes = b"") -> None:
+        """Sends a JSON response, or a 304 if the client has it."""
+        etag = None
+        if status == 200:
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.server.mock._record_not_modified()
+                status, body = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Serves listings, datafields and details."""
+        mock = self.server.mock
+        url = urlparse(self.path)
+        query = dict((k, v[-1]) for k, v in parse_qs(url.query).items())
+        mock._record("GET", url.path, query)
+        if mock.latency:
+            time.sleep(mock.latency)
+        parts = url.path.strip("/").split("/")
+        if len(parts) < 2 or parts[0] != mock.version or not query.get("token"):
+            return self._send(404, b'{"error": "not found"}')
+        resource = parts[1]
+        if len(parts) == 3 and parts[2] == "datafields" and resource in LISTINGS:
+            return self._send(200, mock._datafields())
+        if len(parts) == 2 and resource in LISTINGS:
+            page = int(query.get("page", 1))
+            if not 1 <= page <= mock.pages:
+                return self._send(404, b'{"error": "no such page"}')
+            return self._send(200, mock._page(LISTINGS[resource], page))
+        if len(parts) == 3 and resource in DETAILS:
+            body = mock._details(DETAILS[resource], parts[2])
+            if body is not None:
+                return self._send(200, body)
+        return self._send(404, b'{"error": "not found"}')
+
+    def _write(self, method: str) -> None:
+        """Serves creations, modifications and deletions."""
+        mock = self.server.mock
+        url = urlparse(self.path)
+        query = dict((k, v[-1]) for k, v in parse_qs(url.query).items())
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        mock._record(method, url.path, query)
+        if mock.latency:
+            time.sleep(mock.latency)
+        parts = url.path.strip("/").split("/")
+        if len(parts) < 2 or parts[0] != mock.version or not query.get("token"):
+            return self._send(404, b'{"error": "not found"}')
+        resource = DETAILS.get(parts[1])
+        if resource is None or (len(parts) == 2) != (method == "POST"):
+            return self._send(404, b'{"error": "not found"}')
+        if len(parts) == 3 and mock._details(resource, parts[2]) is None:
+            return self._send(404, b'{"error": "not found"}')
+        item_id = mock._record_write(method, url.path, body) or parts[-1]
+        if method == "DELETE":
+            return self._send(200)
+        return self._send(200, json.dumps(dict(body or {}, id=item_id)).encode())
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Creates an entity."""
+        self._write("POST")
+
+    def do_PUT(self) -> None:  # noqa: N802
+        """Modifies an entity."""
+        self._write("PUT")
+
+    def do_DELETE(self) -> None:  # noqa: N802
+        """Deletes an entity."""
+        self._write("DELETE")
+
+
+class _Server(ThreadingHTTPServer):
+    """HTTP server holding a reference to its MockGantticServer."""
+
+    daemon_threads = True
+    mock: "MockGantticServer"
+
+
+class MockGantticServer:
+    """Threaded local HTTP server imitating the Ganttic API."""
+
+    def __init__(
+        self,
+        pages: int = 5,
+        items_per_page: int = 100,
+        width: int = 3,
+        latency: float = 0.0,
+        version: str = "v1",
+    ):
+        """Mock Ganttic server.
+
+        Args:
+            pages: Pages of every listing
+            items_per_page: Items on each page
+            width: Custom datafields of each type (dates, numbers and
+                listValues)
+            latency: Seconds slept before answering each request
+            version: Api version in the URL
+        """
+        self.pages = pages
+        self.items_per_page = items_per_page
+        self.width = width
+        self.latency = latency
+        self.version = version
+        self.requests: List[Tuple[str, str, Dict[str, str]]] = []
+        self.not_modified = 0
+        self.writes: List[Tuple[str, str, Optional[Dict]]] = []
+        self._encoded: Dict[Tuple[str, int], bytes] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        """Endpoint to pass to the clients, without the version."""
+        assert self._server is not None, "Server not started"
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> "MockGantticServer":
+        """Starts serving in a background thread."""
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.mock = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockGantticServer":
+        """Starts the server."""
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        """Stops the server."""
+        self.stop()
+
+    def _record(self, method: str, path: str, query: Dict[str, str]) -> None:
+        """Records a request."""
+        with self._lock:
+            self.requests.append((method, path, query))
+
+    def _record_write(
+        self, method: str, path: str, body: Optional[Dict]
+    ) -> Optional[str]:
+        """Records a write, returns the id of a created entity."""
+        with self._lock:
+            self.writes.append((method, path, body))
+            if method == "POST":
+                return f"new{len(self.writes)}"
+        return None
+
+    def _record_not_modified(self) -> None:
+        """Counts a 304 answer."""
+        with self._lock:
+            self.not_modified += 1
+
+    def _cached(self, key: Tuple[str, int], build) -> bytes:
+        """Encodes a payload once."""
+        body = self._encoded.get(key)
+        if body is None:
+            body = json.dumps(build()).encode("utf-8")
+            with self._lock:
+                self._encoded[key] = body
+        return body
+
+    def _datafields(self) -> bytes:
+        """Encoded datafields response."""
+        return self._cached(("datafields", 0), lambda: payloads.datafields(self.width))
+
+    def _page(self, fetcher_name: str, page: int) -> bytes:
+        """Encoded listing page."""
+        return self._cached(
+            (fetcher_name, page),
+            lambda: payloads.listing_page(
+                fetcher_name, page, self.pages, self.items_per_page, self.width
+            ),
+        )
+
+    def _details(self, fetcher_name: str, item_id: str) -> Optional[bytes]:
+        """Encoded details of one item, None if there is no such one."""
+        try:
+            i = int(item_id) - (100000 if fetcher_name == "task" else 0)
+        except ValueError:
+            return None
+        if not 0 <= i < self.pages * self.items_per_page:
+            return None
+        return json.dumps(payloads.ITEMS[fetcher_name](i, self.width)).encode("utf-8")
@@ -0,0 +1,101 @@
+"""Synthetic Ganttic API payloads for the benchmarks.
+
+The shapes follow the real API responses: paginated `items` lists and
+datafields listings with `dates`, `numbers` and `listValues`.
+"""
+
+import datetime
+import random
+from typing import Dict, List
+
+
+def datafields(width: int = 3) -> Dict:
+    """Datafields response with `width` fields of each custom type."""
+    return {
+        "dates": [{"id": f"d{i}", "name": f"date_{i}"} for i in range(width)],
+        "numbers": [{"id": f"n{i}", "name": f"number_{i}"} for i in range(width)],
+        "listValues": [
+            {
+                "id": f"l{i}",
+                "name": f"list_{i}",
+                "values": [
+                    {"id": f"l{i}v{j}", "value": f"value_{j}"} for j in range(5)
+                ],
+            }
+            for i in range(width)
+        ],
+        "texts": [],
+        "users": [],
+    }
+
+
+def custom_fields(resource_name: str, width: int = 3) -> Dict:
+    """Custom fields config mapping every datafield to a model field."""
+    return {
+        resource_name: {
+            "dates": dict((f"date_{i}", f"date_{i}") for i in range(width)),
+            "numbers": dict((f"number_{i}", f"number_{i}") for i in range(width)),
+            "listValues": dict((f"list_{i}", f"list_{i}") for i in range(width)),
+        }
+    }
+
+
+def _data_fields(rng: random.Random, date: str, width: int) -> Dict:
+    """The dataFields of an item, with a value for every datafield."""
+    return {
+        "dates": [{"id": f"d{k}", "date": date} for k in range(width)],
+        "numbers": [{"id": f"n{k}", "number": rng.random()} for k in range(width)],
+        "listValues": [
+            {"id": f"l{k}", "valueId": f"l{k}v{rng.randrange(5)}"} for k in range(width)
+        ],
+    }
+
+
+def task(i: int, width: int = 3) -> Dict:
+    """A task item as returned by the tasks endpoint."""
+    rng = random.Random(i)
+    start = datetime.datetime(2021, 1, 1, 8) + datetime.timedelta(
+        days=rng.randrange(365), hours=rng.randrange(8)
+    )
+    end = start + datetime.timedelta(days=rng.randrange(1, 20))
+    return {
+        "id": str(100000 + i),
+        "name": f"Task {i}",
+        "status": "1",
+        "created": "2021-01-01 09:30",
+        "projectId": str(rng.randrange(200)),
+        "resources": [str(rng.randrange(500)) for _ in range(rng.randrange(1, 4))],
+        "start": start.strftime("%Y-%m-%d %H:%M"),
+        "end": end.strftime("%Y-%m-%d %H:%M"),
+        "utilizationPercent": rng.choice([25, 50, 100]),
+        "dataFields": _data_fields(rng, start.strftime("%Y-%m-%d"), width),
+    }
+
+
+def entity(i: int, width: int = 3) -> Dict:
+    """A resource or project item as returned by their endpoints."""
+    rng = random.Random(i)
+    return {
+        "id": str(i),
+        "name": f"Entity {i}",
+        "status": "1",
+        "created": "2020-06-01 12:00",
+        "dataFields": _data_fields(rng, "2021-12-31", width),
+    }
+
+
+ITEMS = {"task": task, "resource": entity, "project": entity}
+
+
+def listing_page(
+    fetcher_name: str, page: int, page_count: int, n_items: int, width: int = 3
+) -> Dict:
+    """A page of a listing endpoint."""
+    first = (page - 1) * n_items
+    items: List[Dict] = [ITEMS[fetcher_name](first + i, width) for i in range(n_items)]
+    return {"page": page, "pageCount": page_count, "items": items}
+
+
+def task_page(page: int, page_count: int, n_items: int, width: int = 3) -> Dict:
+    """A page of the tasks endpoint."""
+    return listing_page("task", page, page_count, n_items, width)
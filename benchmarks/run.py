@@ -0,0 +1,284 @@
+"""Offline benchmark suite.
+
+Measures the client against a local `MockGantticServer`:
+
+- parse_timestamp: timestamps parsed per second.
+- _fetcherlist: items parsed per second, with wide custom fields and
+  without validation.
+- diff: fingerprinting and diffing two task lists.
+- snapshot: reloading a saved task list and reading 10 of its tasks
+  (load), or all of them (scan).
+- decode: decoding the bytes of a multi-megabyte task page, with every
+  installed JSON decoder.
+- decode_parse: raw multi-megabyte task page bytes to a TaskList, with
+  every installed JSON decoder.
+- _exhaust_pages: time to pull every page of a listing.
+- get_tasks and async get_tasks: end-to-end time and throughput.
+
+Every benchmark reports its best time over a few repeats and the peak
+memory traced by tracemalloc on an extra run. Results are compared with
+`benchmarks/baseline.json`, exiting with an error on regressions:
+
+    python -m benchmarks.run                  # compare to the baseline
+    python -m benchmarks.run --save-baseline  # record a new baseline
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+from benchmarks import payloads
+from benchmarks.mock_server import MockGantticServer
+from driganttic import diff, jsonlib, parse, snapshot
+from driganttic.async_client import AsyncGantticClient
+from driganttic.client import GantticClient
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+T_MIN = datetime.datetime(2021, 1, 1)
+T_MAX = datetime.datetime(2022, 1, 1)
+
+
+def measure(run: Callable[[], int], repeat: int = 3) -> Dict[str, float]:
+    """Times a benchmark.
+
+    Args:
+        run: Runs the benchmark once, returning the number of processed
+            items
+        repeat: Timed runs, the best one is kept
+
+    Returns: Seconds, items per second and peak traced memory in MB.
+    """
+    best = float("inf")
+    items = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = run()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": round(best, 6),
+        "items_per_second": round(items / best, 1),
+        "peak_mb": round(peak / 2**20, 3),
+    }
+
+
+def bench_parse_timestamp(n_items: int) -> Dict[str, float]:
+    """Benchmarks parse_timestamp on the timestamps of a task page."""
+    items = payloads.task_page(1, 1, n_items)["items"]
+    timestamps = [e[k] for e in items for k in ("created", "start", "end")]
+
+    def run():
+        parse._fromisoformat.cache_clear()
+        for t in timestamps:
+            parse.parse_timestamp(t)
+        return len(timestamps)
+
+    return measure(run)
+
+
+def bench_fetcherlist(
+    n_items: int, width: int, validate: bool = True
+) -> Dict[str, float]:
+    """Benchmarks _fetcherlist on one large task page."""
+    response = payloads.task_page(1, 1, n_items, width)
+    Translator = parse._datafields(payloads.datafields(width))
+    custom_fields = payloads.custom_fields("task", width)
+
+    def run():
+        parse._fetcherlist(response, "task", Translator, custom_fields, validate)
+        return n_items
+
+    return measure(run)
+
+
+def bench_decode(n_items: int, width: int, decoder: str) -> Dict[str, float]:
+    """Benchmarks decoding the raw bytes of a task page, not parsing."""
+    body = json.dumps(payloads.task_page(1, 1, n_items, width)).encode("utf-8")
+    loads = jsonlib.get_decoder(decoder)
+
+    def run():
+        loads(body)
+        return n_items
+
+    return measure(run)
+
+
+def bench_decode_parse(n_items: int, width: int, decoder: str) -> Dict[str, float]:
+    """Benchmarks decoding and parsing the raw bytes of a task page."""
+    body = json.dumps(payloads.task_page(1, 1, n_items, width)).encode("utf-8")
+    Translator = parse._datafields(payloads.datafields(width))
+    custom_fields = payloads.custom_fields("task", width)
+    loads = jsonlib.get_decoder(decoder)
+
+    def run():
+        parse._fetcherlist_from_bytes(
+            body, "task", Translator, loads, custom_fields=custom_fields
+        )
+        return n_items
+
+    return measure(run)
+
+
+def bench_diff(n_items: int) -> Dict[str, float]:
+    """Benchmarks diffing a task list against the previous pull."""
+    Translator = parse._datafields(payloads.datafields())
+    previous = parse._fetcherlist(payloads.task_page(1, 1, n_items), "task", Translator)
+    current = parse._fetcherlist(payloads.task_page(1, 1, n_items), "task", Translator)
+    fingerprints = diff.fingerprints(previous)
+
+    def run():
+        diff.diff(fingerprints, current)
+        return n_items
+
+    return measure(run)
+
+
+def bench_snapshot(n_items: int, scan: bool = False) -> Dict[str, float]:
+    """Benchmarks reloading a task list snapshot."""
+    Translator = parse._datafields(payloads.datafields())
+    tasks = parse._fetcherlist(payloads.task_page(1, 1, n_items), "task", Translator)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tasks.snap")
+        tasks.save_snapshot(path)
+
+        def run():
+            items = snapshot.load(path).fetched_items
+            if scan:
+                return sum(1 for _ in items)
+            for i in range(0, len(items), max(1, len(items) // 10)):
+                items[i]
+            return len(items)
+
+        return measure(run)
+
+
+def bench_exhaust_pages(server: MockGantticServer) -> Dict[str, float]:
+    """Benchmarks _exhaust_pages against the mock server."""
+    with GantticClient(APIKEY="mock", ENDPOINT=server.endpoint) as Client:
+        return measure(lambda: len(Client._exhaust_pages("resource")["items"]))
+
+
+def bench_get_tasks(server: MockGantticServer) -> Dict[str, float]:
+    """Benchmarks get_tasks end to end against the mock server."""
+    with GantticClient(APIKEY="mock", ENDPOINT=server.endpoint) as Client:
+        return measure(lambda: len(Client.get_tasks(T_MIN, T_MAX).fetched_items))
+
+
+def bench_get_tasks_async(server: MockGantticServer) -> Dict[str, float]:
+    """Benchmarks the async get_tasks end to end on the mock server."""
+
+    async def get_tasks():
+        async with AsyncGantticClient(
+            APIKEY="mock", ENDPOINT=server.endpoint
+        ) as Client:
+            return len((await Client.get_tasks(T_MIN, T_MAX)).fetched_items)
+
+    return measure(lambda: asyncio.run(get_tasks()))
+
+
+def run_suite(quick: bool = False) -> Dict[str, Dict[str, float]]:
+    """Runs every benchmark.
+
+    Args:
+        quick: Use smaller payloads, for a fast sanity check
+
+    Returns: Dict of benchmark name to its measures.
+    """
+    n_items = 200 if quick else 2000
+    pages = 4 if quick else 20
+    results = {
+        "parse_timestamp": bench_parse_timestamp(n_items),
+        "fetcherlist": bench_fetcherlist(n_items, width=3),
+        "fetcherlist_wide": bench_fetcherlist(n_items, width=30),
+        "fetcherlist_trusted": bench_fetcherlist(n_items, width=3, validate=False),
+    }
+    results["diff"] = bench_diff(n_items)
+    results["snapshot_load"] = bench_snapshot(n_items * 5)
+    results["snapshot_scan"] = bench_snapshot(n_items * 5, scan=True)
+    # Pages of several MB
+    for decoder in sorted(jsonlib.DECODERS):
+        results[f"decode_{decoder}"] = bench_decode(n_items * 2, 10, decoder)
+        results[f"decode_parse_{decoder}"] = bench_decode_parse(
+            n_items * 2, width=10, decoder=decoder
+        )
+    with MockGantticServer(
+        pages=pages, items_per_page=100, width=3, latency=0.02
+    ) as server:
+        results["exhaust_pages"] = bench_exhaust_pages(server)
+        results["get_tasks"] = bench_get_tasks(server)
+        results["get_tasks_async"] = bench_get_tasks_async(server)
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+) -> Dict[str, str]:
+    """Compares results with a baseline.
+
+    Args:
+        results: Current measures
+        baseline: Baseline measures
+        tolerance: Allowed relative slowdown or memory growth
+
+    Returns: Dict of benchmark name to regression description.
+    """
+    regressions = {}
+    for name, measures in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for key in ("seconds", "peak_mb"):
+            if measures[key] > base[key] * (1 + tolerance):
+                regressions[name] = (
+                    f"{key} {measures[key]} > {base[key]} (+{tolerance:.0%})"
+                )
+    return regressions
+
+
+def main(argv=None) -> int:
+    """Runs the suite from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_suite(quick=args.quick)
+    for name, measures in results.items():
+        print(
+            f"{name:18s} {measures['seconds'] * 1e3:10.2f} ms "
+            f"{measures['items_per_second']:12.0f} items/s "
+            f"{measures['peak_mb']:9.2f} MB"
+        )
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if args.quick or not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for name, description in regressions.items():
+        print(f"REGRESSION {name}: {description}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
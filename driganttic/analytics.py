@@ -0,0 +1,252 @@
+"""Resource utilization engine.
+
+Computes the load of every resource per day, week or month from a task
+list, with NumPy and without looping over the tasks in Python:
+
+    tasks = Client.get_task_columns(timeMin, timeMax)
+    load = analytics.utilization(tasks, freq="week")
+    load.mean        # resources x periods, mean utilization percent
+    load.overbooked  # resources x periods, booked over capacity
+
+Each task books all of its resources at its utilizationPercent (100
+when missing) from its start to its end. Per period two measures are
+computed:
+
+- mean: the booking averaged over the whole period, in calendar time,
+  so a full time task of half a day scores 50 on a daily period.
+  Computed with difference arrays over the period grid.
+- peak: the highest concurrent booking at any instant of the period,
+  computed with a sweep over the sorted start and end events. A peak
+  over the capacity means the resource is overbooked.
+
+Requires numpy, see the `columnar` extra.
+"""
+
+import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from driganttic import columnar
+from driganttic.schemas.fetcher import FetcherList
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+_DAY_MS = 86400000
+
+
+def _edges(t_min: Any, t_max: Any, freq: Union[str, datetime.timedelta]) -> Any:
+    """Period edges covering [t_min, t_max), as datetime64[ms].
+
+    Days and months start at midnight UTC, weeks on Monday.
+    """
+    if freq == "month":
+        first = t_min.astype("datetime64[M]")
+        last = t_max.astype("datetime64[M]") + 1
+        return np.arange(first, last + 1).astype("datetime64[ms]")
+    if freq in ("day", "week"):
+        first = t_min.astype("datetime64[D]")
+        if freq == "week":
+            # datetime64 days count from a Thursday
+            first -= (first.astype(np.int64) + 3) % 7
+        step = 1 if freq == "day" else 7
+        n = -(-(t_max - first).astype(np.int64) // (step * _DAY_MS)) or 1
+        return (first + np.arange(n + 1) * step).astype("datetime64[ms]")
+    if isinstance(freq, datetime.timedelta) and freq > datetime.timedelta():
+        delta = np.timedelta64(freq // datetime.timedelta(milliseconds=1), "ms")
+        n = -(-(t_max - t_min) // delta) or 1
+        return t_min + np.arange(n + 1) * delta
+    raise ValueError(f"Invalid freq {freq}")
+
+
+def _explode(columns: Dict[str, Any]) -> Tuple[Any, Any, Any, Any, Any]:
+    """One row per task and resource.
+
+    Returns: Resource ids, resource index, start, end (int64 ms) and
+        utilization percent of every row.
+    """
+    resources = columns["resources"]
+    counts = np.fromiter((len(r or ()) for r in resources), np.int64, len(resources))
+    flat = [r for rs in resources for r in (rs or ())]
+    ids = sorted(set(flat))
+    position = dict((r, i) for i, r in enumerate(ids))
+    index = np.fromiter((position[r] for r in flat), np.int64, len(flat))
+    start = np.repeat(
+        columns["start"].astype("datetime64[ms]").astype(np.int64), counts
+    )
+    end = np.repeat(columns["end"].astype("datetime64[ms]").astype(np.int64), counts)
+    percent = columns.get("utilizationPercent")
+    if percent is None:
+        percent = np.full(len(resources), 100.0)
+    percent = np.repeat(np.where(np.isnan(percent), 100.0, percent), counts)
+    # Tasks without dates cannot book anything
+    keep = (start != columnar._NAT) & (end != columnar._NAT) & (end > start)
+    ids_array = np.empty(len(ids), dtype=object)
+    ids_array[:] = ids
+    return ids_array, index[keep], start[keep], end[keep], percent[keep]
+
+
+def _mean_load(
+    index: Any, start: Any, end: Any, percent: Any, edges: Any, n_resources: int
+) -> Any:
+    """Booking of every resource averaged over every period."""
+    n = len(edges) - 1
+    lengths = np.diff(edges).astype(np.float64)
+    s = np.clip(start, edges[0], edges[-1])
+    e = np.clip(end, edges[0], edges[-1])
+    inside = e > s
+    index, s, e, percent = index[inside], s[inside], e[inside], percent[inside]
+    first = np.searchsorted(edges, s, side="right") - 1
+    last = np.searchsorted(edges, e, side="left") - 1
+    size = n_resources * (n + 1)
+    # Whole periods between the first and the last one: difference array
+    whole = last > first + 1
+    diff = np.bincount(
+        index[whole] * (n + 1) + first[whole] + 1, percent[whole], minlength=size
+    ) - np.bincount(
+        index[whole] * (n + 1) + last[whole], percent[whole], minlength=size
+    )
+    load = np.cumsum(diff.reshape(n_resources, n + 1), axis=1)[:, :n]
+    # Partial first and last periods
+    single = first == last
+    head_end = np.where(single, e, edges[np.minimum(first + 1, n)])
+    partial = np.bincount(
+        index * (n + 1) + first,
+        percent * (head_end - s) / lengths[first],
+        minlength=size,
+    )
+    tail = ~single
+    partial += np.bincount(
+        index[tail] * (n + 1) + last[tail],
+        percent[tail] * (e[tail] - edges[last[tail]]) / lengths[last[tail]],
+        minlength=size,
+    )
+    return load + partial.reshape(n_resources, n + 1)[:, :n]
+
+
+def _peak_load(
+    index: Any, start: Any, end: Any, percent: Any, edges: Any, n_resources: int
+) -> Any:
+    """Highest concurrent booking of every resource in every period."""
+    n = len(edges) - 1
+    peak = np.zeros((n_resources, n))
+    if not len(index):
+        return peak
+    # Times relative to the first event, so the resource offset fits
+    origin = min(start.min(), edges[0])
+    span = max(end.max(), edges[-1]) - origin + 1
+    times = np.concatenate([start, end]) - origin
+    deltas = np.concatenate([percent, -percent])
+    rows = np.concatenate([index, index])
+    # By resource, then time, ends before starts at the same instant
+    order = np.lexsort((deltas, times, rows))
+    keys = rows[order] * span + times[order]
+    level = np.cumsum(deltas[order])
+    # Level when every period starts, carried from the previous events
+    starts = np.arange(n_resources)[:, None] * span + (edges[:-1] - origin)[None, :]
+    before = np.searchsorted(keys, starts, side="right") - 1
+    carried = np.where(before >= 0, level[np.maximum(before, 0)], 0.0)
+    # Rounding leftovers of the previous resources
+    carried[carried < 1e-9] = 0.0
+    peak = np.maximum(peak, carried)
+    # Levels reached by the events inside every period
+    event_times = times[order] + origin
+    period = np.searchsorted(edges, event_times, side="right") - 1
+    valid = (period >= 0) & (period < n) & (event_times > edges[0])
+    np.maximum.at(peak, (rows[order][valid], period[valid]), level[valid])
+    return peak
+
+
+class Utilization:
+    """Utilization of every resource per period."""
+
+    def __init__(
+        self,
+        resources: Any,
+        periods: Any,
+        mean: Any,
+        peak: Any,
+        capacity: float = 100.0,
+    ):
+        """Utilization results.
+
+        Args:
+            resources: Resource ids, the rows of the matrices
+            periods: Period edges, one more than the matrix columns
+            mean: Mean utilization percent per resource and period
+            peak: Peak utilization percent per resource and period
+            capacity: Utilization percent a resource can take
+        """
+        self.resources = resources
+        self.periods = periods
+        self.mean = mean
+        self.peak = peak
+        self.capacity = capacity
+
+    @property
+    def overbooked(self) -> Any:
+        """Resources x periods mask of peaks over the capacity."""
+        return self.peak > self.capacity + 1e-9
+
+    def overbookings(self) -> List[Tuple[str, datetime.datetime, float]]:
+        """Overbooked periods as (resource id, period start, peak)."""
+        rows, cols = np.nonzero(self.overbooked)
+        starts = self.periods[:-1].astype("datetime64[ms]").tolist()
+        return [
+            (self.resources[r], starts[c], float(self.peak[r, c]))
+            for r, c in zip(rows, cols)
+        ]
+
+    def to_columns(self) -> Dict[str, Any]:
+        """Long format columns: resource, period, mean and peak."""
+        n_resources, n = self.mean.shape
+        return {
+            "resource": np.repeat(self.resources, n),
+            "period": np.tile(self.periods[:-1], n_resources),
+            "mean": self.mean.ravel(),
+            "peak": self.peak.ravel(),
+        }
+
+
+def utilization(
+    tasks: Union[FetcherList, Dict[str, Any]],
+    freq: Union[str, datetime.timedelta] = "day",
+    timeMin: Optional[datetime.datetime] = None,
+    timeMax: Optional[datetime.datetime] = None,
+    capacity: float = 100.0,
+) -> Utilization:
+    """Computes the utilization of every resource per period.
+
+    Args:
+        tasks: A TaskList, or its columns (see driganttic.columnar)
+        freq: Period length: "day", "week", "month" or a timedelta
+        timeMin: Start of the periods, defaults to the first task
+        timeMax: End of the periods, defaults to the last task
+        capacity: Utilization percent a resource can take, peaks over
+            it are overbookings
+
+    Returns: The utilization of every resource.
+    """
+    columnar._require_numpy()
+    columns = tasks.to_columns() if isinstance(tasks, FetcherList) else tasks
+    ids, index, start, end, percent = _explode(columns)
+    if timeMin is not None:
+        t_min = np.datetime64(columnar._epoch_ms(timeMin), "ms")
+    elif len(start):
+        t_min = np.datetime64(int(start.min()), "ms")
+    else:
+        t_min = np.datetime64("1970-01-01", "ms")
+    if timeMax is not None:
+        t_max = np.datetime64(columnar._epoch_ms(timeMax), "ms")
+    else:
+        t_max = np.datetime64(int(end.max()), "ms") if len(end) else t_min
+    edges = _edges(t_min, max(t_max, t_min + 1), freq)
+    edges_ms = edges.astype(np.int64)
+    return Utilization(
+        resources=ids,
+        periods=edges,
+        mean=_mean_load(index, start, end, percent, edges_ms, len(ids)),
+        peak=_peak_load(index, start, end, percent, edges_ms, len(ids)),
+        capacity=capacity,
+    )
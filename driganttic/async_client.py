@@ -0,0 +1,381 @@
+"""Ganttic async API client.
+
+Asyncio counterpart of `driganttic.client.GantticClient`, built on
+aiohttp.
+
+It mirrors the GET wrappers of the sync client (get_tasks, get_projects,
+get_resources and get_*_details) and returns the same pydantic models.
+The main difference is pagination: once the first page reports its
+`pageCount`, the remaining pages are requested concurrently (bounded by
+`max_concurrency`), so exhausting a paginated call costs roughly the
+slowest page instead of the sum of all of them.
+
+Usage:
+
+    async with AsyncGantticClient(APIKEY=APIKEY) as Client:
+        tasks = await Client.get_tasks(timeMin=t1, timeMax=t2)
+"""
+
+import asyncio
+import datetime
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Union,
+)
+
+import aiohttp
+
+from driganttic import instrumentation, jsonlib, parse
+from driganttic.client import FETCHERS, _endpoint_template, _fetcher_url, _request_event
+from driganttic.exceptions import GantticAPIError
+from driganttic.httpcache import HTTPCache
+from driganttic.ratelimit import RequestBudget, RetryPolicy, TokenBucket
+from driganttic.schemas.fetcher import (
+    DataFields,
+    FetcherDetails,
+    FetcherList,
+    ProjectDetails,
+    ProjectList,
+    ResourceDetails,
+    ResourceList,
+    TaskDetails,
+    TaskList,
+)
+from driganttic.singleflight import AsyncSingleFlight, call_key, coalesced_methods
+
+
+class AsyncGantticClient:
+    """Custom async client for the Ganttic API."""
+
+    def __init__(
+        self,
+        *,
+        APIKEY: str,
+        ENDPOINT: str = "https://planner.ganttic.com/api",
+        VERSION: str = "v1",
+        FETCHERS: dict = FETCHERS,
+        max_concurrency: int = 8,
+        rate_limiter: Optional[TokenBucket] = None,
+        retry: Optional[RetryPolicy] = None,
+        max_requests: Optional[int] = None,
+        timeout: Optional[float] = 60.0,
+        hooks: Optional[List[instrumentation.Hook]] = None,
+        validate: bool = True,
+        compact: bool = False,
+        http_cache: Optional[HTTPCache] = None,
+        json_decoder: Union[str, jsonlib.Decoder] = "auto",
+        coalesce: Union[bool, Iterable[str]] = False,
+        **kwargs,
+    ):
+        """Custom async Ganttic API Client.
+
+        The aiohttp session is opened lazily on the first request, so
+        the client can be instantiated outside of a running event loop.
+
+        Args:
+            APIKEY: Api key
+            ENDPOINT: Api Endpoint
+            VERSION: Api version
+            FETCHERS: Fetcher list of options
+            max_concurrency: Maximum number of requests in flight
+            rate_limiter: Optional token bucket throttling requests, it
+                can be shared with other sync or async clients
+            retry: Retry policy on 429, 5xx, timeouts and connection
+                errors. Defaults to RetryPolicy().
+            max_requests: Request budget of the client, or None
+            timeout: Seconds to wait for the server on each request
+            hooks: Instrumentation hooks of this client's requests, on
+                top of the global ones (see instrumentation.py)
+            validate: Validate the parsed models, or trust the API
+                responses and build them without validation
+            compact: Store the items of the listings compactly, see
+                driganttic.compact
+            http_cache: Optional cache of the raw GET responses, served
+                while fresh, revalidated with ETags (see httpcache.py)
+            json_decoder: JSON decoder of the response bodies, "auto",
+                "json", "orjson" or a callable (see jsonlib.py)
+            coalesce: Share one request and one parsed result among
+                identical concurrent calls: True for every getter, or
+                the names of the getters (see singleflight.py)
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be >= 1, got {max_concurrency}")
+        self.APIKEY = APIKEY
+        self.ENDPOINT = ENDPOINT + "/" + VERSION
+        self.VERSION = VERSION
+        self.FETCHERS = FETCHERS
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.budget = RequestBudget(max_requests)
+        self.timeout = timeout
+        self.hooks = list(hooks or [])
+        self.validate = validate
+        self.compact = compact
+        self.http_cache = http_cache
+        self.json_loads = jsonlib.get_decoder(json_decoder)
+        self.coalesce = coalesced_methods(coalesce)
+        self._flights = AsyncSingleFlight()
+        # Custom user defined data fields, fetched on first use
+        self.Translator: Dict[str, DataFields] = {}
+        self._translator_locks: Dict[str, asyncio.Lock] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncGantticClient":
+        """Enters the async context manager."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Closes the client on context exit."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Closes the underlying aiohttp session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Gets the aiohttp session, opening it if needed."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _get_fetcher(
+        self,
+        fetcher_name: str,
+        fetcher_detail_id: Optional[str] = None,
+        datafields=False,
+        **kwargs,
+    ) -> Dict:
+        """Main unified method for GET requests.
+
+        Unlike the sync client, the response body is read and decoded
+        here, as aiohttp responses cannot outlive their context.
+
+        Args:
+            fetcher_name: One of either task, resource or project
+            fetcher_detail_id: Set to a string ID if you want details on
+                a resource.
+            datafields: Set to True if you want only the custom
+                datafields for a fetcher_name
+
+        Returns: Decoded JSON response.
+
+        Raises:
+            GantticAPIError: On error statuses, after the retries
+            RequestBudgetExceeded: If the request budget is used up
+        """
+        req_string = _fetcher_url(
+            self.ENDPOINT, self.FETCHERS, fetcher_name, fetcher_detail_id, datafields
+        )
+        headers = {"Accept": "application/json"}
+        kwargs["token"] = self.APIKEY
+        if self.http_cache is not None:
+            key, entry, fresh = self.http_cache.lookup(req_string, kwargs, headers)
+            if entry is not None and fresh:
+                return self._loads(entry.body)
+        session = self._get_session()
+        assert self._semaphore is not None
+        hooks = self.hooks + instrumentation.HOOKS
+        start = time.perf_counter() if hooks else 0.0
+        attempt = 0
+        status: Optional[int] = None
+        body = b""
+        response_headers: Mapping[str, str] = {}
+        try:
+            while True:
+                self.budget.spend()
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire_async()
+                status, body = None, b""
+                try:
+                    async with self._semaphore, session.get(
+                        req_string, params=kwargs, headers=headers
+                    ) as resp:
+                        status = resp.status
+                        body = await resp.read()
+                        response_headers = resp.headers.copy()
+                        if resp.status < 400:
+                            break
+                        delay = self.retry.retry_delay(
+                            attempt, resp.status, resp.headers.get("Retry-After")
+                        )
+                        if delay is None:
+                            raise GantticAPIError(
+                                resp.status, req_string, await resp.text()
+                            )
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    delay = self.retry.retry_delay(attempt)
+                    if delay is None:
+                        raise
+                await asyncio.sleep(delay)
+                attempt += 1
+        finally:
+            if hooks:
+                instrumentation.emit_request(
+                    hooks,
+                    _request_event(
+                        "GET",
+                        _endpoint_template(
+                            self.FETCHERS, fetcher_name, fetcher_detail_id, datafields
+                        ),
+                        kwargs,
+                        status,
+                        len(body),
+                        attempt,
+                        start,
+                    ),
+                )
+        if self.http_cache is not None:
+            assert status is not None
+            cached = self.http_cache.update(key, entry, status, body, response_headers)
+            if cached is not None:
+                body = cached.body
+        return self._loads(body)
+
+    def _loads(self, body: bytes) -> Any:
+        """Decodes a raw JSON body."""
+        if not instrumentation.HOOKS:
+            return self.json_loads(body)
+        with instrumentation.timed_stage("json_decode"):
+            return self.json_loads(body)
+
+    async def _get_datafields(self, fetcher_name: str) -> DataFields:
+        """Gets datafields ID-valueID translation for custom fields."""
+        return parse._datafields(await self._get_fetcher(fetcher_name, datafields=True))
+
+    async def _get_translator(self, fetcher_name: str) -> DataFields:
+        """Gets the Translator of a fetcher, fetching it only once."""
+        if fetcher_name not in self.Translator:
+            lock = self._translator_locks.setdefault(fetcher_name, asyncio.Lock())
+            async with lock:
+                if fetcher_name not in self.Translator:
+                    self.Translator[fetcher_name] = await self._get_datafields(
+                        fetcher_name
+                    )
+        return self.Translator[fetcher_name]
+
+    async def _exhaust_pages(self, *args, **kwargs) -> Dict:
+        """Exhaust pages from API GET call.
+
+        The first page is fetched alone to learn the page count, then
+        the rest are gathered concurrently and appended in page order.
+        """
+        rfinal = await self._get_fetcher(*args, **kwargs)
+        pages = range(rfinal["page"] + 1, rfinal["pageCount"] + 1)
+        rnews: List[Dict] = await asyncio.gather(
+            *(self._get_fetcher(*args, **dict(kwargs, page=page)) for page in pages)
+        )
+        # Pages are decoded for this call only, append to the first one
+        for rnew in rnews:
+            rfinal["items"].extend(rnew["items"])
+        return rfinal
+
+    async def _coalesced(
+        self, method: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> Any:
+        """Awaits fn, or joins the identical call in flight."""
+        if method not in self.coalesce:
+            return await fn(*args, **kwargs)
+        return await self._flights.do(
+            call_key(method, args, kwargs), lambda: fn(*args, **kwargs)
+        )
+
+    async def _get_list(
+        self, fetcher_name: str, **kwargs
+    ) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
+        """Gets a whole listing."""
+        response, Translator = await asyncio.gather(
+            self._exhaust_pages(fetcher_name, **kwargs),
+            self._get_translator(fetcher_name),
+        )
+        return parse._fetcherlist(
+            response,
+            fetcher_name,
+            Translator,
+            validate=self.validate,
+            compact=self.compact,
+            owned=True,
+        )
+
+    async def _get_details(
+        self, fetcher_name: str, fetcher_detail_id: str, **kwargs
+    ) -> Union[FetcherDetails, TaskDetails, ResourceDetails, ProjectDetails]:
+        """Gets details of one entity."""
+        response, Translator = await asyncio.gather(
+            self._get_fetcher(
+                fetcher_name, fetcher_detail_id=fetcher_detail_id, **kwargs
+            ),
+            self._get_translator(fetcher_name),
+        )
+        return parse._fetcherdetails(
+            response, fetcher_name, Translator, validate=self.validate, owned=True
+        )
+
+    async def get_tasks(
+        self, timeMin: datetime.datetime, timeMax: datetime.datetime, **kwargs
+    ) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
+        """Gets tasks."""
+        return await self._coalesced(
+            "get_tasks",
+            self._get_list,
+            "task",
+            timeMin=timeMin.strftime("%Y-%m-%d %H:%M"),
+            timeMax=timeMax.strftime("%Y-%m-%d %H:%M"),
+            **kwargs,
+        )
+
+    async def get_projects(
+        self, **kwargs
+    ) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
+        """Gets projects."""
+        return await self._coalesced(
+            "get_projects", self._get_list, "project", **kwargs
+        )
+
+    async def get_resources(
+        self, **kwargs
+    ) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
+        """Gets resources."""
+        return await self._coalesced(
+            "get_resources", self._get_list, "resource", **kwargs
+        )
+
+    async def get_task_details(
+        self, taskId: str, **kwargs
+    ) -> Union[FetcherDetails, TaskDetails, ResourceDetails, ProjectDetails]:
+        """Gets details from task."""
+        return await self._coalesced(
+            "get_task_details", self._get_details, "task", taskId, **kwargs
+        )
+
+    async def get_resource_details(
+        self, resourceId: str, **kwargs
+    ) -> Union[FetcherDetails, TaskDetails, ResourceDetails, ProjectDetails]:
+        """Gets details from resource."""
+        return await self._coalesced(
+            "get_resource_details", self._get_details, "resource", resourceId, **kwargs
+        )
+
+    async def get_project_details(
+        self, projectId: str, **kwargs
+    ) -> Union[FetcherDetails, TaskDetails, ResourceDetails, ProjectDetails]:
+        """Gets details from project."""
+        return await self._coalesced(
+            "get_project_details", self._get_details, "project", projectId, **kwargs
+        )
@@ -0,0 +1,330 @@
+"""Persistent local cache of fetched entities.
+
+An `EntityCache` keeps parsed tasks, projects and resources in a SQLite
+file, keyed by fetcher name and id. Plug it into the client with
+`GantticClient(APIKEY=..., cache=EntityCache("ganttic.db"))` and the
+public getters serve reads from it:
+
+- get_projects / get_resources: the whole listing is refreshed once
+  its TTL expires, in the meantime it is read from the cache.
+- get_tasks: the cache remembers which time windows were fetched and
+  when. A call only requests the parts of [timeMin, timeMax] that are
+  not covered by a fresh window, so moving a dashboard range forward
+  one week fetches one week.
+- get_*_details: fresh cached entities are returned without a request.
+
+Calls with extra Ganttic API parameters bypass the cache, as their
+filters cannot be answered locally.
+"""
+
+import datetime
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+from driganttic.parse import to_seconds
+from driganttic.schemas.fetcher import (
+    FetcherDetails,
+    ProjectDetails,
+    ResourceDetails,
+    TaskDetails,
+)
+
+MODELS: Dict[str, Type[FetcherDetails]] = {
+    "task": TaskDetails,
+    "resource": ResourceDetails,
+    "project": ProjectDetails,
+}
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    start REAL,
+    end REAL,
+    stored_at REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE INDEX IF NOT EXISTS entities_window ON entities (kind, start, end);
+CREATE TABLE IF NOT EXISTS listings (
+    kind TEXT PRIMARY KEY,
+    refreshed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS windows (
+    kind TEXT NOT NULL,
+    time_min REAL NOT NULL,
+    time_max REAL NOT NULL,
+    refreshed_at REAL NOT NULL
+);
+"""
+
+
+def _window_ts(item: FetcherDetails, field: str) -> Optional[float]:
+    """Seconds of a task start or end, None for other entities."""
+    t = getattr(item, field, None)
+    return to_seconds(t) if t is not None else None
+
+
+def _from_ts(ts: float, tz: Optional[datetime.tzinfo] = None) -> datetime.datetime:
+    """Seconds back to a datetime, naive UTC unless tz is given."""
+    t = _EPOCH + datetime.timedelta(seconds=ts)
+    if tz is None:
+        return t
+    return t.replace(tzinfo=datetime.timezone.utc).astimezone(tz)
+
+
+class EntityCache:
+    """SQLite cache of parsed Ganttic entities."""
+
+    def __init__(self, path: str = ":memory:", ttl: float = 3600.0):
+        """Entity cache in SQLite.
+
+        Args:
+            path: SQLite database file, in memory by default
+            ttl: Seconds cached entities, listings and task windows are
+                considered fresh
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Closes the database."""
+        self._conn.close()
+
+    def _fresh_since(self) -> float:
+        """Oldest refresh time still considered fresh."""
+        return time.time() - self.ttl
+
+    def _load(self, kind: str, rows: Iterable[Tuple[str]]) -> List[FetcherDetails]:
+        """Loads models from stored rows."""
+        model = MODELS.get(kind, FetcherDetails)
+        return [model.parse_raw(row[0]) for row in rows]
+
+    def _upsert(self, kind: str, items: Iterable[FetcherDetails], now: float):
+        """Stores items over previous versions, with the lock held."""
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    kind,
+                    item.id,
+                    _window_ts(item, "start"),
+                    _window_ts(item, "end"),
+                    now,
+                    item.json(),
+                )
+                for item in items
+                if item.id is not None
+            ),
+        )
+
+    def get(self, kind: str, item_id: str) -> Optional[FetcherDetails]:
+        """Gets a fresh cached entity.
+
+        Args:
+            kind: One of either task, resource or project
+            item_id: Entity id
+
+        Returns: The entity, or None if missing or stale.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM entities WHERE kind = ? AND id = ? "
+                "AND stored_at >= ?",
+                (kind, item_id, self._fresh_since()),
+            ).fetchall()
+        items = self._load(kind, rows)
+        return items[0] if items else None
+
+    def put(self, kind: str, items: Iterable[FetcherDetails]) -> None:
+        """Stores entities.
+
+        Args:
+            kind: One of either task, resource or project
+            items: Parsed entities
+        """
+        with self._lock, self._conn:
+            self._upsert(kind, items, time.time())
+
+    def delete(self, kind: str, ids: Iterable[str]) -> None:
+        """Drops entities, e.g. after writing them.
+
+        Args:
+            kind: One of either task, resource or project
+            ids: Entity ids
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM entities WHERE kind = ? AND id = ?",
+                ((kind, item_id) for item_id in ids),
+            )
+
+    def invalidate_listing(self, kind: str) -> None:
+        """Marks a listing and its time windows as stale.
+
+        E.g. after a write, so the next get_* call fetches them again.
+        Cached entities are kept and still serve the details.
+
+        Args:
+            kind: One of either task, resource or project
+        """
+        with self._lock, self._conn:
+            for table in ("listings", "windows"):
+                self._conn.execute(f"DELETE FROM {table} WHERE kind = ?", (kind,))
+
+    def get_list(self, kind: str) -> Optional[List[FetcherDetails]]:
+        """Gets a whole listing, if it was refreshed within the TTL.
+
+        Args:
+            kind: One of either resource or project
+
+        Returns: The cached entities, or None if the listing is stale.
+        """
+        with self._lock:
+            fresh = self._conn.execute(
+                "SELECT 1 FROM listings WHERE kind = ? AND refreshed_at >= ?",
+                (kind, self._fresh_since()),
+            ).fetchone()
+            if fresh is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT data FROM entities WHERE kind = ? ORDER BY rowid", (kind,)
+            ).fetchall()
+        return self._load(kind, rows)
+
+    def put_list(self, kind: str, items: Iterable[FetcherDetails]) -> None:
+        """Replaces a whole listing.
+
+        Args:
+            kind: One of either resource or project
+            items: Every entity of the listing
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entities WHERE kind = ?", (kind,))
+            self._upsert(kind, items, now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO listings VALUES (?, ?)", (kind, now)
+            )
+
+    def missing_windows(
+        self, timeMin: datetime.datetime, timeMax: datetime.datetime
+    ) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+        """Parts of a time range not covered by a fresh task window.
+
+        Args:
+            timeMin: Start of the range
+            timeMax: End of the range
+
+        Returns: List of (start, end) windows to fetch, in the timezone
+            of timeMin, as requests format their local time.
+        """
+        t_min, t_max = to_seconds(timeMin), to_seconds(timeMax)
+        with self._lock:
+            covered = self._conn.execute(
+                "SELECT time_min, time_max FROM windows WHERE kind = 'task' "
+                "AND refreshed_at >= ? AND time_max >= ? AND time_min <= ? "
+                "ORDER BY time_min",
+                (self._fresh_since(), t_min, t_max),
+            ).fetchall()
+        missing = []
+        start = t_min
+        for w_min, w_max in covered:
+            if w_min > start:
+                missing.append((start, min(w_min, t_max)))
+            start = max(start, w_max)
+            if start >= t_max:
+                break
+        if start < t_max:
+            missing.append((start, t_max))
+        # Keep the caller datetimes at the edges, and their clock inside
+        tz = timeMin.tzinfo
+        return [
+            (
+                timeMin if w_min == t_min else _from_ts(w_min, tz),
+                timeMax if w_max == t_max else _from_ts(w_max, tz),
+            )
+            for w_min, w_max in missing
+        ]
+
+    def put_window(
+        self,
+        timeMin: datetime.datetime,
+        timeMax: datetime.datetime,
+        items: Iterable[FetcherDetails],
+    ) -> None:
+        """Stores every task of a fetched time window.
+
+        Cached tasks overlapping the window that were not returned are
+        gone from Ganttic, so they are dropped.
+
+        Args:
+            timeMin: Start of the window
+            timeMax: End of the window
+            items: Every task of the window
+        """
+        t_min, t_max = to_seconds(timeMin), to_seconds(timeMax)
+        items = list(items)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS window_ids (id TEXT PRIMARY KEY)"
+            )
+            self._conn.execute("DELETE FROM window_ids")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO window_ids VALUES (?)",
+                ((item.id,) for item in items),
+            )
+            self._conn.execute(
+                "DELETE FROM entities WHERE kind = 'task' AND start <= ? "
+                "AND end >= ? AND id NOT IN (SELECT id FROM window_ids)",
+                (t_max, t_min),
+            )
+            self._upsert("task", items, now)
+            self._conn.execute(
+                "DELETE FROM windows WHERE kind = 'task' AND refreshed_at < ?",
+                (self._fresh_since(),),
+            )
+            self._conn.execute(
+                "INSERT INTO windows VALUES ('task', ?, ?, ?)", (t_min, t_max, now)
+            )
+
+    def get_window(
+        self, timeMin: datetime.datetime, timeMax: datetime.datetime
+    ) -> List[FetcherDetails]:
+        """Gets the cached tasks overlapping a time range.
+
+        Args:
+            timeMin: Start of the range
+            timeMax: End of the range
+
+        Returns: Tasks ordered by start.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM entities WHERE kind = 'task' AND start <= ? "
+                "AND end >= ? ORDER BY start, rowid",
+                (to_seconds(timeMax), to_seconds(timeMin)),
+            ).fetchall()
+        return self._load("task", rows)
+
+    def clear(self, kind: Optional[str] = None) -> None:
+        """Drops cached entities.
+
+        Args:
+            kind: Fetcher to drop, all of them if None
+        """
+        with self._lock, self._conn:
+            for table in ("entities", "listings", "windows"):
+                if kind is None:
+                    self._conn.execute(f"DELETE FROM {table}")
+                else:
+                    self._conn.execute(f"DELETE FROM {table} WHERE kind = ?", (kind,))
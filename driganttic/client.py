@@ -1,11 +1,13 @@
 """Ganttic Client API.
 
-Exceptions:
-- TODO: To write
+Exceptions (see exceptions.py):
+- GantticAPIError: The API answered with an error status, after retries.
+- RequestBudgetExceeded: The client used up its request budget.
 
 Functions (all are methods within the class):
-- TODO: [Post] create something: Task, Resource, Project.
-- TODO: [post] edit something: Task, Resource, Project
+- get_*: GET listings and details of Tasks, Resources and Projects.
+- create_*, modify_*, delete_*: write them, one by one or in
+  concurrent batches (create_tasks, modify_tasks, delete_tasks...).
 
 Dribia 2021/04/21, Oleguer Sagarra <ula@dribia.com>  # original author
 
@@ -18,11 +20,18 @@ schemas (fetcher.py). The parsing is made on the file parse.py.
 """
 
 import datetime
-from typing import Dict, Optional, Union
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import requests
 
-from driganttic import parse
+from driganttic import instrumentation, jsonlib, parse
+from driganttic.cache import EntityCache
+from driganttic.exceptions import GantticAPIError
+from driganttic.httpcache import CacheEntry, HTTPCache
+from driganttic.parsepool import ParsePool
+from driganttic.ratelimit import FairScheduler, RequestBudget, RetryPolicy, TokenBucket
 from driganttic.schemas.fetcher import (
     DataFields,
     FetcherDetails,
@@ -34,6 +43,8 @@ from driganttic.schemas.fetcher import (
     TaskDetails,
     TaskList,
 )
+from driganttic.singleflight import SingleFlight, call_key, coalesced_methods
+from driganttic.translator import LazyTranslator, TranslatorCache
 
 FETCHERS = {
     "resource": {
@@ -49,7 +60,184 @@ FETCHERS = {
 
 
 # TODO: Move defaults to config
-# TODO: Async using aiohttp?
+
+
+def _fetcher_url(
+    endpoint: str,
+    fetchers: dict,
+    fetcher_name: str,
+    fetcher_detail_id: Optional[str] = None,
+    datafields: bool = False,
+) -> str:
+    """Builds the request URL for a fetcher.
+
+    Shared by the sync and async clients so both hit the same endpoints.
+
+    Args:
+        endpoint: Api endpoint, including the version
+        fetchers: Fetcher list of options
+        fetcher_name: One of either task, resource or project
+        fetcher_detail_id: Set to a string ID if you want details on
+            a resource.
+        datafields: Set to True if you want only the custom
+            datafields for a fetcher_name
+
+    Returns: Request URL.
+    """
+    fetcher_endpoint = fetchers.get(fetcher_name, {}).get("endpoint")
+    if fetcher_endpoint is None:
+        raise NotImplementedError("Fectcher not implemented")
+    if datafields is True:
+        if fetcher_detail_id is not None:
+            raise ValueError(
+                f"Both datafields {datafields} and id {fetcher_detail_id} cannot be set"
+            )
+        fetcher_endpoint = fetcher_endpoint + "/" + "datafields"
+    if fetcher_detail_id is not None:
+        # need to erase the final 's'
+        fetcher_endpoint = fetcher_endpoint[:-1] + "/" + str(fetcher_detail_id)
+    return endpoint + "/" + fetcher_endpoint
+
+
+def _write_url(
+    endpoint: str,
+    fetchers: dict,
+    fetcher_name: str,
+    fetcher_detail_id: Optional[str] = None,
+) -> str:
+    """Builds the URL of a create (no id), modify or delete request.
+
+    Writes go to the singular endpoint, e.g. task or task/{id}.
+    """
+    if fetcher_detail_id is not None:
+        return _fetcher_url(endpoint, fetchers, fetcher_name, fetcher_detail_id)
+    return _fetcher_url(endpoint, fetchers, fetcher_name)[:-1]
+
+
+def _endpoint_template(
+    fetchers: dict,
+    fetcher_name: str,
+    fetcher_detail_id: Optional[str] = None,
+    datafields: bool = False,
+) -> str:
+    """Endpoint of a GET request as reported to the hooks.
+
+    Ids are replaced by a template, so all the detail calls are
+    reported together.
+    """
+    return _fetcher_url(
+        "",
+        fetchers,
+        fetcher_name,
+        None if fetcher_detail_id is None else "{id}",
+        datafields,
+    ).lstrip("/")
+
+
+def _request_event(
+    method: str,
+    endpoint: str,
+    params: Optional[Dict],
+    status: Optional[int],
+    size: int,
+    retries: int,
+    start: float,
+) -> instrumentation.RequestEvent:
+    """Request event of a request sent at perf_counter start."""
+    return instrumentation.RequestEvent(
+        method=method,
+        endpoint=endpoint,
+        page=(params or {}).get("page"),
+        status=status,
+        bytes=size,
+        retries=retries,
+        seconds=time.perf_counter() - start,
+    )
+
+
+SHARDS = {
+    "day": datetime.timedelta(days=1),
+    "week": datetime.timedelta(weeks=1),
+}
+
+
+def _time_windows(
+    timeMin: datetime.datetime,
+    timeMax: datetime.datetime,
+    shard: Union[str, datetime.timedelta],
+) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+    """Splits a time range in consecutive windows.
+
+    Args:
+        timeMin: Start of the range
+        timeMax: End of the range
+        shard: Window size, "day", "week", "month" or a timedelta.
+            Months are calendar months, the rest count from timeMin.
+
+    Returns: List of (start, end) windows covering the range.
+    """
+    if shard == "month":
+
+        def step(t: datetime.datetime) -> datetime.datetime:
+            first = t.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            return (first + datetime.timedelta(days=32)).replace(day=1)
+
+    else:
+        delta = SHARDS.get(shard) if isinstance(shard, str) else shard
+        if not isinstance(delta, datetime.timedelta) or delta <= datetime.timedelta():
+            raise ValueError(f"Invalid shard {shard}")
+
+        def step(t: datetime.datetime) -> datetime.datetime:
+            return t + delta
+
+    windows = []
+    start = timeMin
+    while start < timeMax:
+        end = min(step(start), timeMax)
+        windows.append((start, end))
+        start = end
+    return windows or [(timeMin, timeMax)]
+
+
+def _pooled_session(
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    pool_block: bool = False,
+    keep_alive: bool = True,
+) -> requests.Session:
+    """Builds a requests session backed by a connection pool.
+
+    Args:
+        pool_connections: Number of per-host connection pools to keep
+        pool_maxsize: Maximum connections kept alive per host
+        pool_block: If True, block instead of exceeding pool_maxsize
+        keep_alive: Set to False to close connections after each request
+
+    Returns: Requests session.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive" if keep_alive else "close"
+    return session
+
+
+def _cached_response(entry: CacheEntry, url: str) -> requests.Response:
+    """Builds a 200 response of a cached body."""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = entry.body
+    response.encoding = "utf-8"
+    response.headers["Content-Type"] = "application/json"
+    if entry.etag is not None:
+        response.headers["ETag"] = entry.etag
+    return response
 
 
 class GantticClient:
@@ -62,25 +250,130 @@ class GantticClient:
         ENDPOINT: str = "https://planner.ganttic.com/api",
         VERSION: str = "v1",
         FETCHERS: dict = FETCHERS,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        translator_cache: Optional[TranslatorCache] = None,
+        cache: Optional[EntityCache] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        retry: Optional[RetryPolicy] = None,
+        max_requests: Optional[int] = None,
+        timeout: Optional[float] = 60.0,
+        hooks: Optional[List[instrumentation.Hook]] = None,
+        validate: bool = True,
+        compact: bool = False,
+        http_cache: Optional[HTTPCache] = None,
+        json_decoder: Union[str, jsonlib.Decoder] = "auto",
+        parse_pool: Optional[ParsePool] = None,
+        session: Optional[requests.Session] = None,
+        scheduler: Optional[FairScheduler] = None,
+        coalesce: Union[bool, Iterable[str]] = False,
         **kwargs,
     ):
         """Custom Ganttic API Client.
 
         We implement standard GET methods.
 
+        The client owns a long-lived pooled session, so connections are
+        reused across calls. Close it with `close()` or use the client
+        as a context manager.
+
         Args:
             APIKEY: Api key
             ENDPOINT: Api Endpoint
             VERSION: Api version
             FETCHERS: Fetcher list of options
+            pool_connections: Number of per-host pools to keep
+            pool_maxsize: Maximum connections kept alive per host
+            pool_block: If True, never open more than pool_maxsize
+                connections per host, wait for a free one instead
+            keep_alive: Set to False to close connections after each
+                request
+            translator_cache: Optional on-disk cache of the datafields
+                responses behind the Translator
+            cache: Optional local cache of fetched entities, the getters
+                read from it while it is fresh
+            rate_limiter: Optional token bucket throttling requests, it
+                can be shared across clients
+            retry: Retry policy on 429, 5xx, timeouts and connection
+                errors. Defaults to RetryPolicy().
+            max_requests: Request budget of the client, or None
+            timeout: Seconds to wait for the server on each request
+            hooks: Instrumentation hooks of this client's requests, on
+                top of the global ones (see instrumentation.py)
+            validate: Validate the parsed models. Set to False to trust
+                the API responses and build the models without pydantic
+                validation, which is faster on large pulls.
+            compact: Store the items of the listings compactly, see
+                driganttic.compact
+            http_cache: Optional cache of the raw GET responses, served
+                while fresh, revalidated with ETags (see httpcache.py)
+            json_decoder: JSON decoder of the response bodies, "auto",
+                "json", "orjson" or a callable (see jsonlib.py)
+            parse_pool: Optional pool parsing the pages of the listings
+                while the next ones are fetched (see parsepool.py). It
+                is not closed with the client.
+            session: Optional requests session to send the requests
+                with, e.g. shared with other clients. The pool_* and
+                keep_alive arguments are then ignored, and the session
+                is not closed with the client.
+            scheduler: Optional concurrency budget shared with other
+                clients, the requests of this client count against it
+                as the API key tenant (see clientpool.py)
+            coalesce: Share one request and one parsed result among
+                identical concurrent calls: True for every getter, or
+                the names of the getters (see singleflight.py)
         """
         self.APIKEY = APIKEY
         self.ENDPOINT = ENDPOINT + "/" + VERSION
         self.VERSION = VERSION
         self.FETCHERS = FETCHERS
-        self.session = requests.Session()
-        # Important: This gets the custom user defined data fields
-        self.Translator = dict((k, self._get_datafields(k)) for k in FETCHERS.keys())
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.budget = RequestBudget(max_requests)
+        self.timeout = timeout
+        self.hooks = list(hooks or [])
+        self.validate = validate
+        self.compact = compact
+        self.http_cache = http_cache
+        self.json_loads = jsonlib.get_decoder(json_decoder)
+        self.parse_pool = parse_pool
+        self.scheduler = scheduler
+        self.coalesce = coalesced_methods(coalesce)
+        self._flights = SingleFlight()
+        self._owns_session = session is None
+        self.session = session or _pooled_session(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+        )
+        # Important: This gets the custom user defined data fields.
+        # Each fetcher's Translator is only fetched on first use.
+        self.Translator = LazyTranslator(
+            self._get_datafields_response,
+            FETCHERS.keys(),
+            cache=translator_cache,
+            cache_prefix=f"{self.ENDPOINT}|{APIKEY}",
+        )
+
+    def __enter__(self) -> "GantticClient":
+        """Enters the context manager."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Closes the client on context exit."""
+        self.close()
+
+    def close(self) -> None:
+        """Closes the session and its pooled connections.
+
+        A session given to the client is left open.
+        """
+        if self._owns_session:
+            self.session.close()
 
     def _get_fetcher(
         self,
@@ -101,157 +394,875 @@ class GantticClient:
         Returns: Requests response.
 
         """
-        fetcher_endpoint = self.FETCHERS.get(fetcher_name, {}).get("endpoint")
-        if fetcher_endpoint is None:
-            raise NotImplementedError("Fectcher not implemented")
-        if datafields is True:
-            if fetcher_detail_id is not None:
-                raise ValueError(
-                    f"Both datafields {datafields} and id {fetcher_detail_id} cannot be set"
-                )
-            fetcher_endpoint = fetcher_endpoint + "/" + "datafields"
-        if fetcher_detail_id is not None:
-            # need to erase the final 's'
-            fetcher_endpoint = fetcher_endpoint[:-1] + "/" + str(fetcher_detail_id)
+        req_string = _fetcher_url(
+            self.ENDPOINT, self.FETCHERS, fetcher_name, fetcher_detail_id, datafields
+        )
         headers = {"Accept": "application/json"}
-        req_string = self.ENDPOINT + "/" + fetcher_endpoint
         kwargs["token"] = self.APIKEY
-        with self.session as session:
-            # TODO: Implement exception catching
-            return session.get(req_string, params=kwargs, headers=headers)
+        endpoint = None
+        if self.hooks or instrumentation.HOOKS:
+            endpoint = _endpoint_template(
+                self.FETCHERS, fetcher_name, fetcher_detail_id, datafields
+            )
+        if self.http_cache is None:
+            return self._send(
+                "GET", req_string, endpoint=endpoint, params=kwargs, headers=headers
+            )
+        key, entry, fresh = self.http_cache.lookup(req_string, kwargs, headers)
+        if entry is not None and fresh:
+            return _cached_response(entry, req_string)
+        response = self._send(
+            "GET", req_string, endpoint=endpoint, params=kwargs, headers=headers
+        )
+        entry = self.http_cache.update(
+            key, entry, response.status_code, response.content, response.headers
+        )
+        if entry is not None:
+            return _cached_response(entry, req_string)
+        return response
+
+    def _send(
+        self, method: str, url: str, endpoint: Optional[str] = None, **request_kwargs
+    ) -> requests.Response:
+        """Sends a request within the rate limits, retrying failures.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            endpoint: Endpoint template reported to the hooks, defaults
+                to the URL
+            request_kwargs: Extra requests.Session.request arguments
+
+        Returns: Requests response.
+
+        Raises:
+            GantticAPIError: On error statuses, after the retries
+            RequestBudgetExceeded: If the request budget is used up
+
+        POST requests are not idempotent, they are only retried on 429
+        answers: after a timeout or a 5xx the entity may exist already.
+        """
+        hooks = self.hooks + instrumentation.HOOKS
+        idempotent = method != "POST"
+        start = time.perf_counter() if hooks else 0.0
+        attempt = 0
+        response: Optional[requests.Response] = None
+        try:
+            while True:
+                self.budget.spend()
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire()
+                response = None
+                try:
+                    if self.scheduler is None:
+                        response = self.session.request(
+                            method, url, timeout=self.timeout, **request_kwargs
+                        )
+                    else:
+                        with self.scheduler.slot(self.APIKEY):
+                            response = self.session.request(
+                                method, url, timeout=self.timeout, **request_kwargs
+                            )
+                except (requests.Timeout, requests.ConnectionError):
+                    delay = self.retry.retry_delay(attempt, idempotent=idempotent)
+                    if delay is None:
+                        raise
+                else:
+                    if response.status_code < 400:
+                        return response
+                    delay = self.retry.retry_delay(
+                        attempt,
+                        response.status_code,
+                        response.headers.get("Retry-After"),
+                        idempotent,
+                    )
+                    if delay is None:
+                        raise GantticAPIError(response.status_code, url, response.text)
+                time.sleep(delay)
+                attempt += 1
+        finally:
+            if hooks:
+                instrumentation.emit_request(
+                    hooks,
+                    _request_event(
+                        method,
+                        endpoint or url,
+                        request_kwargs.get("params"),
+                        response.status_code if response is not None else None,
+                        len(response.content) if response is not None else 0,
+                        attempt,
+                        start,
+                    ),
+                )
+
+    def _json(self, response: requests.Response) -> Any:
+        """Decodes the raw body of a JSON response."""
+        if not instrumentation.HOOKS:
+            return self.json_loads(response.content)
+        with instrumentation.timed_stage("json_decode"):
+            return self.json_loads(response.content)
+
+    def _coalesced(self, method: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Calls fn, or joins the identical call in flight."""
+        if method not in self.coalesce:
+            return fn(*args, **kwargs)
+        return self._flights.do(
+            call_key(method, args, kwargs), lambda: fn(*args, **kwargs)
+        )
+
+    def _get_datafields_response(self, fetcher_name: str) -> Dict:
+        """Gets the raw datafields response of a fetcher."""
+        return self._json(self._get_fetcher(fetcher_name, datafields=True))
 
     def _get_datafields(self, fetcher_name: str) -> DataFields:
         """Gets datafields ID-valueID translation for custom fields."""
-        return parse._datafields(
-            self._get_fetcher(fetcher_name, datafields=True).json()
-        )
+        return parse._datafields(self._get_datafields_response(fetcher_name))
+
+    def _write(
+        self,
+        method: str,
+        fetcher_name: str,
+        fetcher_detail_id: Optional[str] = None,
+        fetcher_details: Optional[FetcherDetails] = None,
+    ) -> Optional[FetcherDetails]:
+        """Main unified method for write requests.
 
-    def _create_detailed(self, fetcher_name: str, fetcher_details: FetcherDetails):
+        Args:
+            method: POST to create, PUT to modify or DELETE
+            fetcher_name: One of either task, resource or project
+            fetcher_detail_id: ID of the entity to modify or delete
+            fetcher_details: Entity to write, serialized with its custom
+                fields reverse translated (see parse._serialize_details)
+
+        Returns: The written entity as answered by the API, None if the
+            answer has no body.
+        """
+        url = _write_url(self.ENDPOINT, self.FETCHERS, fetcher_name, fetcher_detail_id)
+        Translator = self.Translator.get(fetcher_name, DataFields())
+        request_kwargs: Dict[str, Any] = {
+            "params": {"token": self.APIKEY},
+            "headers": {"Accept": "application/json"},
+        }
+        if fetcher_details is not None:
+            request_kwargs["json"] = parse._serialize_details(
+                fetcher_details, fetcher_name, Translator
+            )
+        endpoint = None
+        if self.hooks or instrumentation.HOOKS:
+            endpoint = _write_url(
+                "",
+                self.FETCHERS,
+                fetcher_name,
+                None if fetcher_detail_id is None else "{id}",
+            ).lstrip("/")
+        response = self._send(method, url, endpoint=endpoint, **request_kwargs)
+        self._forget(fetcher_name, fetcher_detail_id)
+        written = None
+        if response.content.strip():
+            written = parse._fetcherdetails(
+                self._json(response),
+                fetcher_name,
+                Translator,
+                validate=self.validate,
+                owned=True,
+            )
+        if self.cache is not None and written is not None and method != "DELETE":
+            self.cache.put(fetcher_name, [written])
+        return written
+
+    def _forget(self, fetcher_name: str, fetcher_detail_id: Optional[str]) -> None:
+        """Drops the cached entity and listing of a write."""
+        if self.cache is not None:
+            if fetcher_detail_id is not None:
+                self.cache.delete(fetcher_name, [fetcher_detail_id])
+            self.cache.invalidate_listing(fetcher_name)
+        if self.http_cache is not None:
+            params = {"token": self.APIKEY}
+            if fetcher_detail_id is not None:
+                url = _fetcher_url(
+                    self.ENDPOINT, self.FETCHERS, fetcher_name, fetcher_detail_id
+                )
+                self.http_cache.invalidate(self.http_cache.key(url, params))
+            self.http_cache.invalidate_url(
+                _fetcher_url(self.ENDPOINT, self.FETCHERS, fetcher_name), params
+            )
+
+    def _create_detailed(
+        self, fetcher_name: str, fetcher_details: FetcherDetails
+    ) -> Optional[FetcherDetails]:
         """Creates detailed fetcher."""
-        # TODO: USe fetchers dict
-        raise NotImplementedError("TBD")
+        return self._write("POST", fetcher_name, fetcher_details=fetcher_details)
 
     def _modify_detailed(
         self, fetcher_name: str, fetcher_detail_id: str, fetcher_details: FetcherDetails
-    ):
-        """Creates detailed fetcher."""
-        # TODO: USe fetchers dict
-        raise NotImplementedError("TBD")
+    ) -> Optional[FetcherDetails]:
+        """Modifies detailed fetcher."""
+        return self._write("PUT", fetcher_name, fetcher_detail_id, fetcher_details)
 
-    def _delete_detailed(self, fetcher_name: str, fetcher_detail_id: str):
+    def _delete_detailed(self, fetcher_name: str, fetcher_detail_id: str) -> None:
         """Deletes detailed fetcher."""
-        # TODO: USe fetchers dict
-        raise NotImplementedError("TBD")
+        self._write("DELETE", fetcher_name, fetcher_detail_id)
+
+    def _write_many(
+        self, write: Callable[..., Any], args: List[Tuple], max_workers: int = 8
+    ) -> List[Any]:
+        """Runs writes concurrently, within the client rate limits.
+
+        Args:
+            write: Write method, e.g. _modify_detailed
+            args: Arguments of every write
+            max_workers: Requests in flight at once
+
+        Returns: Result of every write in order, or the exception it
+            raised.
+        """
+
+        def run(write_args: Tuple) -> Any:
+            try:
+                return write(*write_args)
+            except Exception as e:  # noqa: B902
+                return e
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, args))
+
+    def _create_many(
+        self,
+        fetcher_name: str,
+        fetcher_details: Iterable[FetcherDetails],
+        max_workers: int = 8,
+    ) -> List[Union[FetcherDetails, None, Exception]]:
+        """Creates many entities concurrently, see _write_many."""
+        return self._write_many(
+            self._create_detailed,
+            [(fetcher_name, details) for details in fetcher_details],
+            max_workers,
+        )
+
+    def _modify_many(
+        self,
+        fetcher_name: str,
+        fetcher_details: Iterable[FetcherDetails],
+        max_workers: int = 8,
+    ) -> Dict[str, Union[FetcherDetails, None, Exception]]:
+        """Modifies many entities concurrently, by their id.
+
+        Returns: Dict of id to the written entity, or the exception
+            raised while writing it.
+        """
+        by_id: Dict[str, FetcherDetails] = {}
+        for details in fetcher_details:
+            if details.id is None:
+                raise ValueError("Entities to modify need an id")
+            by_id[details.id] = details
+        results = self._write_many(
+            self._modify_detailed,
+            [(fetcher_name, i, details) for i, details in by_id.items()],
+            max_workers,
+        )
+        return dict(zip(by_id, results))
+
+    def _delete_many(
+        self, fetcher_name: str, ids: Iterable[str], max_workers: int = 8
+    ) -> Dict[str, Optional[Exception]]:
+        """Deletes many entities concurrently.
+
+        Returns: Dict of id to None, or the exception raised while
+            deleting it.
+        """
+        unique_ids = list(dict.fromkeys(ids))
+        results = self._write_many(
+            self._delete_detailed,
+            [(fetcher_name, i) for i in unique_ids],
+            max_workers,
+        )
+        return dict(zip(unique_ids, results))
+
+    def _iter_pages(self, *args, prefetch: bool = False, **kwargs) -> Iterator[Dict]:
+        """Iterates over the pages of an API GET call.
+
+        Args:
+            args: _get_fetcher arguments
+            prefetch: If True, the next page is requested in a
+                background thread while the current one is consumed.
+            kwargs: _get_fetcher keyword arguments
+
+        Yields: Decoded JSON pages, in order.
+        """
+
+        def fetch(page: Optional[int]) -> Dict:
+            page_kwargs = kwargs if page is None else dict(kwargs, page=page)
+            return self._json(self._get_fetcher(*args, **page_kwargs))
+
+        if not prefetch:
+            rnew = fetch(None)
+            yield rnew
+            while rnew["page"] < rnew["pageCount"]:
+                rnew = fetch(rnew["page"] + 1)
+                yield rnew
+            return
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future: Optional[Future] = executor.submit(fetch, None)
+            while future is not None:
+                rnew = future.result()
+                future = None
+                if rnew["page"] < rnew["pageCount"]:
+                    future = executor.submit(fetch, rnew["page"] + 1)
+                yield rnew
+
+    def _iter_details(
+        self, fetcher_name: str, prefetch: bool = False, **kwargs
+    ) -> Iterator[Union[FetcherDetails, TaskDetails, ResourceDetails, ProjectDetails]]:
+        """Iterates over the parsed items of a fetcher, page by page."""
+        Translator = self.Translator.get(fetcher_name, DataFields())
+        plan = parse._compile_plan(fetcher_name, Translator)
+        for rnew in self._iter_pages(fetcher_name, prefetch=prefetch, **kwargs):
+            for e in rnew.get("items", []):
+                yield parse._fetcherdetails(
+                    e,
+                    fetcher_name,
+                    Translator,
+                    plan=plan,
+                    validate=self.validate,
+                    owned=True,
+                )
 
     def _exhaust_pages(self, *args, **kwargs) -> Dict:
-        """Exhaust pages from API GET call."""
-        rnew = self._get_fetcher(*args, **kwargs).json()
-        rfinal = rnew.copy()
-        while rnew["page"] < rnew["pageCount"]:
-            kwargs["page"] = rnew["page"] + 1
-            rnew = self._get_fetcher(*args, **kwargs).json()
+        """Exhaust pages from API GET call.
+
+        Pages are decoded for this call only, the items of the next
+        pages are appended to the first one.
+        """
+        pages = self._iter_pages(*args, **kwargs)
+        rfinal = next(pages)
+        for rnew in pages:
             rfinal["items"].extend(rnew["items"])
         return rfinal
 
+    def _pooled_fetcherlist(
+        self, fetcher_name: str, **kwargs
+    ) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
+        """Fetches every page of a listing, parsed in the parse pool.
+
+        Each raw page is handed to the pool as soon as it arrives, so
+        it is parsed while the next ones are fetched.
+        """
+        assert self.parse_pool is not None
+        pool = self.parse_pool
+        Translator = self.Translator.get(fetcher_name, DataFields())
+
+        def submit(response: requests.Response) -> Future:
+            return pool.submit(
+                response.content,
+                fetcher_name,
+                Translator,
+                validate=self.validate,
+                loads=self.json_loads,
+            )
+
+        response = self._get_fetcher(fetcher_name, **kwargs)
+        futures = [submit(response)]
+        # Only the page count is needed here
+        first = self._json(response)
+        for page in range(first["page"] + 1, first["pageCount"] + 1):
+            futures.append(submit(self._get_fetcher(fetcher_name, page=page, **kwargs)))
+        items = [item for future in futures for item in future.result()]
+        return parse._fetcherlist_from_items(
+            items,
+            fetcher_name,
+            Translator,
+            first["pageCount"],
+            first["page"],
+            compact=self.compact,
+        )
+
+    def _exhaust_windows(
+        self,
+        timeMin: datetime.datetime,
+        timeMax: datetime.datetime,
+        shard: Union[str, datetime.timedelta],
+        max_workers: int = 4,
+        **kwargs,
+    ) -> Dict:
+        """Exhaust task pages of a time range split in windows.
+
+        Windows are fetched in parallel and tasks spanning several
+        windows are kept once, in the order they are first seen. Tasks
+        without an id cannot be told apart, they are all kept. The
+        merged response is a single page.
+        """
+        windows = _time_windows(timeMin, timeMax, shard)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            rnews = list(
+                executor.map(
+                    lambda w: self._exhaust_pages(
+                        "task",
+                        timeMin=w[0].strftime("%Y-%m-%d %H:%M"),
+                        timeMax=w[1].strftime("%Y-%m-%d %H:%M"),
+                        **kwargs,
+                    ),
+                    windows,
+                )
+            )
+        items: List[Dict] = []
+        seen = set()
+        for rnew in rnews:
+            for e in rnew["items"]:
+                item_id = e.get("id")
+                if item_id is None:
+                    items.append(e)
+                elif item_id not in seen:
+                    seen.add(item_id)
+                    items.append(e)
+        return {"items": items, "page": 1, "pageCount": 1}
+
     def get_tasks(
-        self, timeMin: datetime.datetime, timeMax: datetime.datetime, **kwargs
+        self,
+        timeMin: datetime.datetime,
+        timeMax: datetime.datetime,
+        shard: Optional[Union[str, datetime.timedelta]] = None,
+        max_workers: int = 4,
+        **kwargs,
     ) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
-        """Gets tasks."""
-        return parse._fetcherlist(
-            self._exhaust_pages(
+        """Gets tasks.
+
+        Args:
+            timeMin: Start of the time range
+            timeMax: End of the time range
+            shard: Optionally split the range in windows fetched in
+                parallel: "day", "week", "month" or a timedelta.
+            max_workers: Parallel windows when sharding
+            kwargs: Extra Ganttic API GET parameters
+
+        Returns: Task list.
+        """
+        return self._coalesced(
+            "get_tasks", self._get_tasks, timeMin, timeMax, shard, max_workers, **kwargs
+        )
+
+    def _get_tasks(
+        self,
+        timeMin: datetime.datetime,
+        timeMax: datetime.datetime,
+        shard: Optional[Union[str, datetime.timedelta]] = None,
+        max_workers: int = 4,
+        **kwargs,
+    ) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
+        """Gets tasks, see get_tasks."""
+        if self.cache is not None and not kwargs:
+            return self._get_cached_tasks(timeMin, timeMax, shard, max_workers)
+        if self.parse_pool is not None and shard is None:
+            return self._pooled_fetcherlist(
                 "task",
                 timeMin=timeMin.strftime("%Y-%m-%d %H:%M"),
                 timeMax=timeMax.strftime("%Y-%m-%d %H:%M"),
                 **kwargs,
-            ),
+            )
+        return parse._fetcherlist(
+            self._get_tasks_response(timeMin, timeMax, shard, max_workers, **kwargs),
             "task",
             self.Translator.get("task", DataFields()),
+            validate=self.validate,
+            compact=self.compact,
+            owned=True,
+        )
+
+    def _get_tasks_response(
+        self,
+        timeMin: datetime.datetime,
+        timeMax: datetime.datetime,
+        shard: Optional[Union[str, datetime.timedelta]] = None,
+        max_workers: int = 4,
+        **kwargs,
+    ) -> Dict:
+        """Gets every raw task page of a time range, merged."""
+        if shard is None:
+            return self._exhaust_pages(
+                "task",
+                timeMin=timeMin.strftime("%Y-%m-%d %H:%M"),
+                timeMax=timeMax.strftime("%Y-%m-%d %H:%M"),
+                **kwargs,
+            )
+        return self._exhaust_windows(
+            timeMin, timeMax, shard, max_workers=max_workers, **kwargs
+        )
+
+    def _get_cached_tasks(
+        self,
+        timeMin: datetime.datetime,
+        timeMax: datetime.datetime,
+        shard: Optional[Union[str, datetime.timedelta]] = None,
+        max_workers: int = 4,
+    ) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
+        """Gets tasks through the cache, fetching uncovered windows."""
+        assert self.cache is not None
+        Translator = self.Translator.get("task", DataFields())
+        for wMin, wMax in self.cache.missing_windows(timeMin, timeMax):
+            if shard is None:
+                response = self._exhaust_pages(
+                    "task",
+                    timeMin=wMin.strftime("%Y-%m-%d %H:%M"),
+                    timeMax=wMax.strftime("%Y-%m-%d %H:%M"),
+                )
+            else:
+                response = self._exhaust_windows(
+                    wMin, wMax, shard, max_workers=max_workers
+                )
+            fetched = parse._fetcherlist(
+                response, "task", Translator, validate=self.validate, owned=True
+            )
+            self.cache.put_window(wMin, wMax, fetched.fetched_items)
+        items = self.cache.get_window(timeMin, timeMax)
+        return parse._fetcherlist_from_items(
+            items, "task", Translator, compact=self.compact
+        )
+
+    def _get_cached_list(
+        self, fetcher_name: str
+    ) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
+        """Gets a whole listing through the cache."""
+        assert self.cache is not None
+        Translator = self.Translator.get(fetcher_name, DataFields())
+        items = self.cache.get_list(fetcher_name)
+        if items is not None:
+            return parse._fetcherlist_from_items(
+                items, fetcher_name, Translator, compact=self.compact
+            )
+        fetched = parse._fetcherlist(
+            self._exhaust_pages(fetcher_name),
+            fetcher_name,
+            Translator,
+            validate=self.validate,
+            compact=self.compact,
+            owned=True,
+        )
+        self.cache.put_list(fetcher_name, fetched.fetched_items)
+        return fetched
+
+    def _get_details(
+        self, fetcher_name: str, fetcher_detail_id: str, **kwargs
+    ) -> Union[FetcherDetails, TaskDetails, ResourceDetails, ProjectDetails]:
+        """Gets details of one entity, through the cache if any."""
+        cache = self.cache if not kwargs else None
+        if cache is not None:
+            cached = cache.get(fetcher_name, fetcher_detail_id)
+            if cached is not None:
+                return cached
+        details = parse._fetcherdetails(
+            self._json(
+                self._get_fetcher(
+                    fetcher_name, fetcher_detail_id=fetcher_detail_id, **kwargs
+                )
+            ),
+            fetcher_name,
+            self.Translator.get(fetcher_name, DataFields()),
+            validate=self.validate,
+            owned=True,
+        )
+        if cache is not None:
+            cache.put(fetcher_name, [details])
+        return details
+
+    def _get_details_many(
+        self, fetcher_name: str, ids: Iterable[str], max_workers: int = 8, **kwargs
+    ) -> Dict[
+        str,
+        Union[FetcherDetails, TaskDetails, ResourceDetails, ProjectDetails, Exception],
+    ]:
+        """Gets details of many entities concurrently.
+
+        Args:
+            fetcher_name: One of either task, resource or project
+            ids: Entity ids, duplicates are fetched once
+            max_workers: Requests in flight at once
+            kwargs: Extra Ganttic API GET parameters
+
+        Returns: Dict of id to details, in input order. Failed ids map
+            to the exception raised while fetching or parsing them.
+        """
+        unique_ids = list(dict.fromkeys(ids))
+
+        def fetch(fetcher_detail_id: str):
+            try:
+                return self._coalesced(
+                    f"get_{fetcher_name}_details",
+                    self._get_details,
+                    fetcher_name,
+                    fetcher_detail_id,
+                    **kwargs,
+                )
+            except Exception as e:  # noqa: B902
+                return e
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(unique_ids, executor.map(fetch, unique_ids)))
+
+    def _get_list(
+        self, fetcher_name: str, **kwargs
+    ) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
+        """Gets a whole listing of projects or resources."""
+        if self.cache is not None and not kwargs:
+            return self._get_cached_list(fetcher_name)
+        if self.parse_pool is not None:
+            return self._pooled_fetcherlist(fetcher_name, **kwargs)
+        return parse._fetcherlist(
+            self._exhaust_pages(fetcher_name, **kwargs),
+            fetcher_name,
+            self.Translator.get(fetcher_name, DataFields()),
+            validate=self.validate,
+            compact=self.compact,
+            owned=True,
         )
 
     def get_projects(
         self, **kwargs
     ) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
         """Gets projects."""
-        return parse._fetcherlist(
-            self._exhaust_pages("project", **kwargs),
-            "project",
-            self.Translator.get("project", DataFields()),
-        )
+        return self._coalesced("get_projects", self._get_list, "project", **kwargs)
 
     def get_resources(
         self, **kwargs
     ) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
         """Gets resources."""
-        return parse._fetcherlist(
-            self._exhaust_pages("resource", **kwargs),
+        return self._coalesced("get_resources", self._get_list, "resource", **kwargs)
+
+    def get_task_columns(
+        self,
+        timeMin: datetime.datetime,
+        timeMax: datetime.datetime,
+        shard: Optional[Union[str, datetime.timedelta]] = None,
+        max_workers: int = 4,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Gets tasks as columns, without parsing them into models.
+
+        Columns are always fetched from the API, bypassing the cache.
+        Requires numpy, see driganttic.columnar.
+
+        Args:
+            timeMin: Start of the time range
+            timeMax: End of the time range
+            shard: Optionally split the range in windows fetched in
+                parallel: "day", "week", "month" or a timedelta.
+            max_workers: Parallel windows when sharding
+            kwargs: Extra Ganttic API GET parameters
+
+        Returns: Dict of field name to NumPy array.
+        """
+        from driganttic import columnar
+
+        response = self._get_tasks_response(
+            timeMin, timeMax, shard, max_workers, **kwargs
+        )
+        return columnar.to_columns(
+            response.get("items", []), "task", self.Translator.get("task", DataFields())
+        )
+
+    def get_project_columns(self, **kwargs) -> Dict[str, Any]:
+        """Gets projects as columns, see get_task_columns."""
+        from driganttic import columnar
+
+        return columnar.to_columns(
+            self._exhaust_pages("project", **kwargs).get("items", []),
+            "project",
+            self.Translator.get("project", DataFields()),
+        )
+
+    def get_resource_columns(self, **kwargs) -> Dict[str, Any]:
+        """Gets resources as columns, see get_task_columns."""
+        from driganttic import columnar
+
+        return columnar.to_columns(
+            self._exhaust_pages("resource", **kwargs).get("items", []),
             "resource",
             self.Translator.get("resource", DataFields()),
         )
 
+    def iter_tasks(
+        self,
+        timeMin: datetime.datetime,
+        timeMax: datetime.datetime,
+        prefetch: bool = False,
+        **kwargs,
+    ) -> Iterator[Union[FetcherDetails, TaskDetails]]:
+        """Iterates over tasks, fetching one page at a time.
+
+        Only one page is held in memory, so long exports run in constant
+        memory. Set prefetch to fetch the next page while consuming one.
+        """
+        return self._iter_details(
+            "task",
+            prefetch=prefetch,
+            timeMin=timeMin.strftime("%Y-%m-%d %H:%M"),
+            timeMax=timeMax.strftime("%Y-%m-%d %H:%M"),
+            **kwargs,
+        )
+
+    def iter_projects(
+        self, prefetch: bool = False, **kwargs
+    ) -> Iterator[Union[FetcherDetails, ProjectDetails]]:
+        """Iterates over projects, fetching one page at a time."""
+        return self._iter_details("project", prefetch=prefetch, **kwargs)
+
+    def iter_resources(
+        self, prefetch: bool = False, **kwargs
+    ) -> Iterator[Union[FetcherDetails, ResourceDetails]]:
+        """Iterates over resources, fetching one page at a time."""
+        return self._iter_details("resource", prefetch=prefetch, **kwargs)
+
     def get_task_details(
         self, taskId: str, **kwargs
     ) -> Union[FetcherDetails, TaskDetails, ResourceDetails, ProjectDetails]:
         """Gets details from task."""
-        return parse._fetcherdetails(
-            self._get_fetcher("task", fetcher_detail_id=taskId, **kwargs).json(),
-            "task",
-            self.Translator.get("task", DataFields()),
+        return self._coalesced(
+            "get_task_details", self._get_details, "task", taskId, **kwargs
         )
 
     def get_resource_details(
         self, resourceId: str, **kwargs
     ) -> Union[FetcherDetails, TaskDetails, ResourceDetails, ProjectDetails]:
         """Gets details from resource."""
-        return parse._fetcherdetails(
-            self._get_fetcher(
-                "resource", fetcher_detail_id=resourceId, **kwargs
-            ).json(),
-            "resource",
-            self.Translator.get("resource", DataFields()),
+        return self._coalesced(
+            "get_resource_details", self._get_details, "resource", resourceId, **kwargs
         )
 
     def get_project_details(
         self, projectId: str, **kwargs
     ) -> Union[FetcherDetails, TaskDetails, ResourceDetails, ProjectDetails]:
         """Gets details from project."""
-        return parse._fetcherdetails(
-            self._get_fetcher("project", fetcher_detail_id=projectId, **kwargs).json(),
-            "project",
-            self.Translator.get("project", DataFields()),
+        return self._coalesced(
+            "get_project_details", self._get_details, "project", projectId, **kwargs
         )
 
-    def create_task(self, TaskData: TaskDetails):
-        """Creates detailed task."""
+    def get_task_details_many(
+        self, taskIds: Iterable[str], max_workers: int = 8, **kwargs
+    ) -> Dict[str, Union[FetcherDetails, TaskDetails, Exception]]:
+        """Gets details from many tasks concurrently."""
+        return self._get_details_many("task", taskIds, max_workers, **kwargs)
+
+    def get_resource_details_many(
+        self, resourceIds: Iterable[str], max_workers: int = 8, **kwargs
+    ) -> Dict[str, Union[FetcherDetails, ResourceDetails, Exception]]:
+        """Gets details from many resources concurrently."""
+        return self._get_details_many("resource", resourceIds, max_workers, **kwargs)
+
+    def get_project_details_many(
+        self, projectIds: Iterable[str], max_workers: int = 8, **kwargs
+    ) -> Dict[str, Union[FetcherDetails, ProjectDetails, Exception]]:
+        """Gets details from many projects concurrently."""
+        return self._get_details_many("project", projectIds, max_workers, **kwargs)
+
+    def create_task(self, TaskData: TaskDetails) -> Optional[FetcherDetails]:
+        """Creates a task."""
         return self._create_detailed("task", TaskData)
 
-    def modify_task(self, taskId: str, TaskData: TaskDetails):
-        """Gets stuff."""
+    def modify_task(
+        self, taskId: str, TaskData: TaskDetails
+    ) -> Optional[FetcherDetails]:
+        """Modifies a task."""
         return self._modify_detailed("task", taskId, TaskData)
 
-    def delete_task(self, taskId: str):
-        """Gets stuff."""
+    def delete_task(self, taskId: str) -> None:
+        """Deletes a task."""
         return self._delete_detailed("task", taskId)
 
-    def create_resource(self, ResourceData: ResourceDetails):
-        """Gets stuff."""
+    def create_resource(
+        self, ResourceData: ResourceDetails
+    ) -> Optional[FetcherDetails]:
+        """Creates a resource."""
         return self._create_detailed("resource", ResourceData)
 
-    def modify_resource(self, resourceId: str, ResourceData: ResourceDetails):
-        """Gets stuff."""
+    def modify_resource(
+        self, resourceId: str, ResourceData: ResourceDetails
+    ) -> Optional[FetcherDetails]:
+        """Modifies a resource."""
         return self._modify_detailed("resource", resourceId, ResourceData)
 
-    def delete_resource(self, resourceId: str):
-        """Gets stuff."""
+    def delete_resource(self, resourceId: str) -> None:
+        """Deletes a resource."""
         return self._delete_detailed("resource", resourceId)
 
-    def create_project(self, ProjectData: ProjectDetails):
-        """Gets stuff."""
+    def create_project(self, ProjectData: ProjectDetails) -> Optional[FetcherDetails]:
+        """Creates a project."""
         return self._create_detailed("project", ProjectData)
 
-    def modify_project(self, projectId: str, ProjectData: ProjectDetails):
-        """Gets stuff."""
+    def modify_project(
+        self, projectId: str, ProjectData: ProjectDetails
+    ) -> Optional[FetcherDetails]:
+        """Modifies a project."""
         return self._modify_detailed("project", projectId, ProjectData)
 
-    def delete_project(self, projectId: str):
-        """Gets stuff."""
+    def delete_project(self, projectId: str) -> None:
+        """Deletes a project."""
         return self._delete_detailed("project", projectId)
+
+    def create_tasks(
+        self, Tasks: Iterable[TaskDetails], max_workers: int = 8
+    ) -> List[Union[FetcherDetails, None, Exception]]:
+        """Creates many tasks concurrently.
+
+        Args:
+            Tasks: Tasks to create
+            max_workers: Requests in flight at once, the rate limiter
+                and the retry policy of the client still apply
+
+        Returns: The created task, or the exception raised while
+            creating it, of every task in order.
+        """
+        return self._create_many("task", Tasks, max_workers)
+
+    def modify_tasks(
+        self, Tasks: Iterable[TaskDetails], max_workers: int = 8
+    ) -> Dict[str, Union[FetcherDetails, None, Exception]]:
+        """Modifies many tasks concurrently, by their id.
+
+        Returns: Dict of id to the modified task, or the exception
+            raised while modifying it.
+        """
+        return self._modify_many("task", Tasks, max_workers)
+
+    def delete_tasks(
+        self, taskIds: Iterable[str], max_workers: int = 8
+    ) -> Dict[str, Optional[Exception]]:
+        """Deletes many tasks concurrently.
+
+        Returns: Dict of id to None, or the exception raised while
+            deleting it.
+        """
+        return self._delete_many("task", taskIds, max_workers)
+
+    def create_resources(
+        self, Resources: Iterable[ResourceDetails], max_workers: int = 8
+    ) -> List[Union[FetcherDetails, None, Exception]]:
+        """Creates many resources concurrently, see create_tasks."""
+        return self._create_many("resource", Resources, max_workers)
+
+    def modify_resources(
+        self, Resources: Iterable[ResourceDetails], max_workers: int = 8
+    ) -> Dict[str, Union[FetcherDetails, None, Exception]]:
+        """Modifies many resources concurrently, see modify_tasks."""
+        return self._modify_many("resource", Resources, max_workers)
+
+    def delete_resources(
+        self, resourceIds: Iterable[str], max_workers: int = 8
+    ) -> Dict[str, Optional[Exception]]:
+        """Deletes many resources concurrently, see delete_tasks."""
+        return self._delete_many("resource", resourceIds, max_workers)
+
+    def create_projects(
+        self, Projects: Iterable[ProjectDetails], max_workers: int = 8
+    ) -> List[Union[FetcherDetails, None, Exception]]:
+        """Creates many projects concurrently, see create_tasks."""
+        return self._create_many("project", Projects, max_workers)
+
+    def modify_projects(
+        self, Projects: Iterable[ProjectDetails], max_workers: int = 8
+    ) -> Dict[str, Union[FetcherDetails, None, Exception]]:
+        """Modifies many projects concurrently, see modify_tasks."""
+        return self._modify_many("project", Projects, max_workers)
+
+    def delete_projects(
+        self, projectIds: Iterable[str], max_workers: int = 8
+    ) -> Dict[str, Optional[Exception]]:
+        """Deletes many projects concurrently, see delete_tasks."""
+        return self._delete_many("project", projectIds, max_workers)
@@ -0,0 +1,187 @@
+"""Multi-tenant pool of clients.
+
+Services calling the API on behalf of many accounts need one client per
+API key. A `GantticClientPool` hands them out, all sharing:
+
+- one pooled session, so the open connections do not grow with the
+  number of tenants;
+- one `FairScheduler`, a global budget of requests in flight, handed to
+  the waiting tenants in turn so a large pull of one of them does not
+  stall the others.
+
+    with GantticClientPool(max_concurrency=16) as pool:
+        tasks = pool.client(APIKEY).get_tasks(timeMin, timeMax)
+
+Clients unused for `idle_timeout` seconds, or past `max_tenants`, are
+evicted. The Translators they loaded are kept by API key, so the
+datafields are not fetched again when the tenant comes back. Evicted
+clients still work, they are just no longer handed out.
+
+Entity caches are keyed by entity id only, so a shared one would serve
+the entities of one tenant to another: the pool builds one per API key
+with `cache_factory` instead. HTTP caches are scoped by API key, and
+parse pools receive the Translator with every page, both can be shared.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from driganttic.cache import EntityCache
+from driganttic.client import GantticClient, _pooled_session
+from driganttic.ratelimit import FairScheduler
+from driganttic.schemas.fetcher import DataFields
+
+
+class GantticClientPool:
+    """Per-API-key clients sharing a session and a request budget."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        idle_timeout: Optional[float] = 300.0,
+        max_tenants: Optional[int] = None,
+        max_translators: int = 1024,
+        pool_connections: int = 10,
+        keep_alive: bool = True,
+        cache_factory: Optional[Callable[[str], EntityCache]] = None,
+        **client_kwargs,
+    ):
+        """Client pool.
+
+        Args:
+            max_concurrency: Requests in flight at most, all tenants
+                together. It is also the connections kept per host.
+            idle_timeout: Seconds a client is kept unused, or None to
+                keep them until max_tenants
+            max_tenants: Clients kept at most, the least recently used
+                are evicted past it. Unlimited if None.
+            max_translators: API keys whose Translators are kept after
+                their client is evicted
+            pool_connections: Number of per-host pools to keep
+            keep_alive: Set to False to close connections after each
+                request
+            cache_factory: Optional function building the EntityCache
+                of an API key, called when its client is created, e.g.
+                to open one SQLite file per tenant
+            client_kwargs: Arguments of every GantticClient, e.g.
+                ENDPOINT, validate or http_cache. A cache cannot be
+                shared by the tenants, see cache_factory.
+        """
+        if "cache" in client_kwargs:
+            raise ValueError(
+                "An EntityCache is not scoped by API key, use cache_factory"
+            )
+        self.idle_timeout = idle_timeout
+        self.max_tenants = max_tenants
+        self.max_translators = max_translators
+        self.cache_factory = cache_factory
+        self.client_kwargs = client_kwargs
+        self.scheduler = FairScheduler(max_concurrency)
+        self.session = _pooled_session(
+            pool_connections=pool_connections,
+            pool_maxsize=max_concurrency,
+            keep_alive=keep_alive,
+        )
+        # Clients and their last use, least recently used first
+        self._clients: "OrderedDict[str, GantticClient]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._translators: "OrderedDict[str, Dict[str, DataFields]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "GantticClientPool":
+        """Enters the context manager."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Closes the pool on context exit."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Number of clients kept."""
+        return len(self._clients)
+
+    def __contains__(self, APIKEY: object) -> bool:
+        """Whether a client of the API key is kept."""
+        return APIKEY in self._clients
+
+    def client(self, APIKEY: str) -> GantticClient:
+        """Client of an API key, created on first use.
+
+        Also evicts the clients gone idle.
+        """
+        now = time.monotonic()
+        with self._lock:
+            client = self._clients.get(APIKEY)
+            if client is None:
+                client = GantticClient(
+                    APIKEY=APIKEY,
+                    session=self.session,
+                    scheduler=self.scheduler,
+                    cache=self.cache_factory(APIKEY) if self.cache_factory else None,
+                    **self.client_kwargs,
+                )
+                translators = self._translators.pop(APIKEY, None)
+                if translators is not None:
+                    client.Translator.preload(translators)
+                self._clients[APIKEY] = client
+            else:
+                self._clients.move_to_end(APIKEY)
+            self._last_used[APIKEY] = now
+            self._evict(now)
+        return client
+
+    def evict_idle(self) -> int:
+        """Evicts the clients gone idle.
+
+        Returns: Number of evicted clients.
+        """
+        with self._lock:
+            return self._evict(time.monotonic())
+
+    def _evict(self, now: float) -> int:
+        """Evicts idle and excess clients, with the lock held."""
+        evicted = 0
+        while self._clients:
+            APIKEY = next(iter(self._clients))
+            idle = (
+                self.idle_timeout is not None
+                and now - self._last_used[APIKEY] > self.idle_timeout
+            )
+            excess = self.max_tenants is not None and len(self._clients) > (
+                self.max_tenants
+            )
+            if not (idle or excess):
+                break
+            self._forget_client(APIKEY)
+            evicted += 1
+        return evicted
+
+    def _forget_client(self, APIKEY: str) -> None:
+        """Drops a client but keeps its Translators, lock held."""
+        client = self._clients.pop(APIKEY)
+        del self._last_used[APIKEY]
+        translators = client.Translator.loaded
+        if translators and self.max_translators > 0:
+            self._translators[APIKEY] = translators
+            while len(self._translators) > self.max_translators:
+                self._translators.popitem(last=False)
+        client.close()
+
+    def remove(self, APIKEY: str) -> None:
+        """Drops the client and the Translators of an API key."""
+        with self._lock:
+            if APIKEY in self._clients:
+                self._forget_client(APIKEY)
+            self._translators.pop(APIKEY, None)
+
+    def close(self) -> None:
+        """Drops every client and closes the shared session."""
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+            self._last_used.clear()
+            self._translators.clear()
+        self.session.close()
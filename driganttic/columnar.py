@@ -0,0 +1,196 @@
+"""Columnar export of Ganttic listings.
+
+Builds one NumPy array per field straight from the raw page dicts,
+without creating a pydantic model per item, which is much faster and
+lighter than looping over `TaskList.fetched_items` on large pulls:
+
+- Text fields (id, name, projectId ...) and list values are object
+  arrays, with None for missing values.
+- Timestamps are datetime64[ms] arrays in UTC, NaT when missing.
+- Numbers are float64 arrays, NaN when missing.
+- resources is an object array of lists of ids.
+
+Custom fields are extracted as by the parsers, following the same
+config. The columns can be written to Parquet or Feather files with
+pyarrow for bulk downstream use.
+
+NumPy and pyarrow are optional dependencies, install them with the
+`columnar` extra: `pip install driganttic[columnar]`.
+"""
+
+import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from driganttic import parse
+from driganttic.schemas.fetcher import DataFields, FetcherDetails
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+# Standard fields of every fetcher and their column kinds
+COLUMNS: Dict[str, Dict[str, str]] = {
+    "task": {
+        "id": "object",
+        "status": "object",
+        "name": "object",
+        "created": "datetime",
+        "projectId": "object",
+        "resources": "list",
+        "start": "datetime",
+        "end": "datetime",
+        "utilizationPercent": "float",
+    },
+    "resource": {
+        "id": "object",
+        "status": "object",
+        "name": "object",
+        "created": "datetime",
+    },
+    "project": {
+        "id": "object",
+        "status": "object",
+        "name": "object",
+        "created": "datetime",
+    },
+}
+# Column kinds of the custom field types
+CUSTOM_KINDS = {"dates": "datetime", "numbers": "float", "listValues": "object"}
+
+
+def _require_numpy() -> None:
+    """Raises a helpful error if NumPy is missing."""
+    if np is None:
+        raise ImportError(
+            "Columnar export requires numpy, install driganttic[columnar]"
+        )
+
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=datetime.timezone.utc)
+_MS = datetime.timedelta(milliseconds=1)
+# int64 value of NaT
+_NAT = -(2**63)
+
+
+def _epoch_ms(t: Optional[datetime.datetime]) -> int:
+    """Milliseconds since the epoch in UTC, naive datetimes are UTC."""
+    if t is None:
+        return _NAT
+    return (t - (_EPOCH if t.tzinfo is None else _EPOCH_UTC)) // _MS
+
+
+def _to_array(values: List, kind: str) -> Any:
+    """Converts a column of python values to a NumPy array."""
+    if kind == "datetime":
+        # Much faster than letting numpy convert datetime objects
+        return np.array([_epoch_ms(v) for v in values], dtype=np.int64).view(
+            "datetime64[ms]"
+        )
+    if kind == "float":
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def to_columns(
+    items: Iterable[Dict],
+    resource_name: str,
+    Translator: DataFields,
+    custom_fields: Optional[Dict] = None,
+) -> Dict[str, Any]:
+    """Builds the columns of raw Ganttic items.
+
+    Args:
+        items: Items of the Ganttic API listing pages
+        resource_name: One of either task, resource or project
+        Translator: Description of fields
+        custom_fields: Custom fields config, the loaded one if None
+
+    Returns: Dict of field name to NumPy array, in field order.
+    """
+    _require_numpy()
+    base = COLUMNS.get(resource_name, COLUMNS["resource"])
+    kinds = dict(base)
+    plan = parse._compile_plan(resource_name, Translator, custom_fields)
+    for k_c, fields in plan.items():
+        for _, v, _ in fields:
+            kinds[v] = CUSTOM_KINDS.get(k_c, "object")
+    values: Dict[str, List] = dict((name, []) for name in kinds)
+    standard = [(name, values[name], kind) for name, kind in base.items()]
+    custom = [(name, values[name]) for name in kinds if name not in base]
+    for item in items:
+        for name, column, kind in standard:
+            value = item.get(name)
+            if kind == "datetime":
+                value = parse.parse_timestamp(value)
+            column.append(value)
+        if plan:
+            extracted = parse._apply_plan(plan, item.get("dataFields", {}))
+            for name, column in custom:
+                column.append(extracted.get(name))
+    return dict((name, _to_array(values[name], kind)) for name, kind in kinds.items())
+
+
+def models_to_columns(models: Sequence[FetcherDetails]) -> Dict[str, Any]:
+    """Builds the columns of already parsed models.
+
+    Args:
+        models: Parsed models, all of the same type
+
+    Returns: Dict of field name to NumPy array, in field order.
+    """
+    _require_numpy()
+    if not models:
+        return {}
+    columns = {}
+    for name, field in type(models[0]).__fields__.items():
+        if name == "fetched_timestamp":
+            continue
+        if field.type_ is datetime.datetime:
+            kind = "datetime"
+        elif field.type_ in (float, int) and field.outer_type_ is field.type_:
+            kind = "float"
+        else:
+            kind = "object"
+        columns[name] = _to_array([getattr(m, name, None) for m in models], kind)
+    return columns
+
+
+def to_arrow(columns: Dict[str, Any]) -> Any:
+    """Converts columns to a pyarrow Table, NaN and NaT become nulls."""
+    import pyarrow as pa  # type: ignore
+
+    return pa.table(
+        dict(
+            (name, pa.array(array, from_pandas=True)) for name, array in columns.items()
+        )
+    )
+
+
+def write_parquet(columns: Dict[str, Any], path: str, **kwargs) -> None:
+    """Writes columns to a Parquet file.
+
+    Args:
+        columns: Columns, see to_columns
+        path: Destination file
+        kwargs: Extra pyarrow.parquet.write_table arguments
+    """
+    import pyarrow.parquet as pq  # type: ignore
+
+    pq.write_table(to_arrow(columns), path, **kwargs)
+
+
+def write_feather(columns: Dict[str, Any], path: str, **kwargs) -> None:
+    """Writes columns to a Feather file.
+
+    Args:
+        columns: Columns, see to_columns
+        path: Destination file
+        kwargs: Extra pyarrow.feather.write_feather arguments
+    """
+    import pyarrow.feather as feather  # type: ignore
+
+    feather.write_feather(to_arrow(columns), path, **kwargs)
@@ -0,0 +1,188 @@
+"""Compact storage of large fetched collections.
+
+A `CompactItems` holds the items of a TaskList, ResourceList or
+ProjectList field by field instead of as pydantic models:
+
+- timestamps as 64 bit integer microseconds in an array, aware ones
+  in UTC with their UTC offset in seconds alongside,
+- numbers as doubles in an array, NaN standing for None,
+- ids, names, statuses ... as interned strings, shared between items,
+- lists of strings (task resources) as shared tuples,
+- anything else as plain references.
+
+It is a read-only sequence of the same models, built on access, so
+`fetched_items` keeps its interface while a year of tasks takes a
+fraction of the memory. Models are rebuilt without validation on every
+access: they are snapshots, changes to them are not stored back.
+
+Use it with `GantticClient(compact=True)` or `FetcherList.compact()`.
+"""
+
+import datetime
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple, Type
+
+from driganttic.schemas.fetcher import FetcherDetails
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=datetime.timezone.utc)
+_US = datetime.timedelta(microseconds=1)
+# Missing timestamps
+_NONE = -(2**63)
+# UTC offset of naive timestamps
+_NAIVE = -(2**31)
+_TIMEZONES: Dict[int, datetime.timezone] = {0: datetime.timezone.utc}
+
+
+def _timezone(offset: int) -> datetime.timezone:
+    """Shared timezone of a UTC offset in seconds."""
+    tz = _TIMEZONES.get(offset)
+    if tz is None:
+        tz = _TIMEZONES.setdefault(
+            offset, datetime.timezone(datetime.timedelta(seconds=offset))
+        )
+    return tz
+
+
+def _kind(field: Any) -> str:
+    """Storage kind of a model field."""
+    if field.outer_type_ is datetime.datetime:
+        return "datetime"
+    if field.outer_type_ is float:
+        return "float"
+    if field.outer_type_ is str:
+        return "str"
+    if field.type_ is str and getattr(field.outer_type_, "__origin__", None) is list:
+        return "strlist"
+    return "object"
+
+
+class CompactItems(Sequence):
+    """Read-only sequence of models stored field by field."""
+
+    def __init__(self, model: Type[FetcherDetails], items: Iterable[Any] = ()):
+        """Compact items.
+
+        Args:
+            model: Model of the items
+            items: Items to store, they can be dropped afterwards
+        """
+        self.model = model
+        self._kinds: Dict[str, str] = dict(
+            (name, _kind(field)) for name, field in model.__fields__.items()
+        )
+        self._columns: Dict[str, Any] = {}
+        for name, kind in self._kinds.items():
+            if kind == "datetime":
+                self._columns[name] = (array("q"), array("i"))
+            elif kind == "float":
+                self._columns[name] = array("d")
+            else:
+                self._columns[name] = []
+        # Shared values: interned tuples and fields sets
+        self._shared: Dict[Any, Any] = {}
+        self._fields_sets: List[frozenset] = []
+        self._fields_set_ids = array("H")
+        self._len = 0
+        self.extend(items)
+
+    def _share(self, value: Any) -> Any:
+        """One shared instance of every equal hashable value."""
+        return self._shared.setdefault(value, value)
+
+    def append(self, item: Any) -> None:
+        """Stores a model."""
+        values = item.__dict__
+        for name, kind in self._kinds.items():
+            value = values.get(name)
+            column = self._columns[name]
+            if kind == "datetime":
+                if value is None:
+                    column[0].append(_NONE)
+                    column[1].append(_NAIVE)
+                elif value.tzinfo is None:
+                    column[0].append((value - _EPOCH) // _US)
+                    column[1].append(_NAIVE)
+                else:
+                    column[0].append((value - _EPOCH_UTC) // _US)
+                    column[1].append(int(value.utcoffset().total_seconds()))
+            elif kind == "float":
+                column.append(float("nan") if value is None else value)
+            elif kind == "str":
+                column.append(sys.intern(value) if value is not None else None)
+            elif kind == "strlist" and value is not None:
+                column.append(self._share(tuple(sys.intern(v) for v in value)))
+            else:
+                column.append(value)
+        fields_set = self._share(frozenset(item.__fields_set__))
+        if fields_set not in self._fields_sets:
+            self._fields_sets.append(fields_set)
+        self._fields_set_ids.append(self._fields_sets.index(fields_set))
+        self._len += 1
+
+    def extend(self, items: Iterable[Any]) -> None:
+        """Stores models."""
+        for item in items:
+            self.append(item)
+
+    def __len__(self) -> int:
+        """Number of items."""
+        return self._len
+
+    def _build(self, i: int) -> Any:
+        """Materializes the model of item i."""
+        data: Dict[str, Any] = {}
+        for name, kind in self._kinds.items():
+            column = self._columns[name]
+            if kind == "datetime":
+                us, offset = column[0][i], column[1][i]
+                if us == _NONE:
+                    data[name] = None
+                elif offset == _NAIVE:
+                    data[name] = _EPOCH + us * _US
+                else:
+                    data[name] = (_EPOCH_UTC + us * _US).astimezone(_timezone(offset))
+            elif kind == "float":
+                value = column[i]
+                data[name] = None if value != value else value
+            elif kind == "strlist":
+                value = column[i]
+                data[name] = list(value) if value is not None else None
+            else:
+                data[name] = column[i]
+        obj = self.model.__new__(self.model)
+        object.__setattr__(obj, "__dict__", data)
+        object.__setattr__(
+            obj, "__fields_set__", set(self._fields_sets[self._fields_set_ids[i]])
+        )
+        return obj
+
+    def __getitem__(self, i):
+        """Materializes an item, or a list of them for slices."""
+        if isinstance(i, slice):
+            return [self._build(j) for j in range(*i.indices(self._len))]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("CompactItems index out of range")
+        return self._build(i)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Materializes the items one by one."""
+        for i in range(self._len):
+            yield self._build(i)
+
+    def __eq__(self, other: object) -> bool:
+        """Equal to sequences of equal models."""
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        """Short representation."""
+        return f"CompactItems({self.model.__name__}, {self._len} items)"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """Pickles as the model and its items."""
+        return (CompactItems, (self.model, list(self)))
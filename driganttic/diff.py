@@ -0,0 +1,121 @@
+"""Change detection between two pulls.
+
+Every entity gets a fingerprint, a stable hash of its content without
+`fetched_timestamp`, so two pulls of an unchanged task match. Diffing a
+pull against the previous one, or against the fingerprints stored after
+it, tells which ids were added, modified or removed in O(n):
+
+    changes = diff.diff(previous_fingerprints, Client.get_tasks(t1, t2))
+    for task_id in changes.added + changes.modified:
+        ...
+    previous_fingerprints = changes.fingerprints  # e.g. json.dump it
+
+Fingerprints of raw API items (dicts) can be diffed the same way, to
+only parse the changed ones. Raw items and models have different
+fingerprints, compare like with like.
+"""
+
+import datetime
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Union
+
+from driganttic.schemas.fetcher import FetcherList
+
+IGNORED_FIELDS = ("fetched_timestamp",)
+
+
+def _default(value: Any) -> Any:
+    """Encodes the values json does not know."""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if hasattr(value, "__dict__"):
+        return value.__dict__
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+def _number(value: Any) -> Any:
+    """Whole floats as ints, validated and trusted models agree."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def fingerprint(item: Any) -> str:
+    """Stable content hash of an entity, a model or a raw API item.
+
+    Fields are hashed in name order, without fetched_timestamp. Whole
+    numbers hash the same as ints and floats.
+    """
+    values = item if isinstance(item, Mapping) else item.__dict__
+    content = dict(
+        (k, _number(v)) for k, v in values.items() if k not in IGNORED_FIELDS
+    )
+    encoded = json.dumps(
+        content, sort_keys=True, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def _id(item: Any) -> Any:
+    """Id of a model or a raw API item."""
+    return item.get("id") if isinstance(item, Mapping) else item.id
+
+
+def fingerprints(items: Union[FetcherList, Iterable[Any]]) -> Dict[str, str]:
+    """Fingerprints of entities by id, entities without id are skipped.
+
+    Args:
+        items: A TaskList, ResourceList or ProjectList, models or raw
+            API items
+    """
+    if isinstance(items, FetcherList):
+        items = items.fetched_items
+    fps = {}
+    for item in items:
+        item_id = _id(item)
+        if item_id is not None:
+            fps[item_id] = fingerprint(item)
+    return fps
+
+
+class Diff(NamedTuple):
+    """Changes between two pulls."""
+
+    added: List[str]
+    modified: List[str]
+    removed: List[str]
+    # Fingerprints of the current pull, to diff the next one against
+    fingerprints: Dict[str, str]
+
+    def __bool__(self) -> bool:
+        """Whether anything changed."""
+        return bool(self.added or self.modified or self.removed)
+
+
+def diff(
+    previous: Union[Mapping[str, str], FetcherList, Iterable[Any]],
+    current: Union[Mapping[str, str], FetcherList, Iterable[Any]],
+) -> Diff:
+    """Compares two pulls.
+
+    Args:
+        previous: The previous pull or its fingerprints by id
+        current: The current pull or its fingerprints by id
+
+    Returns: Added and modified ids in the current order, removed ids in
+        the previous order, and the current fingerprints.
+    """
+    before = previous if isinstance(previous, Mapping) else fingerprints(previous)
+    after = current if isinstance(current, Mapping) else fingerprints(current)
+    added, modified = [], []
+    for item_id, fp in after.items():
+        old = before.get(item_id)
+        if old is None:
+            added.append(item_id)
+        elif old != fp:
+            modified.append(item_id)
+    removed = [item_id for item_id in before if item_id not in after]
+    return Diff(added, modified, removed, dict(after))
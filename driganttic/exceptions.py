@@ -0,0 +1,28 @@
+"""Ganttic client exceptions."""
+
+from typing import Optional
+
+
+class GantticError(Exception):
+    """Base exception of the Ganttic client."""
+
+
+class GantticAPIError(GantticError):
+    """The Ganttic API answered with an error status."""
+
+    def __init__(self, status_code: int, url: str, text: Optional[str] = None):
+        """Ganttic API error.
+
+        Args:
+            status_code: HTTP status code
+            url: Requested URL, without the token
+            text: Response body
+        """
+        self.status_code = status_code
+        self.url = url
+        self.text = text
+        super().__init__(f"Ganttic API error {status_code} on {url}: {text}")
+
+
+class RequestBudgetExceeded(GantticError):
+    """The client used up its request budget."""
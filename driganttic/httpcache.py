@@ -0,0 +1,417 @@
+"""HTTP response cache of the client transport.
+
+An `HTTPCache` keeps the raw bodies of GET responses, keyed by URL and
+query parameters, and lets the clients skip or shorten repeated
+requests:
+
+    Client = GantticClient(APIKEY=..., http_cache=HTTPCache())
+
+- While an entry is fresh (its `max-age`, or the cache ttl) it is
+  served without a request.
+- Once stale, it is revalidated with `If-None-Match` / `If-Modified-
+  Since` when the server sent an `ETag` / `Last-Modified`. A 304 answer
+  has no body, the cached one is served and refreshed.
+- Responses without validators nor freshness are not stored.
+
+Entries live in a backend: `MemoryBackend` (the default) or
+`DiskBackend`, both evicting the least recently used entries past their
+size limits. The API token is never part of a key, only a digest of it,
+so tenants sharing a cache do not see each other's responses.
+
+Bodies are stored undecoded: every hit is decoded again, so the parsed
+models never share state with the cache.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple, Union
+from urllib.parse import urlencode
+
+
+class CacheEntry(NamedTuple):
+    """Cached response body and its validators."""
+
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    max_age: Optional[float]
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers revalidating the entry."""
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class MemoryBackend:
+    """In-memory LRU store of cache entries."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 2**20):
+        """Memory backend.
+
+        Args:
+            max_entries: Entries kept at most
+            max_bytes: Total body bytes kept at most
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of entries."""
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Gets an entry, marking it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Stores an entry, evicting the least recently used ones."""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            if len(entry.body) > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._bytes += len(entry.body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+
+    def delete(self, key: str) -> None:
+        """Drops an entry, if stored."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= len(entry.body)
+
+    def clear(self) -> None:
+        """Drops every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class DiskBackend:
+    """On-disk LRU store of cache entries, one file each."""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = 256 * 2**20):
+        """Disk backend.
+
+        Entries are files named after a hash of their key, holding a
+        JSON header line and the body. Their modification time is the
+        last use, the oldest files are removed past max_bytes.
+
+        Args:
+            path: Cache directory, defaults to ~/.cache/driganttic/http
+            max_bytes: Total file bytes kept at most
+        """
+        self.path = path or os.path.join(
+            os.path.expanduser("~"), ".cache", "driganttic", "http"
+        )
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes: Optional[int] = None
+
+    def _file(self, key: str) -> str:
+        """Cache file of a key."""
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, digest + ".http")
+
+    def _files(self) -> Dict[str, Tuple[float, int]]:
+        """Cache files mapped to their last use and size."""
+        files = {}
+        for name in os.listdir(self.path):
+            if name.endswith(".http"):
+                path = os.path.join(self.path, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files[path] = (stat.st_mtime, stat.st_size)
+        return files
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Gets an entry, marking it as recently used."""
+        path = self._file(key)
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                body = f.read()
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        if header.get("key") != key:
+            return None
+        return CacheEntry(
+            body=body,
+            etag=header.get("etag"),
+            last_modified=header.get("last_modified"),
+            stored_at=header.get("stored_at", 0.0),
+            max_age=header.get("max_age"),
+        )
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Stores an entry, evicting the least recently used ones."""
+        header = {
+            "key": key,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "stored_at": entry.stored_at,
+            "max_age": entry.max_age,
+        }
+        data = json.dumps(header).encode("utf-8") + b"\n" + entry.body
+        path = self._file(key)
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            if self._bytes is None:
+                self._bytes = sum(size for _, size in self._files().values())
+            try:
+                self._bytes -= os.path.getsize(path)
+            except OSError:
+                pass
+            fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self._bytes += len(data)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        """Drops an entry, if stored."""
+        path = self._file(key)
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.unlink(path)
+            except OSError:
+                return
+            if self._bytes is not None:
+                self._bytes -= size
+
+    def _evict(self) -> None:
+        """Removes the least recently used files, with the lock held."""
+        files = self._files()
+        total = sum(size for _, size in files.values())
+        for path in sorted(files, key=lambda p: files[p][0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= files[path][1]
+        self._bytes = total
+
+    def clear(self) -> None:
+        """Drops every entry."""
+        with self._lock:
+            if os.path.isdir(self.path):
+                for path in self._files():
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+            self._bytes = 0
+
+
+def _max_age(headers: Mapping[str, str]) -> Optional[float]:
+    """Freshness from Cache-Control, None when not given."""
+    for directive in headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name.lower() in ("no-cache", "no-store"):
+            return 0.0
+        if name.lower() == "max-age":
+            try:
+                return float(value.strip('"'))
+            except ValueError:
+                return 0.0
+    return None
+
+
+class HTTPCache:
+    """Cache of raw GET responses with conditional revalidation."""
+
+    def __init__(
+        self,
+        backend: Optional[Union[MemoryBackend, "DiskBackend"]] = None,
+        ttl: float = 0.0,
+    ):
+        """HTTP response cache.
+
+        Args:
+            backend: Entry store, a MemoryBackend or a DiskBackend.
+                Defaults to a MemoryBackend.
+            ttl: Seconds entries are served without a request when the
+                server does not set a max-age. With the default 0 every
+                hit is revalidated first.
+        """
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        # Time of the last invalidation of a URL, by scope and URL
+        self._invalidated: Dict[str, float] = {}
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(url: str, params: Optional[Mapping] = None) -> str:
+        """Cache key of a request.
+
+        The token parameter is replaced by a digest of it.
+        """
+        params = dict(params or {})
+        token = params.pop("token", None)
+        query = urlencode(sorted((k, str(v)) for k, v in params.items()))
+        scope = ""
+        if token is not None:
+            scope = hashlib.sha256(str(token).encode("utf-8")).hexdigest()[:16]
+        return f"{scope}|{url}?{query}"
+
+    def get(self, key: str) -> Tuple[Optional[CacheEntry], bool]:
+        """Looks up a request.
+
+        Returns: The cached entry, or None, and whether it is fresh.
+        """
+        entry = self.backend.get(key)
+        if entry is not None:
+            invalidated = self._invalidated.get(key.partition("?")[0])
+            if invalidated is not None and entry.stored_at <= invalidated:
+                self.backend.delete(key)
+                entry = None
+        if entry is None:
+            self.misses += 1
+            return None, False
+        max_age = self.ttl if entry.max_age is None else entry.max_age
+        fresh = time.time() - entry.stored_at < max_age
+        if fresh:
+            self.hits += 1
+        return entry, fresh
+
+    def lookup(
+        self, url: str, params: Mapping, headers: Dict[str, str]
+    ) -> Tuple[str, Optional[CacheEntry], bool]:
+        """Looks up a request before sending it.
+
+        Shared by the sync and async clients, whatever their transport.
+
+        Args:
+            url: Request URL
+            params: Request parameters, token included
+            headers: Request headers, the conditional ones are added
+                to them when a stale entry can be revalidated
+
+        Returns: The request key, the cached entry, or None, and
+            whether it is fresh and can be served without a request.
+        """
+        key = self.key(url, params)
+        entry, fresh = self.get(key)
+        if entry is not None and not fresh:
+            headers.update(entry.conditional_headers())
+        return key, entry, fresh
+
+    def update(
+        self,
+        key: str,
+        entry: Optional[CacheEntry],
+        status_code: int,
+        body: bytes,
+        headers: Mapping[str, str],
+    ) -> Optional[CacheEntry]:
+        """Updates the cache with the response of a looked up request.
+
+        Args:
+            key: Request key, see lookup
+            entry: Entry revalidated by the request, see lookup
+            status_code: Response status
+            body: Raw response body
+            headers: Response headers, case insensitive
+
+        Returns: The refreshed entry to serve on a 304 answer, None
+            when the response body is to be served.
+        """
+        if status_code == 304 and entry is not None:
+            return self.refresh(key, entry, headers)
+        if status_code == 200:
+            self.store(key, body, headers)
+        return None
+
+    def store(
+        self, key: str, body: bytes, headers: Mapping[str, str]
+    ) -> Optional[CacheEntry]:
+        """Stores a 200 response, if it can be reused.
+
+        Args:
+            key: Request key
+            body: Raw response body
+            headers: Response headers, case insensitive
+
+        Returns: The stored entry, or None if it was not stored.
+        """
+        if "no-store" in headers.get("Cache-Control", ""):
+            return None
+        entry = CacheEntry(
+            body=body,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            stored_at=time.time(),
+            max_age=_max_age(headers),
+        )
+        max_age = self.ttl if entry.max_age is None else entry.max_age
+        if entry.etag is None and entry.last_modified is None and max_age <= 0:
+            return None
+        self.backend.set(key, entry)
+        return entry
+
+    def refresh(
+        self, key: str, entry: CacheEntry, headers: Mapping[str, str]
+    ) -> CacheEntry:
+        """Refreshes an entry after a 304 Not Modified answer."""
+        self.revalidated += 1
+        max_age = _max_age(headers)
+        entry = entry._replace(
+            etag=headers.get("ETag") or entry.etag,
+            last_modified=headers.get("Last-Modified") or entry.last_modified,
+            stored_at=time.time(),
+            max_age=entry.max_age if max_age is None else max_age,
+        )
+        self.backend.set(key, entry)
+        return entry
+
+    def invalidate(self, key: str) -> None:
+        """Drops the entry of a request, e.g. after a write to it."""
+        self.backend.delete(key)
+
+    def invalidate_url(self, url: str, params: Optional[Mapping] = None) -> None:
+        """Drops the entries of every query to a URL.
+
+        E.g. all the pages and time ranges of a listing after a write to
+        one of its entities. Entries stored up to now are dropped when
+        next looked up.
+
+        Args:
+            url: Request URL, without query
+            params: Request parameters, only the token is used
+        """
+        self._invalidated[self.key(url, params).partition("?")[0]] = time.time()
@@ -0,0 +1,372 @@
+"""In-memory interval index of fetched tasks.
+
+`TaskIndex` answers time range, point in time and conflict queries on
+tasks without scanning them all, overall or for one resource or
+project:
+
+    index = TaskIndex(Client.get_tasks(timeMin, timeMax))
+    index.overlapping(monday, friday, resource="123")
+    index.at(now, project="456")
+    index.conflicts(resource="123")
+
+Tasks are half-open [start, end) intervals: back to back tasks do not
+overlap, and tasks with end <= start match no query. Naive datetimes
+are taken as UTC.
+
+Intervals live in centered interval trees, queried in O(log n + k).
+Trees are static, so the index grows with the logarithmic method: new
+tasks make a tree of their own and trees of similar size are merged,
+which keeps O(log n) trees and amortized O(log² n) inserts. Tasks are
+added or replaced with `update` as pages or details arrive, replaced
+versions are skipped by the queries until the next rebuild.
+"""
+
+import datetime
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from driganttic.parse import to_seconds
+from driganttic.schemas.fetcher import FetcherList, TaskDetails
+
+# (start, end, value)
+Interval = Tuple[float, float, Any]
+
+
+def _start(iv: Interval) -> float:
+    """Start of an interval."""
+    return iv[0]
+
+
+def _end(iv: Interval) -> float:
+    """End of an interval."""
+    return iv[1]
+
+
+# Subtrees this small are a single leaf, scanned linearly
+_LEAF_SIZE = 16
+
+
+class _Node:
+    """Centered interval tree node."""
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, intervals: List[Interval]):
+        """Builds the subtree of intervals sorted by start."""
+        self.left: Optional[_Node] = None
+        self.right: Optional[_Node] = None
+        if len(intervals) <= _LEAF_SIZE:
+            self.center = None
+            self.by_start = intervals
+            self.by_end = intervals
+            return
+        # The median start, its interval always stays in this node
+        center = self.center = intervals[len(intervals) // 2][0]
+        # Intervals starting after the center are a suffix
+        lo, hi = len(intervals) // 2, len(intervals)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if intervals[mid][0] > center:
+                hi = mid
+            else:
+                lo = mid + 1
+        prefix = intervals[:lo]
+        # Partitions keep the start order
+        self.by_start = [iv for iv in prefix if iv[1] > center]
+        self.by_end = sorted(self.by_start, key=_end, reverse=True)
+        left = [iv for iv in prefix if iv[1] <= center]
+        if left:
+            self.left = _Node(left)
+        if lo < len(intervals):
+            self.right = _Node(intervals[lo:])
+
+    def query(self, lo: float, hi: float, out: List[Any]) -> None:
+        """Appends the values of the intervals overlapping [lo, hi)."""
+        node: Optional[_Node] = self
+        while node is not None:
+            center = node.center
+            if center is None:
+                out.extend(iv[2] for iv in node.by_start if iv[0] < hi and iv[1] > lo)
+                return
+            if hi <= center:
+                for iv in node.by_start:
+                    if iv[0] >= hi:
+                        break
+                    out.append(iv[2])
+                node = node.left
+            elif lo >= center:
+                for iv in node.by_end:
+                    if iv[1] <= lo:
+                        break
+                    out.append(iv[2])
+                node = node.right
+            else:
+                out.extend(iv[2] for iv in node.by_start)
+                if node.left is not None:
+                    node.left.query(lo, hi, out)
+                node = node.right
+
+    def stab(self, t: float, out: List[Any]) -> None:
+        """Appends the values of the intervals containing t."""
+        node: Optional[_Node] = self
+        while node is not None:
+            center = node.center
+            if center is None:
+                out.extend(iv[2] for iv in node.by_start if iv[0] <= t < iv[1])
+                return
+            if t < center:
+                # Every interval here ends after the center
+                for iv in node.by_start:
+                    if iv[0] > t:
+                        break
+                    out.append(iv[2])
+                node = node.left
+            else:
+                # Every interval here starts at or before the center
+                for iv in node.by_end:
+                    if iv[1] <= t:
+                        break
+                    out.append(iv[2])
+                node = node.right
+
+
+class IntervalIndex:
+    """Growable set of half-open intervals with overlap queries."""
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        """Interval index.
+
+        Args:
+            intervals: Initial (start, end, value) intervals
+        """
+        # (size, tree) pairs, larger trees first
+        self._trees: List[Tuple[int, _Node]] = []
+        self._size = 0
+        self.extend(intervals)
+
+    def __len__(self) -> int:
+        """Number of intervals."""
+        return self._size
+
+    def extend(self, intervals: Iterable[Interval]) -> None:
+        """Adds intervals, merging trees of similar size."""
+        batch = [iv for iv in intervals if iv[1] > iv[0]]
+        if not batch:
+            return
+        self._size += len(batch)
+        while self._trees and self._trees[-1][0] <= len(batch):
+            _, tree = self._trees.pop()
+            batch.extend(_intervals(tree))
+        batch.sort(key=_start)
+        self._trees.append((len(batch), _Node(batch)))
+
+    def overlap(self, lo: float, hi: float) -> List[Any]:
+        """Values of the intervals overlapping [lo, hi)."""
+        out: List[Any] = []
+        if hi > lo:
+            for _, tree in self._trees:
+                tree.query(lo, hi, out)
+        return out
+
+    def at(self, t: float) -> List[Any]:
+        """Values of the intervals containing t."""
+        out: List[Any] = []
+        for _, tree in self._trees:
+            tree.stab(t, out)
+        return out
+
+
+def _intervals(tree: _Node) -> List[Interval]:
+    """Every interval of a tree."""
+    out: List[Interval] = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        out.extend(node.by_start)
+        stack.extend(n for n in (node.left, node.right) if n is not None)
+    return out
+
+
+class TaskIndex:
+    """Interval index of tasks, overall, by resource and by project."""
+
+    def __init__(self, tasks: Union[FetcherList, Iterable[TaskDetails]] = ()):
+        """Task index.
+
+        Args:
+            tasks: A TaskList or tasks to index, see update
+        """
+        self._tasks: Dict[str, TaskDetails] = {}
+        self._all = IntervalIndex()
+        self._resources: Dict[str, IntervalIndex] = {}
+        self._projects: Dict[str, IntervalIndex] = {}
+        self.resources: Dict[str, Set[str]] = {}
+        self.projects: Dict[str, Set[str]] = {}
+        self._stale = 0
+        self.update(tasks)
+
+    def __len__(self) -> int:
+        """Number of indexed tasks."""
+        return len(self._tasks)
+
+    def __contains__(self, task_id: object) -> bool:
+        """Whether a task id is indexed."""
+        return task_id in self._tasks
+
+    def get(self, task_id: str) -> Optional[TaskDetails]:
+        """Gets an indexed task by id."""
+        return self._tasks.get(task_id)
+
+    def update(self, tasks: Union[FetcherList, Iterable[TaskDetails]]) -> None:
+        """Adds tasks, replacing the indexed ones with the same id.
+
+        Args:
+            tasks: A TaskList, a page of tasks or fetched task details.
+                Tasks without id are skipped.
+        """
+        items: Iterable[Any] = (
+            tasks.fetched_items if isinstance(tasks, FetcherList) else tasks
+        )
+        added: List[Interval] = []
+        by_resource: Dict[str, List[Interval]] = {}
+        by_project: Dict[str, List[Interval]] = {}
+        for task in items:
+            if task.id is None:
+                continue
+            previous = self._tasks.get(task.id)
+            if previous is task:
+                continue
+            if previous is not None:
+                self._unlink(previous)
+            self._tasks[task.id] = task
+            interval = (to_seconds(task.start), to_seconds(task.end), task)
+            added.append(interval)
+            for resource in task.resources:
+                self.resources.setdefault(resource, set()).add(task.id)
+                by_resource.setdefault(resource, []).append(interval)
+            if task.projectId is not None:
+                self.projects.setdefault(task.projectId, set()).add(task.id)
+                by_project.setdefault(task.projectId, []).append(interval)
+        if self._stale > len(self._tasks):
+            # Mostly replaced versions in the trees, start over
+            self._rebuild()
+            return
+        self._all.extend(added)
+        for tables, grouped in (
+            (self._resources, by_resource),
+            (self._projects, by_project),
+        ):
+            for key, intervals in grouped.items():
+                index = tables.get(key)
+                if index is None:
+                    index = tables[key] = IntervalIndex()
+                index.extend(intervals)
+
+    def remove(self, task_id: str) -> None:
+        """Drops a task from the index, if indexed."""
+        task = self._tasks.pop(task_id, None)
+        if task is not None:
+            self._unlink(task)
+
+    def _unlink(self, task: TaskDetails) -> None:
+        """Forgets the id maps of a replaced or removed task."""
+        self._stale += 1
+        for resource in task.resources:
+            ids = self.resources.get(resource)
+            if ids is not None:
+                ids.discard(task.id)
+        if task.projectId is not None and task.projectId in self.projects:
+            self.projects[task.projectId].discard(task.id)
+
+    def _rebuild(self) -> None:
+        """Rebuilds every tree from the live tasks."""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        self._all = IntervalIndex()
+        self._resources.clear()
+        self._projects.clear()
+        self.resources.clear()
+        self.projects.clear()
+        self._stale = 0
+        self.update(tasks)
+
+    def _live(self, found: List[TaskDetails]) -> List[TaskDetails]:
+        """Drops replaced versions and sorts by start."""
+        tasks = self._tasks
+        return sorted(
+            (t for t in found if tasks.get(t.id) is t),  # type: ignore
+            key=lambda t: (to_seconds(t.start), t.id),
+        )
+
+    def _index(self, resource: Optional[str], project: Optional[str]):
+        """Index to query, None for an unknown resource or project."""
+        if resource is not None and project is not None:
+            raise ValueError("Filter by resource or by project, not both")
+        if resource is not None:
+            return self._resources.get(resource)
+        if project is not None:
+            return self._projects.get(project)
+        return self._all
+
+    def overlapping(
+        self,
+        timeMin: datetime.datetime,
+        timeMax: datetime.datetime,
+        resource: Optional[str] = None,
+        project: Optional[str] = None,
+    ) -> List[TaskDetails]:
+        """Tasks overlapping a time range.
+
+        Args:
+            timeMin: Start of the range
+            timeMax: End of the range, excluded
+            resource: Only tasks of this resource id
+            project: Only tasks of this project id
+
+        Returns: Tasks ordered by start.
+        """
+        index = self._index(resource, project)
+        if index is None:
+            return []
+        return self._live(index.overlap(to_seconds(timeMin), to_seconds(timeMax)))
+
+    def at(
+        self,
+        t: datetime.datetime,
+        resource: Optional[str] = None,
+        project: Optional[str] = None,
+    ) -> List[TaskDetails]:
+        """Tasks running at an instant, see overlapping."""
+        index = self._index(resource, project)
+        if index is None:
+            return []
+        return self._live(index.at(to_seconds(t)))
+
+    def conflicts(
+        self, resource: Optional[str] = None
+    ) -> List[Tuple[str, TaskDetails, TaskDetails]]:
+        """Overlapping tasks booked on the same resource.
+
+        Args:
+            resource: Only conflicts of this resource id, all if None
+
+        Returns: (resource id, earlier task, later task) triplets.
+        """
+        resources = self.resources if resource is None else [resource]
+        conflicts: List[Tuple[str, TaskDetails, TaskDetails]] = []
+        for r in sorted(resources):
+            tasks = sorted(
+                (self._tasks[i] for i in self.resources.get(r, ())),
+                key=lambda t: (to_seconds(t.start), t.id),
+            )
+            # Sweep by start, keeping the tasks still running
+            running: List[Tuple[float, str, TaskDetails]] = []
+            for task in tasks:
+                start, end = to_seconds(task.start), to_seconds(task.end)
+                while running and running[0][0] <= start:
+                    heapq.heappop(running)
+                if end <= start:
+                    continue
+                conflicts.extend((r, other, task) for _, _, other in sorted(running))
+                heapq.heappush(running, (end, task.id, task))  # type: ignore
+        return conflicts
@@ -0,0 +1,283 @@
+"""Instrumentation hooks and metrics.
+
+Hooks receive an event for every HTTP request sent by the clients
+(`RequestEvent`) and for every parsing stage (`StageEvent`):
+
+- json_decode: decoding a response body
+- datafields: building a Translator (parse._datafields)
+- custom_fields: extracting the custom fields of an item
+- validation: validating the pydantic model of an item, not emitted
+  when models are built without validation
+
+Register a hook globally with `register`, or per client with
+`GantticClient(hooks=[...])` (request events only, parse stages are
+module level). When no hook is registered nothing is timed, so the
+instrumentation costs nothing.
+
+`MetricsAggregator` is a built-in hook keeping counters and latency
+samples in memory, with percentiles and a Prometheus text exporter
+(`to_prometheus`, or `serve_metrics` to expose it over HTTP).
+"""
+
+import bisect
+import collections
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class RequestEvent(NamedTuple):
+    """One HTTP request, including its retries."""
+
+    method: str
+    endpoint: str
+    page: Optional[int]
+    status: Optional[int]
+    bytes: int
+    retries: int
+    seconds: float
+
+
+class StageEvent(NamedTuple):
+    """One parsing stage run over `items` items."""
+
+    stage: str
+    seconds: float
+    items: int = 1
+
+
+class Hook:
+    """Instrumentation hook, override the events you need."""
+
+    def on_request(self, event: RequestEvent) -> None:
+        """Called after every request."""
+
+    def on_stage(self, event: StageEvent) -> None:
+        """Called after every parsing stage."""
+
+
+# Global hooks, shared by parse and every client
+HOOKS: List[Hook] = []
+
+
+def register(hook: Hook) -> Hook:
+    """Registers a global hook."""
+    HOOKS.append(hook)
+    return hook
+
+
+def unregister(hook: Hook) -> None:
+    """Removes a global hook."""
+    HOOKS.remove(hook)
+
+
+def emit_request(hooks: List[Hook], event: RequestEvent) -> None:
+    """Sends a request event to hooks."""
+    for hook in hooks:
+        hook.on_request(event)
+
+
+def emit_stage(stage: str, seconds: float, items: int = 1) -> None:
+    """Sends a stage event to the global hooks."""
+    event = StageEvent(stage, seconds, items)
+    for hook in HOOKS:
+        hook.on_stage(event)
+
+
+@contextmanager
+def timed_stage(stage: str, items: int = 1) -> Iterator[None]:
+    """Times a block as a parsing stage, if any hook is registered."""
+    if not HOOKS:
+        yield
+        return
+    start = time.perf_counter()
+    yield
+    emit_stage(stage, time.perf_counter() - start, items)
+
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Series:
+    """Latency samples of one metric: histogram plus recent samples."""
+
+    def __init__(self, max_samples: int):
+        """Empty series."""
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.samples: Deque[float] = collections.deque(maxlen=max_samples)
+
+    def observe(self, seconds: float) -> None:
+        """Adds a sample."""
+        self.count += 1
+        self.total += seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Percentile of the recent samples, nearest rank."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class MetricsAggregator(Hook):
+    """In-memory metrics hook."""
+
+    def __init__(self, max_samples: int = 10000):
+        """Metrics aggregator.
+
+        Args:
+            max_samples: Recent samples kept per metric for percentiles
+        """
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._requests: Dict[str, _Series] = {}
+        self._stages: Dict[str, _Series] = {}
+        self._statuses: Dict[Tuple[str, Optional[int]], int] = {}
+        self._bytes: Dict[str, int] = {}
+        self._retries: Dict[str, int] = {}
+        self._items: Dict[str, int] = {}
+
+    def _series(self, table: Dict[str, _Series], key: str) -> _Series:
+        """Gets or creates a series, with the lock held."""
+        series = table.get(key)
+        if series is None:
+            series = table[key] = _Series(self.max_samples)
+        return series
+
+    def on_request(self, event: RequestEvent) -> None:
+        """Aggregates a request."""
+        with self._lock:
+            self._series(self._requests, event.endpoint).observe(event.seconds)
+            key = (event.endpoint, event.status)
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+            self._bytes[event.endpoint] = (
+                self._bytes.get(event.endpoint, 0) + event.bytes
+            )
+            self._retries[event.endpoint] = (
+                self._retries.get(event.endpoint, 0) + event.retries
+            )
+
+    def on_stage(self, event: StageEvent) -> None:
+        """Aggregates a parsing stage."""
+        with self._lock:
+            self._series(self._stages, event.stage).observe(event.seconds)
+            self._items[event.stage] = self._items.get(event.stage, 0) + event.items
+
+    def reset(self) -> None:
+        """Drops every metric."""
+        with self._lock:
+            for table in (
+                self._requests,
+                self._stages,
+                self._statuses,
+                self._bytes,
+                self._retries,
+                self._items,
+            ):
+                table.clear()
+
+    def summary(self) -> Dict[str, Dict[str, Dict]]:
+        """Counters and p50/p95/p99 latencies of requests and stages."""
+
+        def describe(series: _Series) -> Dict:
+            return {
+                "count": series.count,
+                "seconds": series.total,
+                "p50": series.percentile(50),
+                "p95": series.percentile(95),
+                "p99": series.percentile(99),
+            }
+
+        with self._lock:
+            requests = dict(
+                (
+                    k,
+                    dict(
+                        describe(v),
+                        bytes=self._bytes.get(k, 0),
+                        retries=self._retries.get(k, 0),
+                    ),
+                )
+                for k, v in self._requests.items()
+            )
+            stages = dict(
+                (k, dict(describe(v), items=self._items.get(k, 0)))
+                for k, v in self._stages.items()
+            )
+        return {"requests": requests, "stages": stages}
+
+    def to_prometheus(self) -> str:
+        """Renders the metrics in the Prometheus text format."""
+        lines: List[str] = []
+
+        def histogram(name: str, label: str, table: Dict[str, _Series]):
+            lines.append(f"# TYPE {name} histogram")
+            for key, series in sorted(table.items()):
+                cumulative = 0
+                for le, n in zip(BUCKETS + (float("inf"),), series.buckets):
+                    cumulative += n
+                    le_str = "+Inf" if le == float("inf") else repr(le)
+                    lines.append(
+                        f'{name}_bucket{{{label}="{key}",le="{le_str}"}} {cumulative}'
+                    )
+                lines.append(f'{name}_sum{{{label}="{key}"}} {series.total}')
+                lines.append(f'{name}_count{{{label}="{key}"}} {series.count}')
+
+        def counter(name: str, label: str, table: Dict[str, int]):
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(table.items()):
+                lines.append(f'{name}{{{label}="{key}"}} {value}')
+
+        with self._lock:
+            histogram("driganttic_request_seconds", "endpoint", self._requests)
+            lines.append("# TYPE driganttic_requests_total counter")
+            for (endpoint, status), value in sorted(
+                self._statuses.items(), key=lambda kv: (kv[0][0], str(kv[0][1]))
+            ):
+                lines.append(
+                    f'driganttic_requests_total{{endpoint="{endpoint}",'
+                    f'status="{status}"}} {value}'
+                )
+            counter("driganttic_response_bytes_total", "endpoint", self._bytes)
+            counter("driganttic_request_retries_total", "endpoint", self._retries)
+            histogram("driganttic_parse_stage_seconds", "stage", self._stages)
+            counter("driganttic_parse_items_total", "stage", self._items)
+        return "\n".join(lines) + "\n"
+
+
+def serve_metrics(
+    aggregator: MetricsAggregator, port: int = 0, host: str = "127.0.0.1"
+) -> ThreadingHTTPServer:
+    """Serves the aggregator metrics for Prometheus scraping.
+
+    Args:
+        aggregator: Metrics to expose
+        port: Port to listen on, a free one if 0
+        host: Interface to listen on
+
+    Returns: The running server, call shutdown() to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            """Silences the access log."""
+
+        def do_GET(self) -> None:  # noqa: N802
+            """Serves the metrics on any path."""
+            body = aggregator.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
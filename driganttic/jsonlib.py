@@ -0,0 +1,52 @@
+"""Pluggable JSON decoders.
+
+The clients decode response bodies with a `loads(bytes)` callable,
+picked by name or given directly:
+
+    GantticClient(APIKEY=..., json_decoder="orjson")
+    GantticClient(APIKEY=..., json_decoder=my_loads)
+
+- "json": the standard library decoder.
+- "orjson": orjson, if installed (see the `fast-json` extra). It
+  decodes a 5 MB task page in about half the time of json, but as
+  building the models takes most of the parsing time, the page is
+  parsed only 5 to 15% faster.
+- "auto" (the default): orjson if installed, json otherwise.
+
+Decoders take the raw body bytes, so pages go from the transport to the
+parser without being decoded to text first.
+"""
+
+import json
+from typing import Any, Callable, Dict, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+Decoder = Callable[[bytes], Any]
+
+DECODERS: Dict[str, Decoder] = {"json": json.loads}
+if orjson is not None:
+    DECODERS["orjson"] = orjson.loads
+
+
+def get_decoder(decoder: Union[str, Decoder] = "auto") -> Decoder:
+    """Resolves a JSON decoder.
+
+    Args:
+        decoder: Decoder name ("auto", "json" or "orjson") or a
+            callable decoding bytes
+
+    Returns: A callable decoding bytes.
+    """
+    if callable(decoder):
+        return decoder
+    if decoder == "auto":
+        return DECODERS.get("orjson", json.loads)
+    if decoder not in DECODERS:
+        raise ValueError(
+            f"Unknown JSON decoder {decoder}, choose among {sorted(DECODERS)}"
+        )
+    return DECODERS[decoder]
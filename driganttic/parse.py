@@ -15,13 +15,16 @@ Dribia 2021/04/21, Oleguer Sagarra <ula@dribia.com>  # original author
 
 # External modules
 import datetime
-from typing import Any, Callable, Dict, List, Optional, Union
+import functools
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
 
 import os
-import dateparser
-import yaml
 
 # Internal modules
+from driganttic import instrumentation, jsonlib
+from driganttic.compact import CompactItems
+from driganttic.schemas.base import Base
 from driganttic.schemas.fetcher import (
     DataFields,
     FetcherDetails,
@@ -35,12 +38,50 @@ from driganttic.schemas.fetcher import (
 )
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = ROOT_DIR + "/config/config.yaml"
 
-try:
-    with open(ROOT_DIR+"/config/config.yaml", "r") as f:
-        CUSTOM_FIELDS = yaml.load(f, Loader=yaml.FullLoader).get("custom_fields", {})
-except FileNotFoundError:
-    CUSTOM_FIELDS = {}
+# Custom fields config, loaded on first use so importing the parser
+# does not pay for yaml and the config file.
+_custom_fields: Optional[Dict] = None
+
+
+def _load_custom_fields(path: str) -> Dict:
+    """Loads the custom fields of a config file, empty if missing."""
+    import yaml
+
+    try:
+        with open(path, "r") as f:
+            return yaml.load(f, Loader=yaml.FullLoader).get("custom_fields", {})
+    except FileNotFoundError:
+        return {}
+
+
+def get_custom_fields() -> Dict:
+    """Custom fields config, loaded from CONFIG_PATH once."""
+    global _custom_fields
+    if _custom_fields is None:
+        _custom_fields = _load_custom_fields(CONFIG_PATH)
+    return _custom_fields
+
+
+def reload_custom_fields(path: Optional[str] = None) -> Dict:
+    """Reloads the custom fields config.
+
+    Args:
+        path: Config file to load, CONFIG_PATH if None
+
+    Returns: The new custom fields config.
+    """
+    global _custom_fields
+    _custom_fields = _load_custom_fields(path or CONFIG_PATH)
+    return _custom_fields
+
+
+def __getattr__(name: str) -> Any:
+    """Loads CUSTOM_FIELDS on first access."""
+    if name == "CUSTOM_FIELDS":
+        return get_custom_fields()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # TODO: Probably can simplify return types
@@ -48,73 +89,107 @@ def _fetcherdetails(
     response: Dict,
     resource_name: str,
     Translator: DataFields,
-    custom_fields: Dict = CUSTOM_FIELDS,
+    custom_fields: Optional[Dict] = None,
+    plan: Optional[Dict[str, List[Tuple[str, str, Any]]]] = None,
+    validate: bool = True,
+    owned: bool = False,
 ) -> Union[FetcherDetails, TaskDetails, ResourceDetails, ProjectDetails]:
-    """Parse the fetcher details."""
-    res = response.copy()
+    """Parse the fetcher details.
+
+    Args:
+        response: Ganttic API response
+        resource_name: One of either task, resource or project
+        Translator: Description of fields
+        custom_fields: Custom fields config, see _compile_plan
+        plan: Precompiled custom fields plan (see _compile_plan), it is
+            compiled from Translator and custom_fields if not given.
+        validate: Validate the model, or trust the response and build
+            it without validation (see _build_model)
+        owned: The response was decoded for this call only, so it is
+            updated in place instead of copied
+
+    Returns: Details Pydantic.
+    """
+    res = response if owned else response.copy()
     # parse custom details
     # Here pass your custom fields
-    for k_c, v_c in custom_fields.get(resource_name, {}).items():
-        lv = response.get("dataFields", {}).get(k_c, [])
-        if lv:
-            for k, v in v_c.items():
-                val2 = GET_FIELDS[k_c](lv, k, Translator.__getattribute__(k_c))
-                if val2 is not None:
-                    res[v] = val2
+    # Stages are only timed when an instrumentation hook is registered
+    timed = bool(instrumentation.HOOKS)
+    if plan is None:
+        plan = _compile_plan(resource_name, Translator, custom_fields)
+    if plan:
+        start = time.perf_counter() if timed else 0.0
+        res.update(_apply_plan(plan, response.get("dataFields", {})))
+        if timed:
+            instrumentation.emit_stage("custom_fields", time.perf_counter() - start)
     created = parse_timestamp(response.get("created"))
     if created is not None:
         res["created"] = created
+    # Trusted models are not validated, there is no validation to time
+    timed = timed and validate
+    start = time.perf_counter() if timed else 0.0
     if resource_name not in DETAIL_PARSERS.keys():
-        return FetcherDetails(**res)
+        details = _build_model(FetcherDetails, res, validate)
     else:
-        return DETAIL_PARSERS[resource_name](res, Translator)
+        details = DETAIL_PARSERS[resource_name](res, Translator, validate)
+    if timed:
+        instrumentation.emit_stage("validation", time.perf_counter() - start)
+    return details
 
 
-def _refine_taskdetails(response: Dict, Translator: DataFields) -> TaskDetails:
+def _refine_taskdetails(
+    response: Dict, Translator: DataFields, validate: bool = True
+) -> TaskDetails:
     """Parse the task details response.
 
     Args:
-        response: Ganttic API response
+        response: Ganttic API response, copied by _fetcherdetails,
+            so it is updated in place
         Translator: Description of task fields
+        validate: Validate the model
 
     Returns: Resource Details Pydantic.
     """
-    res = response.copy()
+    res = response
     start = parse_timestamp(response.get("start"))
     if start is not None:
         res["start"] = start
     end = parse_timestamp(response.get("end"))
     if end is not None:
         res["end"] = end
-    return TaskDetails(**res)
+    return _build_model(TaskDetails, res, validate)
 
 
-def _refine_resourcedetails(response: Dict, Translator: DataFields) -> ResourceDetails:
+def _refine_resourcedetails(
+    response: Dict, Translator: DataFields, validate: bool = True
+) -> ResourceDetails:
     """Parse the resource details response.
 
     Args:
         response: Ganttic API response
         Translator: Description of  fields
+        validate: Validate the model
 
     Returns: task Details Pydantic.
     """
-    res = response.copy()
-    # custom parsing
-    return ResourceDetails(**res)
+    # custom parsing, response is a copy made by _fetcherdetails
+    return _build_model(ResourceDetails, response, validate)
 
 
-def _refine_projectdetails(response: Dict, Translator: DataFields) -> ProjectDetails:
+def _refine_projectdetails(
+    response: Dict, Translator: DataFields, validate: bool = True
+) -> ProjectDetails:
     """Parse the project details response.
 
     Args:
         response: Ganttic API response
         Translator: Pydantic Translator model
+        validate: Validate the model
 
     Returns: project Details Pydantic.
     """
-    res = response.copy()
-    # custom parsing
-    return ProjectDetails(**res)
+    # custom parsing, response is a copy made by _fetcherdetails
+    return _build_model(ProjectDetails, response, validate)
 
 
 # TODO: Probably can simplify return types
@@ -122,18 +197,72 @@ def _fetcherlist(
     response: Dict,
     resource_name: str,
     Translator: DataFields,
+    custom_fields: Optional[Dict] = None,
+    validate: bool = True,
+    compact: bool = False,
+    owned: bool = False,
 ) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
-    """Parse the fetcher list."""
-    items = [
-        _fetcherdetails(e, resource_name, Translator) for e in response.get("items", [])
-    ]
+    """Parse the fetcher list.
+
+    With compact, every item is stored in a CompactItems as soon as it
+    is parsed (see driganttic.compact), so the models of the whole list
+    are never held at once. With owned, the items of the response are
+    updated in place instead of copied (see _fetcherdetails).
+    """
+    # The custom fields plan is compiled once for all the items
+    plan = _compile_plan(resource_name, Translator, custom_fields)
+    parsed = (
+        _fetcherdetails(
+            e, resource_name, Translator, custom_fields, plan, validate, owned
+        )
+        for e in response.get("items", [])
+    )
+    items: Sequence = (
+        CompactItems(DETAIL_MODELS.get(resource_name, FetcherDetails), parsed)
+        if compact
+        else list(parsed)
+    )
     pages = response.get("pageCount")
     page = response.get("page")
-    res = {"fetched_items": items, "pages": pages, "page": page}
+    return _fetcherlist_from_items(items, resource_name, Translator, pages, page)
+
+
+def _fetcherlist_from_bytes(
+    body: bytes,
+    resource_name: str,
+    Translator: DataFields,
+    loads: Callable[[bytes], Any] = jsonlib.get_decoder(),
+    **kwargs,
+) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
+    """Parse a raw fetcher list page.
+
+    The page is decoded with loads and parsed in place, see
+    _fetcherlist for the keyword arguments.
+    """
+    return _fetcherlist(loads(body), resource_name, Translator, owned=True, **kwargs)
+
+
+def _fetcherlist_from_items(
+    items: Sequence,
+    resource_name: str,
+    Translator: DataFields,
+    pages: Optional[int] = 1,
+    page: Optional[int] = 1,
+    compact: bool = False,
+) -> Union[FetcherList, TaskList, ResourceList, ProjectList]:
+    """Builds the fetcher list of already parsed items.
+
+    The items are models that were validated when parsed, so the list
+    reuses them instead of validating every item again. With compact
+    they are stored in a CompactItems.
+    """
+    if compact and not isinstance(items, CompactItems):
+        items = CompactItems(DETAIL_MODELS.get(resource_name, FetcherDetails), items)
+    res: Dict[str, Any] = {"fetched_items": items, "pages": pages, "page": page}
+    # Lists are constructed without validation, so they are not timed
     if resource_name not in LIST_PARSERS.keys():
-        return FetcherList(**res)
-    else:
-        return LIST_PARSERS[resource_name](res, Translator)
+        return FetcherList.construct(**res)
+    return LIST_PARSERS[resource_name](res, Translator)
 
 
 def _refine_tasklist(response: Dict, Translator=DataFields) -> TaskList:
@@ -145,7 +274,7 @@ def _refine_tasklist(response: Dict, Translator=DataFields) -> TaskList:
 
     Returns: task List Pydantic.
     """
-    return TaskList(**response)
+    return TaskList.construct(**response)
 
 
 def _refine_resourcelist(response: Dict, Translator=DataFields) -> ResourceList:
@@ -157,7 +286,7 @@ def _refine_resourcelist(response: Dict, Translator=DataFields) -> ResourceList:
 
     Returns: Resource List Pydantic.
     """
-    return ResourceList(**response)
+    return ResourceList.construct(**response)
 
 
 def _refine_projectlist(response: Dict, Translator=DataFields) -> ProjectList:
@@ -169,7 +298,89 @@ def _refine_projectlist(response: Dict, Translator=DataFields) -> ProjectList:
 
     Returns: project List Pydantic.
     """
-    return ProjectList(**response)
+    return ProjectList.construct(**response)
+
+
+_REQUIRED = object()
+
+
+@functools.lru_cache(maxsize=None)
+def _model_defaults(model: Type[Base]) -> Dict[str, Any]:
+    """Fields of a model in order, mapped to their defaults.
+
+    Required fields map to the _REQUIRED marker.
+    """
+    return dict(
+        (name, _REQUIRED if field.required else field.default)
+        for name, field in model.__fields__.items()
+    )
+
+
+def _to_float(value: Any) -> Any:
+    """Numbers as floats, as pydantic coerces float fields."""
+    return float(value) if type(value) is int else value
+
+
+def _to_str(value: Any) -> Any:
+    """Numbers as strings, as pydantic coerces str fields."""
+    return str(value) if type(value) in (int, float) else value
+
+
+def _to_str_list(value: Any) -> Any:
+    """Lists of numbers as lists of strings, for List[str] fields."""
+    if isinstance(value, list) and not all(type(v) is str for v in value):
+        return [_to_str(v) for v in value]
+    return value
+
+
+@functools.lru_cache(maxsize=None)
+def _model_coercers(model: Type[Base]) -> Dict[str, Callable[[Any], Any]]:
+    """Coercions of the float, str and List[str] fields of a model."""
+    coercers: Dict[str, Callable[[Any], Any]] = {}
+    for name, field in model.__fields__.items():
+        if field.outer_type_ is float:
+            coercers[name] = _to_float
+        elif field.outer_type_ is str:
+            coercers[name] = _to_str
+        elif (
+            field.type_ is str
+            and getattr(field.outer_type_, "__origin__", None) is list
+        ):
+            coercers[name] = _to_str_list
+    return coercers
+
+
+def _build_model(model: Type[Base], values: Dict, validate: bool = True) -> Any:
+    """Builds a model, validated or trusting the values.
+
+    Without validation the model is created as construct() would, but
+    sharing the field defaults instead of deep copying them, so custom
+    fields must not have mutable defaults. Values are not checked, and
+    only the cheap coercions of float, str and List[str] fields are
+    applied (ints to floats, numbers to strings), so the models hold
+    the same values as validated ones. Other values must already have
+    the field types (the parsers convert timestamps themselves). Keys
+    that are not fields are dropped, as validation would.
+    """
+    if validate:
+        return model(**values)
+    data = {}
+    fields_set = set()
+    coercers = _model_coercers(model)
+    for name, default in _model_defaults(model).items():
+        if name in values:
+            value = values[name]
+            coercer = coercers.get(name)
+            if coercer is not None and value is not None:
+                value = coercer(value)
+            data[name] = value
+            fields_set.add(name)
+        elif default is not _REQUIRED:
+            data[name] = default
+    obj = model.__new__(model)
+    object.__setattr__(obj, "__dict__", data)
+    object.__setattr__(obj, "__fields_set__", fields_set)
+    return obj
 
 
 def _datafields(response: Dict) -> DataFields:
@@ -178,6 +389,8 @@ def _datafields(response: Dict) -> DataFields:
     It generates a dict that can be referenced by id.
     """
     # TODO This probably needs heavy refactor
+    timed = bool(instrumentation.HOOKS)
+    start = time.perf_counter() if timed else 0.0
     res = response.copy()
     for k, v in res.items():
         if k == "listValues":
@@ -194,7 +407,10 @@ def _datafields(response: Dict) -> DataFields:
             )
         else:
             res[k] = _exhaust_dict(v)
-    return DataFields(**res)
+    datafields = DataFields(**res)
+    if timed:
+        instrumentation.emit_stage("datafields", time.perf_counter() - start)
+    return datafields
 
 
 def _exhaust_dict(vallist: List, field_v="id", field_k="name") -> Dict:
@@ -202,6 +418,11 @@ def _exhaust_dict(vallist: List, field_v="id", field_k="name") -> Dict:
     return dict((vvv[field_k], vvv[field_v]) for vvv in vallist)
 
 
+DETAIL_MODELS: Dict[str, Type[FetcherDetails]] = {
+    "task": TaskDetails,
+    "resource": ResourceDetails,
+    "project": ProjectDetails,
+}
 DETAIL_PARSERS: Dict[str, Callable] = {
     "task": _refine_taskdetails,
     "resource": _refine_resourcedetails,
@@ -218,16 +439,55 @@ LIST_PARSERS: Dict[str, Callable] = {
 #  can be used on none_type (it's only to define NAT)
 
 
+@functools.lru_cache(maxsize=4096)
+def _fromisoformat(timeval: str) -> Optional[datetime.datetime]:
+    """Parses the ISO 8601 timestamps Ganttic returns, None otherwise.
+
+    The API sends a handful of fixed formats (2021-04-01,
+    2021-04-01 08:00, 2021-04-01T08:00:00Z ...) and the same values
+    repeat a lot across tasks, so results are memoized. datetimes are
+    immutable, sharing them is safe.
+    """
+    if timeval.endswith("Z"):
+        # fromisoformat only understands the Z suffix from python 3.11
+        timeval = timeval[:-1] + "+00:00"
+    try:
+        return datetime.datetime.fromisoformat(timeval)
+    except ValueError:
+        return None
+
+
 def parse_timestamp(
     timeval: Optional[str], none_type=None
 ) -> Optional[datetime.datetime]:
-    """Parses timestamps robustly."""
+    """Parses timestamps robustly.
+
+    ISO formatted strings take a fast path, anything else falls back
+    to dateparser.
+    """
     if timeval is not None:
-        return dateparser.parse(timeval)
+        parsed = _fromisoformat(timeval) if isinstance(timeval, str) else None
+        if parsed is None:
+            # dateparser loads its locale data on import, only pay for
+            # it when a timestamp is not ISO formatted
+            import dateparser
+
+            parsed = dateparser.parse(timeval)
+        return parsed
     else:
         return none_type
 
 
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def to_seconds(t: datetime.datetime) -> float:
+    """Datetime to seconds since the epoch, naive ones taken as UTC."""
+    if t.tzinfo is not None:
+        return t.timestamp()
+    return (t - _EPOCH).total_seconds()
+
+
 def get_number(
     listitems: List, item_name: str, Translator_field: Dict
 ) -> Optional[float]:
@@ -291,3 +551,193 @@ GET_FIELDS: Dict[str, Callable] = {
     "texts": get_text,
     "users": get_user,
 }
+
+
+# Custom fields extraction plan.
+#
+# Calling the GET_FIELDS functions scans the whole dataFields list once
+# per requested field and item. Instead, _compile_plan resolves the
+# Translator IDs of the configured fields once per (resource type,
+# Translator), and _apply_plan indexes each item's dataFields by id
+# and fills every configured field in one pass. Results are the same
+# as with GET_FIELDS.
+
+
+def _compile_plan(
+    resource_name: str, Translator: DataFields, custom_fields: Optional[Dict] = None
+) -> Dict[str, List[Tuple[str, str, Any]]]:
+    """Compiles the custom fields extraction plan.
+
+    Args:
+        resource_name: One of either task, resource or project
+        Translator: Description of fields
+        custom_fields: Custom fields config, the loaded config file if
+            None (see get_custom_fields)
+
+    Returns: Dict of field type to (ganttic name, pydantic name,
+        translation) triplets. The translation is None when the name is
+        missing in the Translator.
+    """
+    if custom_fields is None:
+        custom_fields = get_custom_fields()
+    plan = {}
+    for k_c, v_c in (custom_fields.get(resource_name) or {}).items():
+        if not v_c:
+            continue
+        Translator_field = Translator.__getattribute__(k_c)
+        plan[k_c] = [(k, v, Translator_field.get(k) or None) for k, v in v_c.items()]
+    return plan
+
+
+def _apply_plan(
+    plan: Dict[str, List[Tuple[str, str, Any]]], data_fields: Dict
+) -> Dict[str, Any]:
+    """Extracts the custom fields of one item following a plan.
+
+    Args:
+        plan: Compiled plan, see _compile_plan
+        data_fields: The dataFields of a Ganttic API response
+
+    Returns: Dict of pydantic name to value, missing values are skipped.
+    """
+    res = {}
+    for k_c, fields in plan.items():
+        lv = data_fields.get(k_c)
+        if not lv:
+            continue
+        extractor = PLAN_EXTRACTORS.get(k_c)
+        if extractor is None:
+            # texts and users, as in GET_FIELDS
+            raise NotImplementedError("Not implemented")
+        # Keep the first value of every id, as the GET_FIELDS functions
+        index: Dict[str, Tuple[int, Dict]] = {}
+        for pos, n in enumerate(lv):
+            index.setdefault(n["id"], (pos, n))
+        for k, v, trans in fields:
+            if trans is None:
+                raise NameError(f"No such item name in Translator: {k}")
+            val = extractor(index, trans)
+            if val is not None:
+                res[v] = val
+    return res
+
+
+def _extract_number(index: Dict, trans: str) -> Optional[float]:
+    """Gets number from an indexed dataFields list."""
+    entry = index.get(trans)
+    return entry[1]["number"] if entry is not None else None
+
+
+def _extract_date(index: Dict, trans: str) -> Optional[datetime.datetime]:
+    """Gets date from an indexed dataFields list."""
+    entry = index.get(trans)
+    return parse_timestamp(entry[1]["date"]) if entry is not None else None
+
+
+def _extract_category(index: Dict, trans: Dict) -> Any:
+    """Gets category from an indexed dataFields list."""
+    entries = [index[k] for k in trans.keys() if k in index]
+    if not entries:
+        return None
+    n = min(entries, key=lambda e: e[0])[1]
+    return trans[n["id"]][n["valueId"]]
+
+
+PLAN_EXTRACTORS: Dict[str, Callable] = {
+    "listValues": _extract_category,
+    "numbers": _extract_number,
+    "dates": _extract_date,
+}
+
+
+# Serialization back to the API format, for the write requests.
+#
+# Custom fields are reverse translated with the same compiled plan as
+# the parsing: pydantic names back to their Ganttic datafield ids, and
+# list values back to their value ids.
+
+# Fields managed by the API, never written
+READ_ONLY_FIELDS = {"id", "fetched_timestamp", "created"}
+
+
+def format_timestamp(t: datetime.datetime) -> str:
+    """Formats a timestamp as the API does."""
+    return t.strftime("%Y-%m-%d %H:%M")
+
+
+def _serialize_number(trans: str, value: Any) -> Dict:
+    """Number datafield of a value."""
+    return {"id": trans, "number": value}
+
+
+def _serialize_date(trans: str, value: Any) -> Dict:
+    """Date datafield of a value."""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        value = value.strftime("%Y-%m-%d")
+    return {"id": trans, "date": value}
+
+
+def _serialize_category(trans: Dict, value: Any) -> Dict:
+    """List value datafield of a value, found by value."""
+    for list_id, values in trans.items():
+        for value_id, v in values.items():
+            if v == value:
+                return {"id": list_id, "valueId": value_id}
+    raise ValueError(f"No such list value in Translator: {value}")
+
+
+PLAN_SERIALIZERS: Dict[str, Callable] = {
+    "listValues": _serialize_category,
+    "numbers": _serialize_number,
+    "dates": _serialize_date,
+}
+
+
+def _serialize_details(
+    details: Base,
+    resource_name: str,
+    Translator: DataFields,
+    custom_fields: Optional[Dict] = None,
+    plan: Optional[Dict[str, List[Tuple[str, str, Any]]]] = None,
+) -> Dict:
+    """Serializes a model back to the API format.
+
+    Args:
+        details: Task, resource or project details
+        resource_name: One of either task, resource or project
+        Translator: Description of fields
+        custom_fields: Custom fields config, see _compile_plan
+        plan: Precompiled custom fields plan, see _compile_plan
+
+    Returns: Request body. Read only and unset (None) fields are left
+        out, custom fields go to the dataFields.
+    """
+    if plan is None:
+        plan = _compile_plan(resource_name, Translator, custom_fields)
+    custom_names = set(v for fields in plan.values() for _, v, _ in fields)
+    body: Dict[str, Any] = {}
+    for name in details.__fields__:
+        if name in READ_ONLY_FIELDS or name in custom_names:
+            continue
+        value = getattr(details, name)
+        if value is None:
+            continue
+        if isinstance(value, datetime.datetime):
+            value = format_timestamp(value)
+        body[name] = value
+    data_fields: Dict[str, List[Dict]] = {}
+    for k_c, fields in plan.items():
+        serializer = PLAN_SERIALIZERS.get(k_c)
+        for k, v, trans in fields:
+            value = getattr(details, v, None)
+            if value is None:
+                continue
+            if serializer is None:
+                # texts and users, as in GET_FIELDS
+                raise NotImplementedError("Not implemented")
+            if trans is None:
+                raise NameError(f"No such item name in Translator: {k}")
+            data_fields.setdefault(k_c, []).append(serializer(trans, value))
+    if data_fields:
+        body["dataFields"] = data_fields
+    return body
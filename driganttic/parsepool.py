@@ -0,0 +1,127 @@
+"""Parallel parsing of listing pages.
+
+Parsing large listings is CPU bound (timestamps, custom fields and
+pydantic validation), while fetching them is I/O bound. A `ParsePool`
+parses every page as soon as it is downloaded, in worker processes or
+threads, while the client fetches the next pages:
+
+    with ParsePool("process", max_workers=4) as pool:
+        Client = GantticClient(APIKEY=..., parse_pool=pool)
+        tasks = Client.get_tasks(timeMin, timeMax)
+
+Pages are merged back in order, into the same TaskList, ResourceList or
+ProjectList the client returns without a pool.
+
+Process workers receive the raw page bytes and decode them themselves.
+The Translator, the custom fields config and the parsing options are
+sent along with every page, a few kB pickled, so one pool serves
+several fetchers and clients at once without restarting its workers.
+Instrumentation stages of process workers are not reported.
+
+Thread workers share the interpreter: they only overlap parsing with
+the network, the GIL still runs one parser at a time.
+"""
+
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from driganttic import parse
+from driganttic.jsonlib import Decoder, get_decoder
+from driganttic.schemas.fetcher import DataFields
+
+
+def _parse_page(
+    body: bytes,
+    resource_name: str,
+    Translator: DataFields,
+    custom_fields: Dict,
+    validate: bool,
+    loads: Decoder,
+) -> List[Any]:
+    """Decodes a raw page and parses its items."""
+    plan = parse._compile_plan(resource_name, Translator, custom_fields)
+    return [
+        parse._fetcherdetails(
+            e, resource_name, Translator, custom_fields, plan, validate, owned=True
+        )
+        for e in loads(body).get("items", [])
+    ]
+
+
+class ParsePool:
+    """Process or thread pool parsing listing pages."""
+
+    def __init__(self, kind: str = "process", max_workers: Optional[int] = None):
+        """Parse pool.
+
+        The pool can be shared by several clients and threads.
+
+        Args:
+            kind: "process" or "thread"
+            max_workers: Workers of the pool, the executor default if
+                None
+        """
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Invalid parse pool kind {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "ParsePool":
+        """Enters the context manager."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Shuts the pool down on context exit."""
+        self.close()
+
+    def close(self) -> None:
+        """Shuts the workers down, they restart on the next submit."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def submit(
+        self,
+        body: bytes,
+        resource_name: str,
+        Translator: DataFields,
+        custom_fields: Optional[Dict] = None,
+        validate: bool = True,
+        loads: Optional[Decoder] = None,
+    ) -> "Future[List[Any]]":
+        """Parses the items of a raw page in the pool.
+
+        Args:
+            body: Raw page body
+            resource_name: One of either task, resource or project
+            Translator: Description of fields
+            custom_fields: Custom fields config, see parse
+            validate: Validate the models
+            loads: JSON decoder of the page, it must be picklable for
+                process pools. Defaults to jsonlib.get_decoder().
+
+        Returns: Future of the parsed items of the page, in order.
+        """
+        if custom_fields is None:
+            custom_fields = parse.get_custom_fields()
+        if loads is None:
+            loads = get_decoder()
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(self.max_workers)
+                else:
+                    self._executor = ThreadPoolExecutor(self.max_workers)
+            return self._executor.submit(
+                _parse_page,
+                body,
+                resource_name,
+                Translator,
+                custom_fields,
+                validate,
+                loads,
+            )
@@ -0,0 +1,278 @@
+"""Client-side rate limiting and retries.
+
+- `TokenBucket`: throttles requests to a sustained rate with bursts. A
+  single bucket can be shared by several clients, threads and asyncio
+  tasks, as waiting times are reserved under a lock.
+- `RetryPolicy`: which failures are retried and how long to back off,
+  exponentially with jitter, honouring the Retry-After header.
+- `RequestBudget`: caps the number of requests a client may send.
+- `FairScheduler`: caps the requests in flight across clients, handing
+  free slots to waiting tenants in turn.
+"""
+
+import collections
+import contextlib
+import email.utils
+import math
+import random
+import threading
+import time
+from typing import Collection, Hashable, Iterator, Optional
+
+from driganttic.exceptions import RequestBudgetExceeded
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """Token bucket.
+
+        Args:
+            rate: Requests per second allowed on average
+            capacity: Maximum burst size, defaults to one second worth
+                of requests
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = max(capacity if capacity is not None else rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Takes a token, returns how long to wait before using it.
+
+        The bucket may go negative: later callers then wait for the
+        tokens reserved before them, which keeps the order fair.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        """Blocks until a request may be sent."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Waits without blocking the event loop for a request slot."""
+        # Only async clients pay for importing asyncio
+        import asyncio
+
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class RetryPolicy:
+    """Retry and exponential backoff policy."""
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        statuses: Collection[int] = (429, 500, 502, 503, 504),
+        jitter: bool = True,
+        max_retry_after: float = 300.0,
+    ):
+        """Retry policy.
+
+        Args:
+            max_retries: Retries after the first attempt, 0 for none
+            backoff_factor: Base delay, doubled on every retry
+            max_backoff: Maximum delay between attempts
+            statuses: HTTP statuses that are retried, besides timeouts
+                and connection errors
+            jitter: Randomize delays ("full jitter") so concurrent
+                clients do not retry in lockstep
+            max_retry_after: Maximum delay honoured from a Retry-After
+                header, longer ones are clamped to it
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.jitter = jitter
+        self.max_retry_after = max_retry_after
+
+    def retries_status(self, status_code: int) -> bool:
+        """Whether a response status is worth retrying."""
+        return status_code in self.statuses
+
+    def retry_delay(
+        self,
+        attempt: int,
+        status_code: Optional[int] = None,
+        retry_after: Optional[str] = None,
+        idempotent: bool = True,
+    ) -> Optional[float]:
+        """Whether and when to retry a failed attempt.
+
+        Shared by the sync and async clients, whatever their transport.
+
+        Args:
+            attempt: Number of the failed attempt, starting at 0
+            status_code: Error status of the response, None after a
+                timeout or a connection error
+            retry_after: Retry-After header of the response, if any
+            idempotent: False for requests that may have taken effect,
+                e.g. POST, which are then only retried on 429 answers
+
+        Returns: Seconds to wait before retrying, None to give up.
+        """
+        if attempt >= self.max_retries:
+            return None
+        if status_code is None:
+            return self.backoff(attempt) if idempotent else None
+        if not self.retries_status(status_code):
+            return None
+        if not (idempotent or status_code == 429):
+            return None
+        return self.backoff(attempt, retry_after)
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before the next attempt.
+
+        Args:
+            attempt: Number of the failed attempt, starting at 0
+            retry_after: Retry-After header of the response, if any.
+                When valid it takes precedence over the backoff, up to
+                max_retry_after.
+
+        Returns: Delay in seconds.
+        """
+        if retry_after is not None:
+            delay = _parse_retry_after(retry_after)
+            if delay is not None:
+                return min(delay, self.max_retry_after)
+        delay = min(self.max_backoff, self.backoff_factor * 2**attempt)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+
+def _parse_retry_after(retry_after: str) -> Optional[float]:
+    """Parses a Retry-After header, in seconds or as an HTTP date.
+
+    Returns: Seconds to wait, or None when the header is invalid, e.g.
+        negative or not finite.
+    """
+    try:
+        seconds = float(retry_after)
+    except ValueError:
+        pass
+    else:
+        if not math.isfinite(seconds) or seconds < 0:
+            return None
+        return seconds
+    try:
+        when = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RequestBudget:
+    """Thread-safe cap on the number of requests sent."""
+
+    def __init__(self, max_requests: Optional[int] = None):
+        """Request budget.
+
+        Args:
+            max_requests: Requests allowed, unlimited if None
+        """
+        self.max_requests = max_requests
+        self.used = 0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """Requests left, None if unlimited."""
+        if self.max_requests is None:
+            return None
+        return max(0, self.max_requests - self.used)
+
+    def spend(self) -> None:
+        """Accounts one request, raising if the budget is exhausted."""
+        with self._lock:
+            if self.max_requests is not None and self.used >= self.max_requests:
+                raise RequestBudgetExceeded(
+                    f"Request budget of {self.max_requests} exhausted"
+                )
+            self.used += 1
+
+
+class FairScheduler:
+    """Thread-safe concurrency budget shared fairly across tenants."""
+
+    def __init__(self, max_concurrency: int = 10):
+        """Fair scheduler.
+
+        While requests are waiting for a slot, freed slots go to the
+        waiting tenants round-robin, so a tenant sending many requests
+        at once does not starve the others.
+
+        Args:
+            max_concurrency: Requests in flight at most, all tenants
+                together
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be positive, got {max_concurrency}")
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        # Waiting requests by tenant, in serving order
+        self._waiting: "collections.OrderedDict[Hashable, collections.deque]" = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    @property
+    def waiting(self) -> int:
+        """Requests waiting for a slot."""
+        with self._lock:
+            return sum(len(q) for q in self._waiting.values())
+
+    def acquire(self, tenant: Hashable) -> None:
+        """Blocks until the tenant gets a slot."""
+        with self._lock:
+            if self.in_flight < self.max_concurrency and not self._waiting:
+                self.in_flight += 1
+                return
+            ready = threading.Event()
+            self._waiting.setdefault(tenant, collections.deque()).append(ready)
+        ready.wait()
+
+    def release(self) -> None:
+        """Frees a slot, handing it to the next tenant in turn."""
+        with self._lock:
+            if not self._waiting:
+                self.in_flight -= 1
+                return
+            tenant, queue = next(iter(self._waiting.items()))
+            ready = queue.popleft()
+            if queue:
+                self._waiting.move_to_end(tenant)
+            else:
+                del self._waiting[tenant]
+        # The slot is handed over, in_flight does not change
+        ready.set()
+
+    @contextlib.contextmanager
+    def slot(self, tenant: Hashable) -> Iterator[None]:
+        """Holds a slot of the tenant while in the context."""
+        self.acquire(tenant)
+        try:
+            yield
+        finally:
+            self.release()
@@ -40,6 +40,81 @@ class FetcherList(Base):
     pages: int
     page: int
 
+    def compact(self) -> "FetcherList":
+        """Copy storing the fetched items compactly.
+
+        See driganttic.compact, the items are then materialized on
+        access.
+        """
+        from driganttic.compact import CompactItems
+
+        model = type(self).__fields__["fetched_items"].type_
+        return self.copy(
+            update={"fetched_items": CompactItems(model, self.fetched_items)}
+        )
+
+    def _materialized(self) -> "FetcherList":
+        """Self, or a copy with compact items as a list."""
+        if isinstance(self.fetched_items, (list, tuple)):
+            return self
+        return self.copy(update={"fetched_items": list(self.fetched_items)})
+
+    def dict(self, **kwargs) -> Dict[str, Any]:  # type: ignore
+        """Dict of the list, as pydantic's."""
+        return super(FetcherList, self._materialized()).dict(**kwargs)
+
+    def json(self, **kwargs) -> str:  # type: ignore
+        """JSON of the list, as pydantic's."""
+        return super(FetcherList, self._materialized()).json(**kwargs)
+
+    def to_columns(self) -> Dict[str, Any]:
+        """Fetched items as a dict of NumPy arrays.
+
+        See driganttic.columnar, the client get_*_columns methods build
+        the same columns without parsing the items into models first.
+        """
+        from driganttic import columnar
+
+        return columnar.models_to_columns(self.fetched_items)
+
+    def diff(self, previous: Any) -> Any:
+        """Changes since a previous pull, see driganttic.diff.
+
+        Args:
+            previous: The previous list or its fingerprints by id
+
+        Returns: A driganttic.diff.Diff.
+        """
+        from driganttic import diff
+
+        return diff.diff(previous, self)
+
+    def save_snapshot(self, path: str, chunk_size: int = 1024, level: int = 6) -> None:
+        """Writes a compact snapshot, see driganttic.snapshot.
+
+        Args:
+            path: Snapshot file
+            chunk_size: Items per compressed chunk
+            level: zlib compression level, 1 (fastest) to 9 (smallest)
+        """
+        from driganttic import snapshot
+
+        snapshot.save(self, path, chunk_size, level)
+
+    @classmethod
+    def load_snapshot(cls, path: str, max_chunks: int = 8) -> "FetcherList":
+        """Loads a snapshot, its items are materialized on access.
+
+        See driganttic.snapshot.
+
+        Args:
+            path: Snapshot file, of this list schema
+            max_chunks: Decompressed chunks kept in memory at most
+        """
+        from driganttic import snapshot
+
+        return snapshot.load(path, max_chunks, cls)
+
 
 class ResourceDetails(FetcherDetails):
     """Resource List schema."""
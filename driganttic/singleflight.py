@@ -0,0 +1,160 @@
+"""Coalescing of identical concurrent calls (single-flight).
+
+When many threads or tasks ask a client for the same thing at once, e.g.
+a dashboard loading the same project from several requests, only the
+first call fetches and parses it. The others wait for it and get the
+same result, or the same exception:
+
+    Client = GantticClient(APIKEY=..., coalesce=["get_project_details"])
+    Client = AsyncGantticClient(APIKEY=..., coalesce=True)
+
+Calls are identical when they are to the same method with the same
+arguments (fetcher, id, time range and extra parameters). Only calls in
+flight are shared, nothing is kept once the first call returns: see the
+caches for that.
+
+Coalesced callers share the returned models, they should not modify
+them.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Mapping,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+T = TypeVar("T")
+
+# Client methods that can be coalesced
+COALESCABLE = (
+    "get_tasks",
+    "get_projects",
+    "get_resources",
+    "get_task_details",
+    "get_resource_details",
+    "get_project_details",
+)
+
+
+def coalesced_methods(coalesce: Union[bool, Iterable[str]]) -> FrozenSet[str]:
+    """Resolves the methods to coalesce.
+
+    Args:
+        coalesce: True for all of COALESCABLE, False for none, or the
+            method names
+
+    Returns: Method names.
+    """
+    if coalesce is True:
+        return frozenset(COALESCABLE)
+    if coalesce is False:
+        return frozenset()
+    methods = frozenset(coalesce)
+    unknown = methods.difference(COALESCABLE)
+    if unknown:
+        raise ValueError(
+            f"Cannot coalesce {sorted(unknown)}, choose among {list(COALESCABLE)}"
+        )
+    return methods
+
+
+def call_key(method: str, args: Tuple, kwargs: Mapping[str, Any]) -> Hashable:
+    """Key telling identical calls apart."""
+    return (method, repr(args), repr(sorted(kwargs.items())))
+
+
+class SingleFlight:
+    """Thread-safe coalescing of identical calls."""
+
+    def __init__(self):
+        """Single-flight group."""
+        # Result of the calls in flight
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        # Calls served by another call in flight
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Calls fn, unless a call of the same key is in flight.
+
+        Args:
+            key: Key of the call, see call_key
+            fn: Call to make
+
+        Returns: The result of fn, of this call or of the one in flight.
+        """
+        with self._lock:
+            in_flight = self._calls.get(key)
+            if in_flight is not None:
+                self.shared += 1
+            else:
+                future: Future = Future()
+                self._calls[key] = future
+        if in_flight is not None:
+            return in_flight.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                del self._calls[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._calls[key]
+        future.set_result(result)
+        return result
+
+
+class AsyncSingleFlight:
+    """Coalescing of identical calls of one event loop."""
+
+    def __init__(self):
+        """Async single-flight group."""
+        self._calls: Dict[Hashable, Any] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Awaits fn(), unless a call of the same key is in flight.
+
+        A waiting caller being cancelled does not cancel the shared
+        call, the first caller being cancelled does.
+
+        Args:
+            key: Key of the call, see call_key
+            fn: Coroutine function to await
+
+        Returns: The result of fn, of this call or of the one in flight.
+        """
+        # Only async clients pay for importing asyncio
+        import asyncio
+
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared += 1
+            return await asyncio.shield(future)
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            del self._calls[key]
+            future.cancel()
+            raise
+        except BaseException as e:
+            del self._calls[key]
+            future.set_exception(e)
+            # Retrieved, as there may be no other caller to raise it
+            future.exception()
+            raise
+        del self._calls[key]
+        future.set_result(result)
+        return result
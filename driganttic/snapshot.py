@@ -0,0 +1,303 @@
+"""Compact on-disk snapshots of fetched listings.
+
+A snapshot keeps a TaskList, ResourceList or ProjectList between runs
+without going through JSON and pydantic again on reload:
+
+    tasks.save_snapshot("tasks.snap")
+    tasks = TaskList.load_snapshot("tasks.snap")
+
+The file holds the items in chunks of rows, each chunk compressed with
+zlib, and an index of the chunks at the end:
+
+    MAGIC | index offset | chunk | chunk | ... | index
+
+- Rows are the field values of an item, in the index field order.
+  Timestamps are integer microseconds since the epoch, aware ones as
+  [UTC microseconds, UTC offset seconds].
+- The index (compressed JSON) records the list and model names, the
+  fields and their kinds, and the offset, size and item count of every
+  chunk.
+
+Loading maps the file in memory and only reads the index, so it takes
+the same few milliseconds for a day or a year of tasks. The items are a
+`SnapshotItems` sequence: a chunk is decompressed the first time one of
+its items is accessed, and only the last few chunks are kept, so memory
+follows the items actually used. Models are built without validation,
+as snapshots only hold models that were validated when fetched.
+
+Fields added to a model after a snapshot was saved get their default,
+fields since removed are dropped. Values of fields other than
+timestamps, numbers and strings must be JSON serializable.
+"""
+
+import bisect
+import datetime
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+from driganttic import jsonlib
+from driganttic.compact import _kind
+from driganttic.schemas import fetcher
+from driganttic.schemas.fetcher import FetcherDetails, FetcherList
+
+MAGIC = b"DGSNAP\x00\x01"
+# Offset of the index, right after the magic
+_HEADER = struct.Struct("<Q")
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=datetime.timezone.utc)
+_US = datetime.timedelta(microseconds=1)
+
+
+def _encode_datetime(value: Optional[datetime.datetime]) -> Any:
+    """Timestamp as microseconds, with the UTC offset if aware."""
+    if value is None:
+        return None
+    offset = value.utcoffset()
+    if offset is None:
+        return (value - _EPOCH) // _US
+    return [(value - _EPOCH_UTC) // _US, int(offset.total_seconds())]
+
+
+_TIMEZONES: Dict[int, datetime.timezone] = {0: datetime.timezone.utc}
+
+
+def _decode_datetime(value: Any) -> Optional[datetime.datetime]:
+    """Timestamp of _encode_datetime."""
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return _EPOCH + value * _US
+    us, offset = value
+    tz = _TIMEZONES.get(offset)
+    if tz is None:
+        tz = _TIMEZONES.setdefault(
+            offset, datetime.timezone(datetime.timedelta(seconds=offset))
+        )
+    return (_EPOCH_UTC + us * _US).astimezone(tz)
+
+
+def _row(item: Any, fields: List[Tuple[str, str]], fields_set_id: int) -> List:
+    """Row of an item, its fields set id last."""
+    values = item.__dict__
+    row: List[Any] = []
+    for name, kind in fields:
+        value = values.get(name)
+        row.append(_encode_datetime(value) if kind == "datetime" else value)
+    row.append(fields_set_id)
+    return row
+
+
+def _write_chunk(f: Any, rows: List, level: int) -> List[int]:
+    """Writes a compressed chunk, returns its offset, size and count."""
+    data = zlib.compress(json.dumps(rows, separators=(",", ":")).encode("utf-8"), level)
+    offset = f.tell()
+    f.write(data)
+    return [offset, len(data), len(rows)]
+
+
+def save(items: FetcherList, path: str, chunk_size: int = 1024, level: int = 6) -> None:
+    """Writes a snapshot of a fetched list.
+
+    The file is replaced atomically, items are written one chunk at a
+    time.
+
+    Args:
+        items: A TaskList, ResourceList or ProjectList
+        path: Snapshot file
+        chunk_size: Items per chunk. Smaller chunks make accessing a
+            few items cheaper, larger ones compress better.
+        level: zlib compression level, 1 (fastest) to 9 (smallest)
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    model = type(items).__fields__["fetched_items"].type_
+    fields = [(name, _kind(field)) for name, field in model.__fields__.items()]
+    fields_sets: List[List[str]] = []
+    fields_set_ids: Dict[frozenset, int] = {}
+    chunks = []
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + _HEADER.pack(0))
+            rows: List = []
+            for item in items.fetched_items:
+                fields_set = frozenset(item.__fields_set__)
+                fields_set_id = fields_set_ids.get(fields_set)
+                if fields_set_id is None:
+                    fields_set_id = fields_set_ids[fields_set] = len(fields_sets)
+                    fields_sets.append(sorted(fields_set))
+                rows.append(_row(item, fields, fields_set_id))
+                if len(rows) == chunk_size:
+                    chunks.append(_write_chunk(f, rows, level))
+                    rows = []
+            if rows:
+                chunks.append(_write_chunk(f, rows, level))
+            index = {
+                "list": type(items).__name__,
+                "model": model.__name__,
+                "fetched_timestamp": _encode_datetime(items.fetched_timestamp),
+                "pages": items.pages,
+                "page": items.page,
+                "fields": fields,
+                "fields_sets": fields_sets,
+                "chunks": chunks,
+            }
+            index_offset = f.tell()
+            f.write(zlib.compress(json.dumps(index).encode("utf-8"), level))
+            f.seek(len(MAGIC))
+            f.write(_HEADER.pack(index_offset))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class SnapshotItems(Sequence):
+    """Read-only sequence of models of a memory-mapped snapshot."""
+
+    def __init__(self, path: str, max_chunks: int = 8):
+        """Snapshot items.
+
+        Args:
+            path: Snapshot file
+            max_chunks: Decompressed chunks kept at most
+        """
+        self.path = os.path.abspath(path)
+        self.max_chunks = max_chunks
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a driganttic snapshot")
+        (index_offset,) = _HEADER.unpack_from(self._mmap, len(MAGIC))
+        # The index of the file: list, fields and chunks
+        self.meta: Dict[str, Any] = json.loads(
+            zlib.decompress(self._mmap[index_offset:])
+        )
+        model = getattr(fetcher, self.meta["model"], None)
+        if not (isinstance(model, type) and issubclass(model, FetcherDetails)):
+            self._mmap.close()
+            raise ValueError(f"Unknown snapshot model {self.meta['model']}")
+        self.model: Type[FetcherDetails] = model
+        # Stored fields the model still has, by row position
+        self._fields = [
+            (pos, name, kind)
+            for pos, (name, kind) in enumerate(self.meta["fields"])
+            if name in model.__fields__
+        ]
+        # Model fields missing in the snapshot, set to their default
+        stored = set(name for name, _ in self.meta["fields"])
+        self._defaults = dict(
+            (name, field.get_default())
+            for name, field in model.__fields__.items()
+            if name not in stored
+        )
+        self._fields_sets = [frozenset(f) for f in self.meta["fields_sets"]]
+        # First item of every chunk, and the total as the last one
+        self._starts = [0]
+        for _, _, count in self.meta["chunks"]:
+            self._starts.append(self._starts[-1] + count)
+        self._chunks: "OrderedDict[int, List]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loads = jsonlib.get_decoder()
+
+    def close(self) -> None:
+        """Unmaps the file, items can no longer be accessed."""
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        """Number of items."""
+        return self._starts[-1]
+
+    def _chunk(self, c: int) -> List:
+        """Rows of chunk c, decompressed on first access."""
+        with self._lock:
+            rows = self._chunks.get(c)
+            if rows is not None:
+                self._chunks.move_to_end(c)
+                return rows
+        offset, size, _ = self.meta["chunks"][c]
+        rows = self._loads(zlib.decompress(self._mmap[offset : offset + size]))
+        with self._lock:
+            self._chunks[c] = rows
+            while len(self._chunks) > self.max_chunks:
+                self._chunks.popitem(last=False)
+        return rows
+
+    def _build(self, row: List) -> Any:
+        """Materializes the model of a row."""
+        data = dict(self._defaults)
+        for pos, name, kind in self._fields:
+            value = row[pos]
+            data[name] = _decode_datetime(value) if kind == "datetime" else value
+        obj = self.model.__new__(self.model)
+        object.__setattr__(obj, "__dict__", data)
+        object.__setattr__(obj, "__fields_set__", set(self._fields_sets[row[-1]]))
+        return obj
+
+    def __getitem__(self, i):
+        """Materializes an item, or a list of them for slices."""
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("SnapshotItems index out of range")
+        c = bisect.bisect_right(self._starts, i) - 1
+        return self._build(self._chunk(c)[i - self._starts[c]])
+
+    def __iter__(self) -> Iterator[Any]:
+        """Materializes the items one by one, a chunk at a time."""
+        for c in range(len(self.meta["chunks"])):
+            for row in self._chunk(c):
+                yield self._build(row)
+
+    def __eq__(self, other: object) -> bool:
+        """Equal to sequences of equal models."""
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        """Short representation."""
+        return f"SnapshotItems({self.model.__name__}, {len(self)} items)"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """Pickles as the path of the snapshot."""
+        return (SnapshotItems, (self.path, self.max_chunks))
+
+
+def load(
+    path: str, max_chunks: int = 8, list_model: Type[FetcherList] = FetcherList
+) -> FetcherList:
+    """Loads a snapshot, its items are read lazily.
+
+    Args:
+        path: Snapshot file
+        max_chunks: Decompressed chunks kept at most
+        list_model: Expected list schema, the snapshot list must be it
+            or a subclass of it
+
+    Returns: The TaskList, ResourceList or ProjectList of the snapshot,
+        its fetched_items a SnapshotItems.
+    """
+    items = SnapshotItems(path, max_chunks)
+    meta = items.meta
+    stored = getattr(fetcher, meta["list"], None)
+    if not (isinstance(stored, type) and issubclass(stored, list_model)):
+        items.close()
+        raise ValueError(f"Snapshot list {meta['list']} is not a {list_model.__name__}")
+    return stored.construct(
+        fetched_timestamp=_decode_datetime(meta["fetched_timestamp"]),
+        fetched_items=items,
+        pages=meta["pages"],
+        page=meta["page"],
+    )
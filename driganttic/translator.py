@@ -0,0 +1,212 @@
+"""Lazy, cacheable datafield translators.
+
+The Translator of a fetcher maps the custom data field names to their
+Ganttic IDs (see `parse._datafields`). Fetching it costs one request per
+fetcher, so instead of building all of them upfront the client holds a
+`LazyTranslator`: a read-only mapping that loads each fetcher on first
+access.
+
+Optionally, the raw datafields responses can be kept on disk with a
+`TranslatorCache`. Fresh entries are used as is, stale ones are served
+immediately while a background thread fetches a new copy, so short
+lived processes do not pay the round-trips on every start.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+from driganttic import parse
+from driganttic.schemas.fetcher import DataFields
+
+
+def _default_cache_dir() -> str:
+    """Default cache directory, honouring XDG_CACHE_HOME."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "driganttic", "datafields")
+
+
+class TranslatorCache:
+    """On-disk cache of raw datafields responses with a TTL."""
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 24 * 3600.0):
+        """On-disk datafields cache.
+
+        Args:
+            path: Cache directory, defaults to ~/.cache/driganttic
+            ttl: Seconds an entry is considered fresh
+        """
+        self.path = path or _default_cache_dir()
+        self.ttl = ttl
+
+    def _file(self, key: str) -> str:
+        """Cache file of a key, hashed as keys hold the API key."""
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, digest + ".json")
+
+    def get(self, key: str) -> Optional[Tuple[Dict, bool]]:
+        """Gets a cached response.
+
+        Returns: The response and whether it is still fresh, or None.
+        """
+        try:
+            with open(self._file(key), "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        fresh = time.time() - entry.get("stored_at", 0) < self.ttl
+        return entry.get("response", {}), fresh
+
+    def set(self, key: str, response: Dict) -> None:
+        """Stores a response, atomically replacing any previous one."""
+        os.makedirs(self.path, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"stored_at": time.time(), "response": response}, f)
+            os.replace(tmp, self._file(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+class LazyTranslator(Mapping[str, DataFields]):
+    """Lazily loaded mapping of fetcher name to Translator."""
+
+    def __init__(
+        self,
+        loader: Callable[[str], Dict],
+        fetcher_names: Iterable[str],
+        cache: Optional[TranslatorCache] = None,
+        cache_prefix: str = "",
+    ):
+        """Lazy Translator mapping.
+
+        Args:
+            loader: Returns the raw datafields response of a fetcher
+            fetcher_names: Fetchers that have a Translator
+            cache: Optional on-disk cache of the raw responses
+            cache_prefix: Prefix of the cache keys, to tell apart
+                endpoints and API keys
+        """
+        self._loader = loader
+        self._names = list(fetcher_names)
+        self._cache = cache
+        self._cache_prefix = cache_prefix
+        self._loaded: Dict[str, DataFields] = {}
+        self._locks = dict((k, threading.Lock()) for k in self._names)
+        self._revalidating: Dict[str, threading.Thread] = {}
+
+    def __getitem__(self, fetcher_name: str) -> DataFields:
+        """Gets the Translator of a fetcher, loading it if needed."""
+        translator = self._loaded.get(fetcher_name)
+        if translator is not None:
+            return translator
+        if fetcher_name not in self._locks:
+            raise KeyError(fetcher_name)
+        with self._locks[fetcher_name]:
+            if fetcher_name not in self._loaded:
+                self._loaded[fetcher_name] = self._load(fetcher_name)
+        return self._loaded[fetcher_name]
+
+    def get(self, fetcher_name: str, default: Any = None) -> Any:
+        """Gets the Translator of a fetcher, default if it has none.
+
+        Unlike Mapping.get, errors raised while loading the Translator
+        propagate, KeyErrors of a malformed datafields response too.
+        """
+        if fetcher_name not in self._locks:
+            return default
+        return self[fetcher_name]
+
+    def __contains__(self, fetcher_name: object) -> bool:
+        """Whether a fetcher has a Translator, without loading it."""
+        return fetcher_name in self._locks
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterates over fetcher names."""
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        """Number of fetchers."""
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        """Shows which translators are already loaded."""
+        return f"{type(self).__name__}(loaded={sorted(self._loaded)})"
+
+    @property
+    def loaded(self) -> Dict[str, DataFields]:
+        """Translators loaded so far, by fetcher name."""
+        return dict(self._loaded)
+
+    def preload(self, translators: Mapping[str, DataFields]) -> None:
+        """Adds Translators loaded elsewhere, e.g. by another client.
+
+        Fetchers without a Translator here are ignored.
+        """
+        for fetcher_name, translator in translators.items():
+            if fetcher_name in self._locks:
+                with self._locks[fetcher_name]:
+                    self._loaded.setdefault(fetcher_name, translator)
+
+    def _cache_key(self, fetcher_name: str) -> str:
+        """Cache key of a fetcher."""
+        return self._cache_prefix + "|" + fetcher_name
+
+    def _fetch(self, fetcher_name: str) -> DataFields:
+        """Fetches a Translator from the API and stores it in cache."""
+        response = self._loader(fetcher_name)
+        if self._cache is not None:
+            self._cache.set(self._cache_key(fetcher_name), response)
+        return parse._datafields(response)
+
+    def _load(self, fetcher_name: str) -> DataFields:
+        """Loads a Translator from the cache or the API."""
+        if self._cache is None:
+            return self._fetch(fetcher_name)
+        cached = self._cache.get(self._cache_key(fetcher_name))
+        if cached is None:
+            return self._fetch(fetcher_name)
+        response, fresh = cached
+        if not fresh:
+            self._revalidate(fetcher_name)
+        return parse._datafields(response)
+
+    def _revalidate(self, fetcher_name: str) -> None:
+        """Refreshes a stale Translator in a background thread."""
+        running = self._revalidating.get(fetcher_name)
+        if running is not None and running.is_alive():
+            return
+
+        def _refresh():
+            try:
+                translator = self._fetch(fetcher_name)
+            except Exception:  # noqa: B902
+                # Keep serving the stale copy, next load will retry
+                return
+            with self._locks[fetcher_name]:
+                self._loaded[fetcher_name] = translator
+
+        thread = threading.Thread(
+            target=_refresh, name=f"driganttic-{fetcher_name}", daemon=True
+        )
+        self._revalidating[fetcher_name] = thread
+        thread.start()
+
+    def refresh(self, fetcher_name: Optional[str] = None) -> None:
+        """Fetches translators again from the API, bypassing the cache.
+
+        Args:
+            fetcher_name: Fetcher to refresh, all of them if None
+        """
+        names = self._names if fetcher_name is None else [fetcher_name]
+        for name in names:
+            with self._locks[name]:
+                self._loaded[name] = self._fetch(name)
@@ -2,3 +2,14 @@
 
 Dribia 2021/04/21, Oleguer Sagarra Pascual <ula@dribia.com>
 """
+
+import pytest
+
+from benchmarks.mock_server import MockGantticServer
+
+
+@pytest.fixture()
+def ganttic_server():
+    """Local mock Ganttic API, 3 pages of 10 items per listing."""
+    with MockGantticServer(pages=3, items_per_page=10) as server:
+        yield server
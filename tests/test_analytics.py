@@ -0,0 +1,86 @@
+"""Utilization engine tests, skipped without numpy."""
+
+import datetime
+import random
+
+import pytest
+
+from driganttic import analytics
+from driganttic.schemas.fetcher import TaskDetails, TaskList
+
+np = pytest.importorskip("numpy")
+
+D = datetime.datetime
+
+
+def _tasks(spec):
+    """TaskList of (resources, start, end, percent) tuples."""
+    return TaskList(
+        fetched_items=[
+            TaskDetails(
+                id=str(i),
+                status="active",
+                resources=resources,
+                start=start,
+                end=end,
+                utilizationPercent=percent,
+            )
+            for i, (resources, start, end, percent) in enumerate(spec)
+        ],
+        pages=1,
+        page=1,
+    )
+
+
+def test_utilization_by_day():
+    """Mean and peak bookings per day, overbookings."""
+    tasks = _tasks(
+        [
+            (["a"], D(2021, 1, 1, 12), D(2021, 1, 3), None),
+            (["a", "b"], D(2021, 1, 2), D(2021, 1, 2, 12), 50),
+            (["b"], D(2021, 1, 2, 12), D(2021, 1, 4), 80),
+        ]
+    )
+    load = analytics.utilization(tasks, "day")
+    assert list(load.resources) == ["a", "b"]
+    assert len(load.periods) == 4
+    np.testing.assert_allclose(load.mean, [[50, 125, 0], [0, 65, 80]])
+    # b switches tasks at noon, back to back bookings do not overlap
+    np.testing.assert_allclose(load.peak, [[100, 150, 0], [0, 80, 80]])
+    assert load.overbookings() == [("a", D(2021, 1, 2), 150.0)]
+    week = analytics.utilization(tasks, "week")
+    assert week.periods[0] == np.datetime64("2020-12-28")
+    np.testing.assert_allclose(week.mean[:, 0], [175 / 7, 145 / 7])
+
+
+def test_utilization_matches_brute_force():
+    """The vectorized engine agrees with a loop over the tasks."""
+    rng = random.Random(0)
+    spec = []
+    for _ in range(200):
+        start = D(2021, 1, 1) + datetime.timedelta(hours=rng.randrange(24 * 90))
+        end = start + datetime.timedelta(hours=rng.randrange(1, 24 * 20))
+        resources = rng.sample(["a", "b", "c", "d"], rng.randrange(1, 3))
+        spec.append((resources, start, end, rng.choice([None, 25.0, 100.0])))
+    timeMin, timeMax = D(2021, 1, 10), D(2021, 3, 1)
+    step = datetime.timedelta(days=3)
+    load = analytics.utilization(_tasks(spec), step, timeMin, timeMax)
+    edges = load.periods.astype("datetime64[ms]").tolist()
+    assert edges[0] == timeMin and edges[-1] >= timeMax
+    for row, resource in enumerate(load.resources):
+        booked = [
+            (s, e, 100.0 if p is None else p) for r, s, e, p in spec if resource in r
+        ]
+        for col, (p_min, p_max) in enumerate(zip(edges[:-1], edges[1:])):
+            overlap = sum(
+                p * max(datetime.timedelta(), min(e, p_max) - max(s, p_min)) / step
+                for s, e, p in booked
+            )
+            instants = [p_min] + [t for s, e, _ in booked for t in (s, e)]
+            peak = max(
+                sum(p for s, e, p in booked if s <= t < e)
+                for t in instants
+                if p_min <= t < p_max
+            )
+            assert load.mean[row, col] == pytest.approx(overlap)
+            assert load.peak[row, col] == pytest.approx(peak)
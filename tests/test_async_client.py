@@ -0,0 +1,73 @@
+"""Async client tests against the local mock Ganttic server."""
+
+import asyncio
+import datetime
+import time
+
+import pytest
+
+from benchmarks.mock_server import MockGantticServer
+from driganttic.async_client import AsyncGantticClient
+from driganttic.client import GantticClient
+
+T1 = datetime.datetime(2021, 1, 1)
+T2 = datetime.datetime(2022, 1, 1)
+
+
+def test_async_client(ganttic_server):
+    """The async client returns the same models as the sync one."""
+
+    async def get_tasks():
+        async with AsyncGantticClient(
+            APIKEY="mock", ENDPOINT=ganttic_server.endpoint, max_concurrency=2
+        ) as Client:
+            return await Client.get_tasks(T1, T2)
+
+    with GantticClient(APIKEY="mock", ENDPOINT=ganttic_server.endpoint) as Client:
+        expected = Client.get_tasks(T1, T2)
+    assert asyncio.run(get_tasks()).fetched_items == expected.fetched_items
+
+
+def test_concurrent_pages():
+    """Pages after the first one are fetched concurrently."""
+    with MockGantticServer(pages=6, items_per_page=5, latency=0.1) as server:
+
+        async def get_resources():
+            async with AsyncGantticClient(
+                APIKEY="mock", ENDPOINT=server.endpoint, max_concurrency=8
+            ) as Client:
+                # Warm the Translator, so only the pages are timed
+                await Client._get_translator("resource")
+                start = time.perf_counter()
+                resources = await Client.get_resources()
+                return resources, time.perf_counter() - start
+
+        resources, seconds = asyncio.run(get_resources())
+    assert len(resources.fetched_items) == 30
+    assert [e.id for e in resources.fetched_items] == [str(i) for i in range(30)]
+    pages = [q.get("page") for _, p, q in server.requests if p == "/v1/resources"]
+    assert sorted(pages, key=str) == sorted([None, "2", "3", "4", "5", "6"], key=str)
+    # First page, then the other five at once: far below 6 latencies
+    assert seconds < 0.45
+
+
+def test_translator_fetched_once(ganttic_server):
+    """Concurrent calls share one datafields request per fetcher."""
+
+    async def get_all():
+        async with AsyncGantticClient(
+            APIKEY="mock", ENDPOINT=ganttic_server.endpoint
+        ) as Client:
+            return await asyncio.gather(
+                Client.get_tasks(T1, T2),
+                Client.get_tasks(T1, T2),
+                Client.get_task_details("100003"),
+            )
+
+    tasks, again, details = asyncio.run(get_all())
+    assert tasks.fetched_items == again.fetched_items
+    assert details.id == "100003"
+    paths = [p for _, p, _ in ganttic_server.requests]
+    assert paths.count("/v1/tasks/datafields") == 1
+    with pytest.raises(ValueError):
+        AsyncGantticClient(APIKEY="mock", max_concurrency=0)
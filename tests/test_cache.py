@@ -0,0 +1,62 @@
+"""Entity cache tests."""
+
+import datetime
+
+from driganttic import parse
+from driganttic.cache import EntityCache
+from driganttic.schemas.fetcher import ProjectDetails, TaskDetails
+
+
+def _task(task_id, start, end):
+    """A parsed task."""
+    return TaskDetails(id=task_id, status="1", resources=[], start=start, end=end)
+
+
+def test_cache_windows():
+    """Only uncovered parts of a range are reported missing."""
+    cache = EntityCache()
+    t = datetime.datetime(2021, 1, 1)
+    day = datetime.timedelta(days=1)
+    assert cache.missing_windows(t, t + 10 * day) == [(t, t + 10 * day)]
+    cache.put_window(t + 2 * day, t + 5 * day, [_task("a", t + 3 * day, t + 4 * day)])
+    assert cache.missing_windows(t, t + 10 * day) == [
+        (t, t + 2 * day),
+        (t + 5 * day, t + 10 * day),
+    ]
+    assert [e.id for e in cache.get_window(t, t + 10 * day)] == ["a"]
+    # a refetched window drops the tasks that are gone
+    cache.put_window(t + 2 * day, t + 5 * day, [_task("b", t + 2 * day, t + 3 * day)])
+    assert [e.id for e in cache.get_window(t, t + 10 * day)] == ["b"]
+    assert cache.get("task", "b").end == t + 3 * day
+    cache.ttl = -1
+    assert cache.missing_windows(t, t + 10 * day) == [(t, t + 10 * day)]
+    assert cache.get("task", "b") is None
+
+
+def test_cache_windows_aware():
+    """Missing windows of an aware range all use the caller clock."""
+    cache = EntityCache()
+    cest = datetime.timezone(datetime.timedelta(hours=2))
+    t = datetime.datetime(2021, 1, 1, tzinfo=cest)
+    day = datetime.timedelta(days=1)
+    cache.put_window(t + 2 * day, t + 5 * day, [])
+    missing = cache.missing_windows(t, t + 10 * day)
+    assert missing == [(t, t + 2 * day), (t + 5 * day, t + 10 * day)]
+    # Formatted as the requests do, the windows meet the cached one
+    assert [
+        (parse.format_timestamp(a), parse.format_timestamp(b)) for a, b in missing
+    ] == [
+        ("2021-01-01 00:00", "2021-01-03 00:00"),
+        ("2021-01-06 00:00", "2021-01-11 00:00"),
+    ]
+
+
+def test_cache_listings():
+    """Listings are served while fresh and replaced on refresh."""
+    cache = EntityCache()
+    assert cache.get_list("project") is None
+    cache.put_list("project", [ProjectDetails(id="p1", status="1")])
+    cache.put_list("project", [ProjectDetails(id="p2", status="1")])
+    assert [e.id for e in cache.get_list("project")] == ["p2"]
+    cache.clear("project")
+    assert cache.get_list("project") is None
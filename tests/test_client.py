@@ -0,0 +1,127 @@
+"""Client tests against the local mock Ganttic server."""
+
+import datetime
+
+from driganttic.client import GantticClient
+from driganttic.compact import CompactItems
+from driganttic.exceptions import GantticAPIError
+
+T1 = datetime.datetime(2021, 1, 1)
+T2 = datetime.datetime(2022, 1, 1)
+
+
+def test_get_listings(ganttic_server):
+    """Listings exhaust every page, datafields are fetched lazily."""
+    with GantticClient(APIKEY="mock", ENDPOINT=ganttic_server.endpoint) as Client:
+        assert ganttic_server.requests == []
+        tasks = Client.get_tasks(T1, T2)
+        assert len(tasks.fetched_items) == 30
+        assert tasks.pages == 3
+        assert len(Client.get_projects().fetched_items) == 30
+        assert len(Client.get_resources().fetched_items) == 30
+    paths = [r[1] for r in ganttic_server.requests]
+    assert paths.count("/v1/tasks") == 3
+    assert paths.count("/v1/tasks/datafields") == 1
+
+
+def test_iter_and_shard(ganttic_server):
+    """Streamed and sharded pulls match get_tasks."""
+    with GantticClient(APIKEY="mock", ENDPOINT=ganttic_server.endpoint) as Client:
+        tasks = Client.get_tasks(T1, T2).fetched_items
+        assert list(Client.iter_tasks(T1, T2, prefetch=True)) == list(tasks)
+        sharded = Client.get_tasks(T1, T2, shard="month").fetched_items
+        assert [e.id for e in sharded] == [e.id for e in tasks]
+
+
+def test_iter_streams_pages(ganttic_server):
+    """Iterators only fetch the pages consumed so far."""
+
+    def page_requests():
+        return [
+            q.get("page") for _, p, q in ganttic_server.requests if p == "/v1/tasks"
+        ]
+
+    with GantticClient(APIKEY="mock", ENDPOINT=ganttic_server.endpoint) as Client:
+        tasks = Client.iter_tasks(T1, T2)
+        assert page_requests() == []
+        first = [next(tasks) for _ in range(10)]
+        assert page_requests() == [None]
+        assert next(tasks).id == "100010"
+        assert page_requests() == [None, "2"]
+        assert len(first + list(tasks)) == 29
+        assert page_requests() == [None, "2", "3"]
+        projects = Client.iter_projects(prefetch=True)
+        assert [e.id for e in projects] == [str(i) for i in range(30)]
+
+
+def test_shard_merge(monkeypatch):
+    """Tasks straddling windows are kept once, tasks without id all."""
+    pages = {
+        "2021-01-01 00:00": [{"id": "a"}, {"id": "b"}, {"name": "x1"}],
+        "2021-02-01 00:00": [{"id": "b"}, {"id": "c"}, {"name": "x2"}],
+    }
+    Client = GantticClient(APIKEY="mock")
+    monkeypatch.setattr(
+        Client,
+        "_exhaust_pages",
+        lambda _, timeMin, timeMax: {
+            "items": pages[timeMin],
+            "page": 1,
+            "pageCount": 2,
+        },
+    )
+    merged = Client._exhaust_windows(T1, datetime.datetime(2021, 3, 1), "month")
+    assert merged["items"] == [
+        {"id": "a"},
+        {"id": "b"},
+        {"name": "x1"},
+        {"id": "c"},
+        {"name": "x2"},
+    ]
+    assert merged["page"] == merged["pageCount"] == 1
+    Client.close()
+
+
+def test_get_details(ganttic_server):
+    """Details are fetched one by one or in batches."""
+    with GantticClient(APIKEY="mock", ENDPOINT=ganttic_server.endpoint) as Client:
+        task = Client.get_task_details("100003")
+        assert task.id == "100003"
+        many = Client.get_task_details_many(["100003", "missing", "100003"])
+        assert list(many) == ["100003", "missing"]
+        assert many["100003"] == task
+        assert isinstance(many["missing"], GantticAPIError)
+        assert many["missing"].status_code == 404
+        projects = Client.get_project_details_many(["4", "4", "5"], max_workers=2)
+        assert list(projects) == ["4", "5"]
+        assert projects["4"] == Client.get_project_details("4")
+    paths = [p for _, p, _ in ganttic_server.requests]
+    # Duplicated ids are fetched once
+    assert paths.count("/v1/task/100003") == 2
+    assert paths.count("/v1/task/missing") == 1
+    assert paths.count("/v1/project/4") == 2
+
+
+def test_without_validation(ganttic_server):
+    """Trusted parsing returns the same models as validated parsing."""
+    with GantticClient(APIKEY="mock", ENDPOINT=ganttic_server.endpoint) as Client:
+        expected = Client.get_tasks(T1, T2)
+    with GantticClient(
+        APIKEY="mock", ENDPOINT=ganttic_server.endpoint, validate=False
+    ) as Client:
+        tasks = Client.get_tasks(T1, T2)
+        assert tasks.fetched_items == expected.fetched_items
+        assert Client.get_task_details("100003") == expected.fetched_items[3]
+
+
+def test_compact(ganttic_server):
+    """Compact listings hold the same models as plain ones."""
+    with GantticClient(APIKEY="mock", ENDPOINT=ganttic_server.endpoint) as Client:
+        expected = Client.get_tasks(T1, T2)
+    with GantticClient(
+        APIKEY="mock", ENDPOINT=ganttic_server.endpoint, compact=True
+    ) as Client:
+        tasks = Client.get_tasks(T1, T2)
+        assert isinstance(tasks.fetched_items, CompactItems)
+        assert tasks.fetched_items == expected.fetched_items
+        assert tasks.dict() == expected.dict()
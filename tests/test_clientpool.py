@@ -0,0 +1,97 @@
+"""Client pool tests against the local mock Ganttic server."""
+
+import datetime
+import threading
+
+import pytest
+
+from driganttic.cache import EntityCache
+from driganttic.clientpool import GantticClientPool
+
+T0 = datetime.datetime(2021, 1, 1)
+T1 = datetime.datetime(2021, 2, 1)
+
+
+def _datafields_requests(server):
+    """Number of datafields requests the server answered."""
+    return sum(1 for _, path, _ in server.requests if path.endswith("/datafields"))
+
+
+def test_client_pool(ganttic_server):
+    """Clients are reused by API key and share the session."""
+    with GantticClientPool(ENDPOINT=ganttic_server.endpoint) as pool:
+        a = pool.client("a")
+        assert pool.client("a") is a
+        b = pool.client("b")
+        assert b is not a and b.session is a.session
+        assert b.scheduler is pool.scheduler
+        assert len(pool) == 2 and "a" in pool
+        assert len(a.get_tasks(T0, T1).fetched_items) == 30
+        a.close()
+        assert len(b.get_projects().fetched_items) == 30
+        assert {q["token"] for _, _, q in ganttic_server.requests} == {"a", "b"}
+    assert len(pool) == 0
+
+
+def test_client_pool_caches(ganttic_server):
+    """Every tenant gets its own entity cache."""
+    with pytest.raises(ValueError):
+        GantticClientPool(cache=EntityCache())
+    with GantticClientPool(
+        ENDPOINT=ganttic_server.endpoint, cache_factory=lambda APIKEY: EntityCache()
+    ) as pool:
+        a, b = pool.client("a"), pool.client("b")
+        assert a.cache is not b.cache
+        a.get_projects()
+        a.get_projects()
+        assert b.cache.get_list("project") is None
+        n_requests = len(ganttic_server.requests)
+        b.get_projects()
+        tokens = {q["token"] for _, _, q in ganttic_server.requests[n_requests:]}
+        assert tokens == {"b"}
+
+
+def test_client_pool_eviction(ganttic_server):
+    """Idle and excess clients are evicted, their Translators kept."""
+    pool = GantticClientPool(idle_timeout=None, max_tenants=2)
+    pool.client_kwargs["ENDPOINT"] = ganttic_server.endpoint
+    a = pool.client("a")
+    a.get_tasks(T0, T1)
+    assert _datafields_requests(ganttic_server) == 1
+    pool.client("b")
+    pool.client("c")
+    assert "a" not in pool and len(pool) == 2
+    again = pool.client("a")
+    assert again is not a and "b" not in pool
+    again.get_tasks(T0, T1)
+    assert _datafields_requests(ganttic_server) == 1
+    pool.remove("a")
+    assert "a" not in pool
+    pool.idle_timeout = 0.0
+    assert pool.evict_idle() == 1 and len(pool) == 0
+    pool.close()
+
+
+def test_client_pool_concurrency(ganttic_server):
+    """Concurrent pulls of many tenants stay within the budget."""
+    ganttic_server.latency = 0.01
+    with GantticClientPool(max_concurrency=2, ENDPOINT=ganttic_server.endpoint) as pool:
+        peak = []
+        scheduler = pool.scheduler
+        release = scheduler.release
+
+        def tracked_release():
+            peak.append(scheduler.in_flight)
+            release()
+
+        scheduler.release = tracked_release
+        threads = [
+            threading.Thread(target=pool.client(f"t{i % 4}").get_resources)
+            for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert peak and max(peak) <= 2
+        assert scheduler.in_flight == 0 and scheduler.waiting == 0
@@ -0,0 +1,57 @@
+"""Columnar export tests, skipped without numpy."""
+
+import datetime
+
+import pytest
+
+from benchmarks import payloads
+from driganttic import columnar, parse
+from driganttic.client import GantticClient
+
+np = pytest.importorskip("numpy")
+
+T1 = datetime.datetime(2021, 1, 1)
+T2 = datetime.datetime(2022, 1, 1)
+
+
+def test_columns_match_models():
+    """Columns built from raw items hold the parsed model values."""
+    response = payloads.task_page(1, 1, 50, width=2)
+    Translator = parse._datafields(payloads.datafields(2))
+    custom_fields = payloads.custom_fields("task", 2)
+    columns = columnar.to_columns(response["items"], "task", Translator, custom_fields)
+    tasks = parse._fetcherlist(response, "task", Translator, custom_fields)
+    assert columns["start"].dtype == np.dtype("datetime64[ms]")
+    assert columns["utilizationPercent"].dtype == np.float64
+    models = tasks.to_columns()
+    for name in models:
+        assert len(columns[name]) == 50
+        if columns[name].dtype.kind in "fM":
+            np.testing.assert_array_equal(columns[name], models[name])
+        else:
+            assert list(columns[name]) == list(models[name])
+    plan = parse._compile_plan("task", Translator, custom_fields)
+    extracted = [parse._apply_plan(plan, e["dataFields"]) for e in response["items"]]
+    for k_c, fields in custom_fields["task"].items():
+        for name in fields.values():
+            np.testing.assert_array_equal(
+                columns[name],
+                columnar._to_array(
+                    [e.get(name) for e in extracted], columnar.CUSTOM_KINDS[k_c]
+                ),
+            )
+
+
+def test_client_columns_and_parquet(ganttic_server, tmp_path):
+    """The client exports columns that round trip through Parquet."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    with GantticClient(APIKEY="mock", ENDPOINT=ganttic_server.endpoint) as Client:
+        columns = Client.get_task_columns(T1, T2)
+        tasks = Client.get_tasks(T1, T2)
+        assert len(Client.get_project_columns()["id"]) == 30
+    assert list(columns["id"]) == [e.id for e in tasks.fetched_items]
+    path = str(tmp_path / "tasks.parquet")
+    columnar.write_parquet(columns, path)
+    table = pq.read_table(path)
+    assert table.num_rows == 30
+    assert table.column("id").to_pylist() == list(columns["id"])
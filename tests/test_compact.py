@@ -0,0 +1,78 @@
+"""Compact collection tests."""
+
+import datetime
+import pickle
+import tracemalloc
+
+import pytest
+
+from driganttic.compact import CompactItems
+from driganttic.schemas.fetcher import TaskDetails, TaskList
+
+T0 = datetime.datetime(2021, 1, 1)
+UTC = datetime.timezone.utc
+CEST = datetime.timezone(datetime.timedelta(hours=2))
+
+
+def _tasks(n):
+    """Tasks with naive, aware and missing dates."""
+    return [
+        TaskDetails(
+            id=str(i),
+            name=f"Task {i % 7}",
+            status="active",
+            resources=["a", "b"] if i % 2 else ["a"],
+            created=T0 if i % 3 else None,
+            start=T0 + datetime.timedelta(hours=i),
+            end=(T0 + datetime.timedelta(hours=i + 8)).replace(
+                tzinfo=CEST if i % 2 else UTC
+            ),
+            utilizationPercent=None if i % 5 else 50.0,
+        )
+        for i in range(n)
+    ]
+
+
+def test_compact_items():
+    """Compact items rebuild equal models, and slice like a list."""
+    tasks = _tasks(20)
+    items = CompactItems(TaskDetails, tasks)
+    assert len(items) == 20
+    assert items == tasks
+    assert items[-1] == tasks[-1]
+    assert items[3:9:2] == tasks[3:9:2]
+    assert items[1].end.tzinfo is not None and items[1].start.tzinfo is None
+    # Aware timestamps keep their UTC offset
+    assert [t.end.isoformat() for t in items] == [t.end.isoformat() for t in tasks]
+    assert items[0].created is None and items[0].utilizationPercent == 50.0
+    assert items[1].__fields_set__ == tasks[1].__fields_set__
+    with pytest.raises(IndexError):
+        items[20]
+    assert pickle.loads(pickle.dumps(items)) == tasks
+
+
+def test_compact_list():
+    """Compact lists serialize like plain ones."""
+    tasks = TaskList(fetched_items=_tasks(20), pages=1, page=1)
+    compact = tasks.compact()
+    assert isinstance(compact.fetched_items, CompactItems)
+    assert compact == tasks
+    assert compact.dict() == tasks.dict()
+    assert compact.json() == tasks.json()
+
+
+def test_compact_memory():
+    """Compact items take a fraction of the memory of the models."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tasks = _tasks(2000)
+        plain = tracemalloc.get_traced_memory()[0] - before
+        before = tracemalloc.get_traced_memory()[0]
+        items = CompactItems(TaskDetails, tasks)
+        del tasks
+        compact = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert len(items) == 2000
+    assert compact < plain / 2
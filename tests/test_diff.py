@@ -0,0 +1,61 @@
+"""Snapshot diffing tests."""
+
+import datetime
+import json
+
+from driganttic import diff
+from driganttic.schemas.fetcher import TaskDetails, TaskList
+
+T0 = datetime.datetime(2021, 1, 1)
+
+
+def _tasks(spec, fetched_timestamp=T0):
+    """TaskList of (id, name, percent) tuples."""
+    return TaskList(
+        fetched_items=[
+            TaskDetails(
+                id=i,
+                name=name,
+                status="active",
+                resources=["a"],
+                start=T0,
+                end=T0 + datetime.timedelta(days=1),
+                utilizationPercent=percent,
+                fetched_timestamp=fetched_timestamp,
+            )
+            for i, name, percent in spec
+        ],
+        pages=1,
+        page=1,
+    )
+
+
+def test_diff():
+    """Added, modified and removed ids, fetch times are ignored."""
+    before = _tasks([("1", "a", 50), ("2", "b", 50), ("3", "c", 50)])
+    after = _tasks(
+        [("4", "d", 50), ("3", "c", 50.0), ("2", "b", 75)],
+        fetched_timestamp=T0 + datetime.timedelta(hours=1),
+    )
+    changes = after.diff(before)
+    assert (changes.added, changes.modified, changes.removed) == (["4"], ["2"], ["1"])
+    # Stored fingerprints give the same answer
+    stored = json.loads(json.dumps(diff.fingerprints(before)))
+    assert diff.diff(stored, after) == changes
+    assert not diff.diff(changes.fingerprints, after)
+
+
+def test_fingerprint_compact():
+    """Compact lists fingerprint as plain ones, UTC offsets included."""
+    tasks = _tasks([("1", "a", 50), ("2", "b", 75)])
+    cest = datetime.timezone(datetime.timedelta(hours=2))
+    tasks.fetched_items[1].end = tasks.fetched_items[1].end.replace(tzinfo=cest)
+    assert diff.fingerprints(tasks.compact()) == diff.fingerprints(tasks)
+
+
+def test_fingerprint_raw_items():
+    """Raw API items are fingerprinted without parsing them."""
+    item = {"id": "1", "name": "a", "dataFields": {"numbers": [{"number": 2}]}}
+    changed = dict(item, dataFields={"numbers": [{"number": 3}]})
+    assert diff.fingerprint(item) == diff.fingerprint(dict(reversed(item.items())))
+    assert diff.diff([item], [changed]).modified == ["1"]
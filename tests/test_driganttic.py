@@ -77,4 +77,34 @@ def test_GantticClient():
         assert val22 == val23
 
 
+def test_pooled_session():
+    """The client session keeps a pool shared by all calls."""
+    session = dri_client._pooled_session(pool_maxsize=4, pool_block=True)
+    adapter = session.get_adapter("https://planner.ganttic.com/api")
+    assert adapter._pool_maxsize == 4
+    assert adapter._pool_block is True
+    assert session.headers["Connection"] == "keep-alive"
+    session.close()
+
+
+def test_time_windows():
+    """Sharded ranges are covered by consecutive windows."""
+    t1 = datetime.datetime(2021, 1, 15, 12)
+    t2 = datetime.datetime(2021, 3, 10)
+    months = dri_client._time_windows(t1, t2, "month")
+    assert months == [
+        (t1, datetime.datetime(2021, 2, 1)),
+        (datetime.datetime(2021, 2, 1), datetime.datetime(2021, 3, 1)),
+        (datetime.datetime(2021, 3, 1), t2),
+    ]
+    weeks = dri_client._time_windows(t1, t2, "week")
+    assert len(weeks) == 8
+    assert weeks[0] == (t1, t1 + datetime.timedelta(weeks=1))
+    assert weeks[-1][1] == t2
+    assert dri_client._time_windows(t1, t2, datetime.timedelta(days=30)) == [
+        (t1, t1 + datetime.timedelta(days=30)),
+        (t1 + datetime.timedelta(days=30), t2),
+    ]
+
+
 # test_GantticClient()
@@ -0,0 +1,70 @@
+"""HTTP response cache tests."""
+
+import asyncio
+import time
+
+from driganttic.async_client import AsyncGantticClient
+from driganttic.client import GantticClient
+from driganttic.httpcache import CacheEntry, DiskBackend, HTTPCache, MemoryBackend
+
+
+def _entry(body):
+    """Entry of a body, validated by an ETag."""
+    return CacheEntry(
+        body=body, etag='"1"', last_modified=None, stored_at=time.time(), max_age=None
+    )
+
+
+def test_backends_evict_least_recently_used(tmp_path):
+    """Both backends drop the least recently used entries first."""
+    memory = MemoryBackend(max_entries=2)
+    memory.set("a", _entry(b"a"))
+    memory.set("b", _entry(b"b"))
+    memory.get("a")
+    memory.set("c", _entry(b"c"))
+    assert memory.get("b") is None and memory.get("a").body == b"a"
+    disk = DiskBackend(str(tmp_path), max_bytes=250)
+    disk.set("a", _entry(b"a" * 100))
+    assert disk.get("a") == _entry(b"a" * 100)._replace(
+        stored_at=disk.get("a").stored_at
+    )
+    disk.set("b", _entry(b"b" * 100))
+    assert disk.get("a") is None and disk.get("b").body == b"b" * 100
+
+
+def test_key_hides_the_token():
+    """Keys tell tenants apart without holding their token."""
+    key = HTTPCache.key("https://x/tasks", {"token": "secret", "page": 2})
+    assert "secret" not in key and key.endswith("https://x/tasks?page=2")
+    assert key != HTTPCache.key("https://x/tasks", {"token": "other", "page": 2})
+
+
+def test_client_revalidates(ganttic_server):
+    """Stale entries are revalidated, fresh ones skip the request."""
+    cache = HTTPCache()
+    with GantticClient(
+        APIKEY="mock", ENDPOINT=ganttic_server.endpoint, http_cache=cache
+    ) as Client:
+        expected = Client.get_task_details("100003")
+        assert Client.get_task_details("100003") == expected
+        assert ganttic_server.not_modified == 1
+        cache.ttl = 60.0
+        n_requests = len(ganttic_server.requests)
+        assert Client.get_task_details("100003") == expected
+        assert len(ganttic_server.requests) == n_requests
+        assert (cache.hits, cache.revalidated) == (1, 1)
+
+
+def test_async_client_revalidates(ganttic_server):
+    """The async client shares the cache logic."""
+
+    async def get_details():
+        async with AsyncGantticClient(
+            APIKEY="mock", ENDPOINT=ganttic_server.endpoint, http_cache=HTTPCache()
+        ) as Client:
+            first = await Client.get_task_details("100003")
+            return first, await Client.get_task_details("100003")
+
+    first, second = asyncio.run(get_details())
+    assert first == second
+    assert ganttic_server.not_modified == 1
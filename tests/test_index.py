@@ -0,0 +1,79 @@
+"""Task interval index tests."""
+
+import datetime
+import random
+
+from driganttic.index import IntervalIndex, TaskIndex
+from driganttic.schemas.fetcher import TaskDetails, TaskList
+
+T0 = datetime.datetime(2021, 1, 1)
+
+
+def _task(i, start, hours, resources, project=None):
+    """Task starting some hours after T0."""
+    return TaskDetails(
+        id=str(i),
+        status="active",
+        resources=resources,
+        projectId=project,
+        start=T0 + datetime.timedelta(hours=start),
+        end=T0 + datetime.timedelta(hours=start + hours),
+    )
+
+
+def test_interval_index_matches_scan():
+    """Overlap and point queries agree with a full scan."""
+    rng = random.Random(0)
+    intervals = []
+    index = IntervalIndex()
+    for i in range(500):
+        start = rng.uniform(0, 1000)
+        interval = (start, start + rng.choice([0, 1, 10, 200]), i)
+        intervals.append(interval)
+        index.extend([interval])
+    assert len(index) == sum(1 for s, e, _ in intervals if e > s)
+    for _ in range(200):
+        lo = rng.uniform(-50, 1050)
+        hi = lo + rng.choice([0, 0.5, 5, 100])
+        # Half-open intervals, empty ones never overlap
+        expected = sorted(
+            i for s, e, i in intervals if s < hi and e > lo and e > s and hi > lo
+        )
+        assert sorted(index.overlap(lo, hi)) == expected
+        expected = sorted(i for s, e, i in intervals if s <= lo < e)
+        assert sorted(index.at(lo)) == expected
+    # Exactly on the bounds: starts are included, ends are not
+    for t in [s for s, _, _ in intervals[:50]] + [e for _, e, _ in intervals[:50]]:
+        expected = sorted(i for s, e, i in intervals if s <= t < e)
+        assert sorted(index.at(t)) == expected
+
+
+def test_task_index_queries():
+    """Queries by resource and project, replaced tasks are updated."""
+    tasks = TaskList(
+        fetched_items=[
+            _task(1, 0, 8, ["a"], "p1"),
+            _task(2, 8, 8, ["a", "b"], "p1"),
+            _task(3, 4, 8, ["b"], "p2"),
+        ],
+        pages=1,
+        page=1,
+    )
+    index = TaskIndex(tasks)
+    hour = datetime.timedelta(hours=1)
+    assert [t.id for t in index.overlapping(T0, T0 + 9 * hour)] == ["1", "3", "2"]
+    assert [t.id for t in index.overlapping(T0, T0 + 8 * hour, resource="a")] == ["1"]
+    assert [t.id for t in index.at(T0 + 8 * hour, project="p1")] == ["2"]
+    assert index.overlapping(T0, T0 + hour, resource="unknown") == []
+    assert index.resources["b"] == {"2", "3"}
+    assert [(r, a.id, b.id) for r, a, b in index.conflicts()] == [("b", "3", "2")]
+    # A fetched detail moves task 3 to resource a, at a later time
+    index.update([_task(3, 20, 2, ["a"], "p2")])
+    assert len(index) == 3
+    assert index.resources["b"] == {"2"}
+    assert index.overlapping(T0, T0 + 12 * hour, resource="b")[0].id == "2"
+    assert [t.id for t in index.at(T0 + 21 * hour, resource="a")] == ["3"]
+    assert index.conflicts() == []
+    index.remove("2")
+    assert "2" not in index
+    assert index.at(T0 + 8 * hour) == []
@@ -0,0 +1,112 @@
+"""Instrumentation hooks and metrics tests."""
+
+import asyncio
+import datetime
+import urllib.request
+
+import pytest
+
+from driganttic import instrumentation
+from driganttic.async_client import AsyncGantticClient
+from driganttic.client import GantticClient
+from driganttic.exceptions import GantticAPIError
+
+T1 = datetime.datetime(2021, 1, 1)
+T2 = datetime.datetime(2022, 1, 1)
+
+
+@pytest.fixture()
+def metrics():
+    """Globally registered metrics aggregator."""
+    aggregator = instrumentation.register(instrumentation.MetricsAggregator())
+    yield aggregator
+    instrumentation.unregister(aggregator)
+
+
+def test_request_and_stage_metrics(ganttic_server, metrics):
+    """Requests are reported by endpoint, parse stages by name."""
+    with GantticClient(APIKEY="mock", ENDPOINT=ganttic_server.endpoint) as Client:
+        Client.get_tasks(T1, T2)
+        Client.get_task_details("100003")
+        with pytest.raises(GantticAPIError):
+            Client.get_task_details("1")
+    summary = metrics.summary()
+    requests = summary["requests"]
+    assert requests["tasks"]["count"] == 3
+    assert requests["tasks"]["bytes"] > 0
+    assert requests["tasks/datafields"]["count"] == 1
+    assert requests["task/{id}"]["count"] == 2
+    assert requests["task/{id}"]["p50"] <= requests["task/{id}"]["p99"]
+    stages = summary["stages"]
+    assert stages["datafields"]["count"] == 1
+    assert stages["json_decode"]["count"] == 5
+    # 30 listed tasks and one detail, validated one by one
+    assert stages["validation"]["items"] == 31
+    assert stages["validation"]["count"] == 31
+    text = metrics.to_prometheus()
+    assert 'driganttic_requests_total{endpoint="task/{id}",status="404"} 1' in text
+    assert 'driganttic_request_seconds_count{endpoint="tasks"} 3' in text
+    assert 'driganttic_parse_stage_seconds_bucket{stage="datafields",le="+Inf"} 1' in (
+        text
+    )
+    metrics.reset()
+    assert metrics.summary() == {"requests": {}, "stages": {}}
+
+
+def test_client_hooks(ganttic_server):
+    """Client hooks only see their client requests, also async ones."""
+    events = []
+
+    class Recorder(instrumentation.Hook):
+        def on_request(self, event):
+            events.append(event)
+
+    with GantticClient(
+        APIKEY="mock", ENDPOINT=ganttic_server.endpoint, hooks=[Recorder()]
+    ) as Client:
+        Client.get_projects()
+    assert sorted((e.endpoint, e.page or 1, e.status) for e in events) == [
+        ("projects", 1, 200),
+        ("projects", 2, 200),
+        ("projects", 3, 200),
+        ("projects/datafields", 1, 200),
+    ]
+    assert all(e.retries == 0 and e.seconds > 0 for e in events)
+
+    async def main():
+        async with AsyncGantticClient(
+            APIKEY="mock", ENDPOINT=ganttic_server.endpoint, hooks=[Recorder()]
+        ) as Client:
+            await Client.get_project_details("3")
+
+    events.clear()
+    asyncio.run(main())
+    assert sorted(e.endpoint for e in events) == ["project/{id}", "projects/datafields"]
+
+
+def test_serve_metrics(metrics):
+    """Metrics are scraped over HTTP."""
+    metrics.on_stage(instrumentation.StageEvent("validation", 0.002, 10))
+    server = instrumentation.serve_metrics(metrics)
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url) as resp:
+            body = resp.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'driganttic_parse_items_total{stage="validation"} 10' in body
+    assert 'driganttic_parse_stage_seconds_bucket{stage="validation",le="0.005"} 1' in (
+        body
+    )
+
+
+def test_trusted_parsing_not_validated(ganttic_server, metrics):
+    """Models built without validation report no validation stage."""
+    with GantticClient(
+        APIKEY="mock", ENDPOINT=ganttic_server.endpoint, validate=False
+    ) as Client:
+        Client.get_tasks(T1, T2)
+    stages = metrics.summary()["stages"]
+    assert "validation" not in stages
+    assert stages["json_decode"]["count"] == 4
@@ -0,0 +1,238 @@
+"""Parser tests, they run offline on synthetic payloads."""
+
+import copy
+import datetime
+import json
+import subprocess
+import sys
+from typing import Optional
+
+import dateparser
+import pytest
+
+import driganttic.parse as dri_parse
+from driganttic import jsonlib
+from driganttic.schemas.fetcher import TaskDetails
+
+
+@pytest.mark.parametrize(
+    "timeval",
+    [
+        "2021-04-01",
+        "2021-04-01 08:00",
+        "2021-04-01 08:00:00",
+        "2021-04-01T08:00:00.123",
+        "2021-04-01T08:00:00Z",
+        "2021-04-01T08:00:00+02:00",
+        "1 April 2021",
+    ],
+)
+def test_parse_timestamp(timeval):
+    """The fast path agrees with dateparser."""
+    assert dri_parse.parse_timestamp(timeval) == dateparser.parse(timeval)
+
+
+def test_parse_timestamp_none():
+    """Missing timestamps map to none_type."""
+    assert dri_parse.parse_timestamp(None) is None
+    assert dri_parse.parse_timestamp(None, none_type=datetime.datetime.min) == (
+        datetime.datetime.min
+    )
+
+
+def test_to_seconds():
+    """Naive datetimes are taken as UTC, aware ones use their offset."""
+    naive = datetime.datetime(2021, 4, 1, 8)
+    utc = naive.replace(tzinfo=datetime.timezone.utc)
+    cest = datetime.timezone(datetime.timedelta(hours=2))
+    assert dri_parse.to_seconds(naive) == utc.timestamp() == 1617264000
+    assert dri_parse.to_seconds(utc.astimezone(cest)) == 1617264000
+
+
+DATAFIELDS = {
+    "dates": [{"id": "d1", "name": "due"}],
+    "numbers": [{"id": "n1", "name": "budget"}, {"id": "n2", "name": "hours"}],
+    "listValues": [
+        {"id": "l1", "name": "kind", "values": [{"id": "v1", "value": "A"}]},
+        {
+            "id": "l2",
+            "name": "team",
+            "values": [{"id": "v2", "value": "B"}, {"id": "v3", "value": "C"}],
+        },
+    ],
+    "texts": [],
+    "users": [],
+}
+CUSTOM_FIELDS = {
+    "task": {
+        "dates": {"due": "due"},
+        "numbers": {"budget": "budget", "hours": "hours"},
+        "listValues": {"kind": "kind", "team": "team"},
+    }
+}
+DATA_FIELDS = {
+    "dates": [{"id": "d1", "date": "2021-04-30"}],
+    "numbers": [{"id": "n2", "number": 8}, {"id": "n1", "number": 3}],
+    "listValues": [{"id": "l2", "valueId": "v2"}, {"id": "l2", "valueId": "v3"}],
+}
+
+
+def test_custom_fields_plan():
+    """The compiled plan extracts the same values as GET_FIELDS."""
+    Translator = dri_parse._datafields(DATAFIELDS)
+    expected = {}
+    for k_c, v_c in CUSTOM_FIELDS["task"].items():
+        for k, v in v_c.items():
+            val = dri_parse.GET_FIELDS[k_c](
+                DATA_FIELDS[k_c], k, Translator.__getattribute__(k_c)
+            )
+            if val is not None:
+                expected[v] = val
+    plan = dri_parse._compile_plan("task", Translator, CUSTOM_FIELDS)
+    assert dri_parse._apply_plan(plan, DATA_FIELDS) == expected
+    assert expected == {
+        "due": datetime.datetime(2021, 4, 30),
+        "budget": 3,
+        "hours": 8,
+        "team": "B",
+    }
+
+
+def test_custom_fields_plan_unknown_name():
+    """Names missing in the Translator raise as GET_FIELDS does."""
+    Translator = dri_parse._datafields(DATAFIELDS)
+    custom_fields = {"task": {"numbers": {"missing": "missing"}}}
+    plan = dri_parse._compile_plan("task", Translator, custom_fields)
+    assert dri_parse._apply_plan(plan, {"numbers": []}) == {}
+    with pytest.raises(NameError):
+        dri_parse._apply_plan(plan, DATA_FIELDS)
+
+
+def _task_page():
+    """Task page with custom fields."""
+    return {
+        "items": [
+            {
+                "id": str(i),
+                "status": "active",
+                "name": f"task {i}",
+                "created": "2021-04-01 08:00",
+                "projectId": "p1",
+                "resources": ["r1"],
+                "start": "2021-04-01",
+                "end": "2021-04-02T08:00:00Z",
+                "utilizationPercent": 50.0,
+                "dataFields": DATA_FIELDS,
+                "ignored": True,
+            }
+            for i in range(3)
+        ],
+        "pageCount": 1,
+        "page": 1,
+    }
+
+
+def test_fetcherlist_without_validation():
+    """Trusted parsing builds the same models as validated parsing."""
+    Translator = dri_parse._datafields(DATAFIELDS)
+    response = _task_page()
+    validated = dri_parse._fetcherlist(response, "task", Translator)
+    trusted = dri_parse._fetcherlist(response, "task", Translator, validate=False)
+    assert trusted.dict() == validated.dict()
+    assert type(trusted.fetched_items[0]) is dri_parse.TaskDetails
+    # Numbers are coerced as validation would
+    for item in response["items"]:
+        item.update(id=int(item["id"]), resources=[7], utilizationPercent=50)
+    validated = dri_parse._fetcherlist(response, "task", Translator)
+    trusted = dri_parse._fetcherlist(response, "task", Translator, validate=False)
+    assert trusted.dict() == validated.dict()
+    task = trusted.fetched_items[0]
+    assert (task.id, task.resources) == (validated.fetched_items[0].id, ["7"])
+    assert type(task.utilizationPercent) is float
+    # The list reuses the parsed items instead of copying them
+    items = list(validated.fetched_items)
+    rebuilt = dri_parse._fetcherlist_from_items(items, "task", Translator)
+    assert rebuilt.fetched_items[0] is items[0]
+
+
+@pytest.mark.parametrize("decoder", sorted(jsonlib.DECODERS))
+def test_fetcherlist_from_bytes(decoder):
+    """Raw pages parse as decoded ones, only owned pages are updated."""
+    Translator = dri_parse._datafields(DATAFIELDS)
+    response = _task_page()
+    original = copy.deepcopy(response)
+    expected = dri_parse._fetcherlist(response, "task", Translator)
+    assert response == original
+    fetched = dri_parse._fetcherlist_from_bytes(
+        json.dumps(response).encode("utf-8"),
+        "task",
+        Translator,
+        jsonlib.get_decoder(decoder),
+    )
+    assert fetched == expected
+    with pytest.raises(ValueError):
+        jsonlib.get_decoder("unknown")
+
+
+def test_lazy_imports():
+    """Importing the client loads no dateparser, yaml nor config."""
+    code = (
+        "import sys, driganttic.client as c; "
+        "assert c.parse._custom_fields is None; "
+        "assert not {'dateparser', 'yaml', 'numpy'} & set(sys.modules)"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_reload_custom_fields(tmp_path):
+    """The custom fields config is loaded once and can be reloaded."""
+    config = tmp_path / "config.yaml"
+    config.write_text("custom_fields:\n  task:\n    numbers:\n      budget: b\n")
+    default = dri_parse.get_custom_fields()
+    assert dri_parse.CUSTOM_FIELDS is default
+    try:
+        custom_fields = dri_parse.reload_custom_fields(str(config))
+        assert custom_fields == {"task": {"numbers": {"budget": "b"}}}
+        assert dri_parse.get_custom_fields() is custom_fields
+    finally:
+        dri_parse.reload_custom_fields()
+    assert dri_parse.get_custom_fields() == default
+
+
+class CustomTask(TaskDetails):
+    """Task with the custom fields of CUSTOM_FIELDS."""
+
+    due: Optional[datetime.datetime]
+    budget: Optional[float]
+    hours: Optional[float]
+    kind: Optional[str]
+    team: Optional[str]
+
+
+def test_serialize_details():
+    """Serialized custom fields parse back to the same values."""
+    Translator = dri_parse._datafields(DATAFIELDS)
+    task = CustomTask(
+        id="1",
+        status="active",
+        resources=["r1"],
+        start=datetime.datetime(2021, 4, 1, 8),
+        end=datetime.datetime(2021, 4, 2, 8),
+        due=datetime.datetime(2021, 4, 30),
+        budget=3,
+        team="C",
+    )
+    body = dri_parse._serialize_details(task, "task", Translator, CUSTOM_FIELDS)
+    assert "id" not in body and "budget" not in body and "hours" not in body
+    assert body["start"] == "2021-04-01 08:00"
+    assert body["dataFields"]["listValues"] == [{"id": "l2", "valueId": "v3"}]
+    plan = dri_parse._compile_plan("task", Translator, CUSTOM_FIELDS)
+    assert dri_parse._apply_plan(plan, body["dataFields"]) == {
+        "due": task.due,
+        "budget": 3,
+        "team": "C",
+    }
+    with pytest.raises(ValueError):
+        dri_parse._serialize_details(
+            task.copy(update={"team": "Z"}), "task", Translator, CUSTOM_FIELDS
+        )
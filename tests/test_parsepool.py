@@ -0,0 +1,78 @@
+"""Parse pool tests against the local mock Ganttic server."""
+
+import datetime
+import json
+import threading
+
+import pytest
+
+from benchmarks import payloads
+from driganttic import parse
+from driganttic.client import GantticClient
+from driganttic.parsepool import ParsePool
+
+T1 = datetime.datetime(2021, 1, 1)
+T2 = datetime.datetime(2022, 1, 1)
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_parse_pool(ganttic_server, kind):
+    """Pages parsed in a pool merge into the same listings."""
+    with GantticClient(APIKEY="mock", ENDPOINT=ganttic_server.endpoint) as Client:
+        tasks = Client.get_tasks(T1, T2)
+        resources = Client.get_resources()
+    with ParsePool(kind, max_workers=2) as pool, GantticClient(
+        APIKEY="mock", ENDPOINT=ganttic_server.endpoint, parse_pool=pool
+    ) as Client:
+        assert Client.get_tasks(T1, T2) == tasks
+        # Fetchers share the workers, each page brings its Translator
+        executor = pool._executor
+        assert Client.get_resources() == resources
+        assert Client.get_tasks(T1, T2) == tasks
+        assert pool._executor is executor
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_parse_pool_shared(kind):
+    """Threads submitting with different Translators get their own."""
+    body = json.dumps(payloads.task_page(1, 1, 20)).encode("utf-8")
+    # The first list field is parsed as the task name
+    custom_fields = {"task": {"listValues": {"list_0": "name"}}}
+    datafields = payloads.datafields()
+    renamed = json.loads(json.dumps(datafields).replace('"value_', '"other_'))
+    expected = {}
+    for prefix, response in (("value_", datafields), ("other_", renamed)):
+        Translator = parse._datafields(response)
+        page = json.loads(body)
+        expected[prefix] = (
+            Translator,
+            parse._fetcherlist(page, "task", Translator, custom_fields).fetched_items,
+        )
+    assert all(t.name.startswith("other_") for t in expected["other_"][1])
+    errors = []
+
+    def parse_pages(pool, prefix):
+        Translator, items = expected[prefix]
+        try:
+            for _ in range(10):
+                future = pool.submit(body, "task", Translator, custom_fields)
+                assert future.result() == items
+        except Exception as e:  # noqa: B902
+            errors.append(e)
+
+    with ParsePool(kind, max_workers=2) as pool:
+        threads = [
+            threading.Thread(target=parse_pages, args=(pool, prefix))
+            for prefix in ("value_", "other_")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert errors == []
+
+
+def test_parse_pool_kind():
+    """Only process and thread pools exist."""
+    with pytest.raises(ValueError):
+        ParsePool("fiber")
@@ -0,0 +1,88 @@
+"""Rate limiter and retry policy tests."""
+
+import threading
+import time
+
+import pytest
+
+from driganttic.exceptions import RequestBudgetExceeded
+from driganttic.ratelimit import FairScheduler, RequestBudget, RetryPolicy, TokenBucket
+
+
+def test_token_bucket():
+    """Past the burst, requests are spaced at the bucket rate."""
+    bucket = TokenBucket(rate=100, capacity=5)
+    start = time.monotonic()
+    for _ in range(15):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_retry_policy_backoff():
+    """Backoff grows exponentially, capped, and Retry-After wins."""
+    retry = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+    assert [retry.backoff(a) for a in range(5)] == [1, 2, 4, 5, 5]
+    assert retry.backoff(0, retry_after="7") == 7
+    assert retry.backoff(0, retry_after="Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert retry.backoff(2, retry_after="soon") == 4
+    # Invalid Retry-After headers fall back to the backoff
+    for invalid in ("inf", "-inf", "nan", "-3"):
+        assert retry.backoff(1, retry_after=invalid) == 2
+    # Long ones are clamped
+    assert retry.backoff(0, retry_after="86400") == 300
+    capped = RetryPolicy(max_retry_after=10)
+    assert capped.backoff(0, retry_after="Fri, 31 Dec 9999 23:59:59 GMT") == 10
+    assert retry.retries_status(429)
+    assert not retry.retries_status(404)
+    jittered = RetryPolicy(backoff_factor=1, max_backoff=5)
+    assert all(0 <= jittered.backoff(3) <= 5 for _ in range(20))
+
+
+def test_retry_policy_retry_delay():
+    """Retries stop after max_retries, POSTs only retry 429 answers."""
+    retry = RetryPolicy(max_retries=2, backoff_factor=1, jitter=False)
+    assert retry.retry_delay(0) == 1
+    assert retry.retry_delay(1, 503) == 2
+    assert retry.retry_delay(0, 429, retry_after="7") == 7
+    assert retry.retry_delay(2, 503) is None
+    assert retry.retry_delay(0, 404) is None
+    assert retry.retry_delay(0, idempotent=False) is None
+    assert retry.retry_delay(0, 503, idempotent=False) is None
+    assert retry.retry_delay(0, 429, idempotent=False) == 1
+
+
+def test_request_budget():
+    """The budget raises once used up."""
+    budget = RequestBudget(max_requests=2)
+    budget.spend()
+    budget.spend()
+    assert budget.remaining == 0
+    with pytest.raises(RequestBudgetExceeded):
+        budget.spend()
+    assert RequestBudget().remaining is None
+
+
+def test_fair_scheduler():
+    """Freed slots go to the waiting tenants in turn."""
+    scheduler = FairScheduler(max_concurrency=1)
+    served = []
+
+    def request(tenant):
+        with scheduler.slot(tenant):
+            served.append(tenant)
+
+    scheduler.acquire("a")
+    threads = []
+    for tenant in ["a", "a", "a", "b"]:
+        thread = threading.Thread(target=request, args=(tenant,))
+        thread.start()
+        threads.append(thread)
+        while scheduler.waiting < len(threads):
+            time.sleep(0.001)
+    scheduler.release()
+    for thread in threads:
+        thread.join()
+    assert served == ["a", "b", "a", "a"]
+    assert scheduler.in_flight == 0
+    with pytest.raises(ValueError):
+        FairScheduler(max_concurrency=0)
@@ -0,0 +1,112 @@
+"""Single-flight coalescing tests."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from driganttic.async_client import AsyncGantticClient
+from driganttic.client import GantticClient
+from driganttic.singleflight import AsyncSingleFlight, SingleFlight, coalesced_methods
+
+
+def _detail_requests(server, path):
+    """Number of GET requests the server answered on a path."""
+    return sum(1 for _, p, _ in server.requests if p == path)
+
+
+def test_single_flight():
+    """Identical calls in flight share one result or exception."""
+    flights = SingleFlight()
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        time.sleep(0.05)
+        if value == "boom":
+            raise KeyError(value)
+        return [value]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: flights.do("a", lambda: slow(1)), "abcd"))
+    assert calls == [1] and flights.shared == 3
+    assert all(r is results[0] for r in results)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(flights.do, "b", lambda: slow("boom")) for _ in range(2)
+        ]
+    for future in futures:
+        with pytest.raises(KeyError):
+            future.result()
+    # Nothing is kept once done
+    assert flights.do("a", lambda: slow(2)) == [2]
+
+
+def test_async_single_flight():
+    """Identical awaited calls in flight share one result."""
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return object()
+
+    async def run():
+        return await asyncio.gather(*(flights.do("k", slow) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1 and flights.shared == 4
+    assert all(r is results[0] for r in results)
+
+
+def test_coalesced_methods():
+    """Coalescing is configured per getter."""
+    assert "get_tasks" in coalesced_methods(True)
+    assert coalesced_methods(False) == frozenset()
+    assert coalesced_methods(["get_project_details"]) == {"get_project_details"}
+    with pytest.raises(ValueError):
+        coalesced_methods(["create_task"])
+
+
+def test_client_coalesce(ganttic_server):
+    """Concurrent identical getters share one request."""
+    ganttic_server.latency = 0.05
+    with GantticClient(
+        APIKEY="mock",
+        ENDPOINT=ganttic_server.endpoint,
+        coalesce=["get_project_details"],
+    ) as Client:
+        Client.Translator["project"]
+        barrier = threading.Barrier(6)
+
+        def get(project_id):
+            barrier.wait()
+            return Client.get_project_details(project_id)
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(get, ["3"] * 5 + ["4"]))
+        assert all(r is results[0] for r in results[:5])
+        assert results[5].id == "4"
+        assert _detail_requests(ganttic_server, "/v1/project/3") == 1
+        # Resources are not coalesced
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda _: Client.get_resource_details("3"), "ab"))
+        assert _detail_requests(ganttic_server, "/v1/resource/3") == 2
+
+
+def test_async_client_coalesce(ganttic_server):
+    """Concurrent identical async getters share one request."""
+
+    async def get_projects():
+        async with AsyncGantticClient(
+            APIKEY="mock", ENDPOINT=ganttic_server.endpoint, coalesce=True
+        ) as Client:
+            return await asyncio.gather(*(Client.get_projects() for _ in range(4)))
+
+    results = asyncio.run(get_projects())
+    assert all(r is results[0] for r in results)
+    assert len(results[0].fetched_items) == 30
+    assert _detail_requests(ganttic_server, "/v1/projects") == 3
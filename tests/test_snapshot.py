@@ -0,0 +1,76 @@
+"""On-disk snapshot tests."""
+
+import datetime
+import pickle
+
+import pytest
+
+from benchmarks import payloads
+from driganttic import parse, snapshot
+from driganttic.schemas.fetcher import FetcherList, ResourceList, TaskDetails, TaskList
+
+UTC2 = datetime.timezone(datetime.timedelta(hours=2))
+
+
+def _tasks(n_items=50):
+    """Parsed TaskList of a mock page."""
+    Translator = parse._datafields(payloads.datafields())
+    return parse._fetcherlist(payloads.task_page(1, 1, n_items), "task", Translator)
+
+
+def test_snapshot_roundtrip(tmp_path):
+    """Loaded items equal the saved ones, timestamps included."""
+    tasks = _tasks()
+    tasks.fetched_items[0].created = None
+    tasks.fetched_items[1].start = datetime.datetime(2021, 3, 1, 10, tzinfo=UTC2)
+    path = str(tmp_path / "tasks.snap")
+    tasks.save_snapshot(path, chunk_size=8)
+    loaded = TaskList.load_snapshot(path)
+    assert type(loaded) is TaskList
+    assert loaded.fetched_timestamp == tasks.fetched_timestamp
+    assert (loaded.pages, loaded.page) == (tasks.pages, tasks.page)
+    assert loaded.fetched_items == tasks.fetched_items
+    assert loaded.fetched_items[1].start.utcoffset() == datetime.timedelta(hours=2)
+    assert loaded.fetched_items[-1].__fields_set__ == (
+        tasks.fetched_items[-1].__fields_set__
+    )
+    assert loaded.dict() == tasks.dict()
+    # The list schema is checked, FetcherList accepts any
+    assert type(FetcherList.load_snapshot(path)) is TaskList
+    with pytest.raises(ValueError):
+        ResourceList.load_snapshot(path)
+
+
+def test_snapshot_lazy(tmp_path):
+    """Chunks are only decompressed on access, a few at most."""
+    path = str(tmp_path / "tasks.snap")
+    _tasks(100).save_snapshot(path, chunk_size=10)
+    items = snapshot.load(path, max_chunks=2).fetched_items
+    assert isinstance(items, snapshot.SnapshotItems) and len(items) == 100
+    assert len(items._chunks) == 0
+    assert items[55].id == _tasks(100).fetched_items[55].id
+    assert list(items._chunks) == [5]
+    assert [t.id for t in items[-12:-9]] == [t.id for t in items[88:91]]
+    assert len(items._chunks) == 2
+    assert isinstance(items[0], TaskDetails) and sum(1 for _ in items) == 100
+    with pytest.raises(IndexError):
+        items[100]
+    assert pickle.loads(pickle.dumps(items)) == items
+
+
+def test_snapshot_schema_changes(tmp_path, monkeypatch):
+    """Fields missing in the file get their default."""
+    path = str(tmp_path / "tasks.snap")
+    with monkeypatch.context() as m:
+        # Saved before TaskDetails had a name
+        fields = dict(TaskDetails.__fields__)
+        del fields["name"]
+        m.setattr(TaskDetails, "__fields__", fields)
+        _tasks(3).save_snapshot(path)
+    loaded = TaskList.load_snapshot(path)
+    assert loaded.fetched_items[0].name is None
+    assert loaded.fetched_items[0].id == _tasks(3).fetched_items[0].id
+    not_snapshot = tmp_path / "tasks.json"
+    not_snapshot.write_text(_tasks(3).json())
+    with pytest.raises(ValueError):
+        snapshot.load(str(not_snapshot))
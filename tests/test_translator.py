@@ -0,0 +1,67 @@
+"""Lazy translator tests."""
+
+import pytest
+
+from driganttic.schemas.fetcher import DataFields
+from driganttic.translator import LazyTranslator, TranslatorCache
+
+DATAFIELDS = {
+    "dates": [{"id": "d1", "name": "due"}],
+    "numbers": [{"id": "n1", "name": "budget"}],
+    "listValues": [
+        {"id": "l1", "name": "kind", "values": [{"id": "v1", "value": "A"}]}
+    ],
+    "texts": [],
+    "users": [],
+}
+
+
+def _counting_loader(calls):
+    """Loader that records the fetchers it is asked for."""
+
+    def loader(fetcher_name):
+        calls.append(fetcher_name)
+        return DATAFIELDS
+
+    return loader
+
+
+def test_lazy_translator():
+    """Translators are only fetched on first access, and only once."""
+    calls = []
+    Translator = LazyTranslator(_counting_loader(calls), ["task", "project"])
+    assert calls == []
+    assert Translator["task"].numbers == {"budget": "n1"}
+    assert Translator["task"].listValues == {"kind": {"l1": {"v1": "A"}}}
+    assert calls == ["task"]
+    assert Translator.get("resource") is None
+    assert len(dict(Translator)) == 2
+    assert calls == ["task", "project"]
+
+
+def test_malformed_datafields():
+    """Malformed datafields raise, get does not hide them."""
+    malformed = dict(DATAFIELDS, numbers=[{"id": "n1"}])
+    Translator = LazyTranslator(lambda fetcher_name: malformed, ["task"])
+    assert "task" in Translator and "resource" not in Translator
+    with pytest.raises(KeyError):
+        Translator.get("task", DataFields())
+    with pytest.raises(KeyError):
+        Translator["task"]
+    assert Translator.get("resource", DataFields()) == DataFields()
+
+
+def test_translator_cache(tmp_path):
+    """Fresh cache entries skip the API, stale ones revalidate."""
+    calls = []
+    cache = TranslatorCache(str(tmp_path), ttl=60)
+    LazyTranslator(_counting_loader(calls), ["task"], cache=cache)["task"]
+    Translator = LazyTranslator(_counting_loader(calls), ["task"], cache=cache)
+    assert Translator["task"].dates == {"due": "d1"}
+    assert calls == ["task"]
+
+    cache.ttl = 0
+    Translator = LazyTranslator(_counting_loader(calls), ["task"], cache=cache)
+    assert Translator["task"].dates == {"due": "d1"}
+    Translator._revalidating["task"].join(timeout=5)
+    assert calls == ["task", "task"]
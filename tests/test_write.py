@@ -0,0 +1,115 @@
+"""Write path tests against the local mock Ganttic server."""
+
+import datetime
+
+from driganttic.cache import EntityCache
+from driganttic.client import GantticClient
+from driganttic.exceptions import GantticAPIError
+from driganttic.httpcache import HTTPCache
+from driganttic.schemas.fetcher import ResourceDetails, TaskDetails
+
+T0 = datetime.datetime(2021, 1, 1, 8)
+
+
+def _task(i, task_id=None):
+    """Task starting i days after T0."""
+    return TaskDetails(
+        id=task_id,
+        name=f"Task {i}",
+        status="1",
+        resources=["1"],
+        start=T0 + datetime.timedelta(days=i),
+        end=T0 + datetime.timedelta(days=i + 1),
+    )
+
+
+def test_create_modify_delete(ganttic_server):
+    """Single writes hit the singular endpoints, serialized."""
+    with GantticClient(APIKEY="mock", ENDPOINT=ganttic_server.endpoint) as Client:
+        created = Client.create_task(_task(0))
+        assert created.id == "new1" and created.start == T0
+        modified = Client.modify_resource(
+            "3", ResourceDetails(id="3", status="1", name="Renamed")
+        )
+        assert modified.name == "Renamed"
+        assert Client.delete_project("4") is None
+    assert [(m, p) for m, p, _ in ganttic_server.writes] == [
+        ("POST", "/v1/task"),
+        ("PUT", "/v1/resource/3"),
+        ("DELETE", "/v1/project/4"),
+    ]
+    body = ganttic_server.writes[0][2]
+    assert body == {
+        "name": "Task 0",
+        "status": "1",
+        "resources": ["1"],
+        "start": "2021-01-01 08:00",
+        "end": "2021-01-02 08:00",
+    }
+
+
+def test_batch_writes(ganttic_server):
+    """Batches return a result or an exception per entity."""
+    with GantticClient(APIKEY="mock", ENDPOINT=ganttic_server.endpoint) as Client:
+        created = Client.create_tasks([_task(i) for i in range(20)], max_workers=4)
+        assert sorted(t.id for t in created) == sorted(f"new{i}" for i in range(1, 21))
+        assert [t.name for t in created] == [f"Task {i}" for i in range(20)]
+        tasks = [_task(0, "100001"), _task(1, "999999"), _task(2, "100002")]
+        modified = Client.modify_tasks(tasks)
+        assert list(modified) == ["100001", "999999", "100002"]
+        assert isinstance(modified["999999"], GantticAPIError)
+        assert modified["100002"].start == tasks[2].start
+        deleted = Client.delete_tasks(["100001", "100001", "999999"])
+        assert deleted["100001"] is None
+        assert isinstance(deleted["999999"], GantticAPIError)
+
+
+def test_writes_invalidate_caches(ganttic_server):
+    """Written entities are not served stale from the caches."""
+    cache = EntityCache()
+    http_cache = HTTPCache(ttl=60.0)
+    with GantticClient(
+        APIKEY="mock",
+        ENDPOINT=ganttic_server.endpoint,
+        cache=cache,
+        http_cache=http_cache,
+    ) as Client:
+        Client.get_task_details("100003")
+        Client.modify_task("100003", _task(5, "100003"))
+        assert cache.get("task", "100003").start == T0 + datetime.timedelta(days=5)
+        Client.delete_task("100003")
+        assert cache.get("task", "100003") is None
+        n_requests = len(ganttic_server.requests)
+        Client.get_task_details("100003")
+        assert len(ganttic_server.requests) == n_requests + 1
+
+
+def test_writes_invalidate_listings(ganttic_server):
+    """Listings are fetched again after writing one of their items."""
+    week = (T0, T0 + datetime.timedelta(days=7))
+    for caches in ({"cache": EntityCache()}, {"http_cache": HTTPCache(ttl=60.0)}):
+        with GantticClient(
+            APIKEY="mock", ENDPOINT=ganttic_server.endpoint, **caches
+        ) as Client:
+            for write, path in (
+                (
+                    lambda: Client.modify_project("3", Client.get_project_details("3")),
+                    "/v1/projects",
+                ),
+                (lambda: Client.create_task(_task(0)), "/v1/tasks"),
+                (lambda: Client.delete_task("100003"), "/v1/tasks"),
+            ):
+                Client.get_projects()
+                Client.get_tasks(*week)
+                n_requests = len(ganttic_server.requests)
+                Client.get_projects()
+                Client.get_tasks(*week)
+                assert len(ganttic_server.requests) == n_requests
+                write()
+                n_requests = len(ganttic_server.requests)
+                Client.get_projects()
+                Client.get_tasks(*week)
+                paths = [p for _, p, _ in ganttic_server.requests[n_requests:]]
+                assert path in paths
+                # Other listings are still served from the cache
+                assert all(p == path for p in paths)